@@ -0,0 +1,75 @@
+# benchmarks/auth_bench.py
+"""
+Throughput de verificación de JWT: jwt.decode directo vs auth.decodificar_token con cache.
+
+Uso (desde backend/):
+    python -m benchmarks.auth_bench [--repeat N] [--tokens K]
+
+Simula K clientes que reenvían su mismo bearer; mide decodificaciones por segundo
+con y sin cache, y el camino completo de get_current_principal (claims -> Principal).
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import time
+
+# auth.py lee estas variables al importar; valores de prueba si no están definidas
+os.environ.setdefault("JWT_SECRET_KEY", "bench-secret")
+os.environ.setdefault("JWT_ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+
+import anyio  # noqa: E402
+from fastapi.security import HTTPAuthorizationCredentials  # noqa: E402
+from jose import jwt  # noqa: E402
+
+from smartfocusBackend import auth  # noqa: E402
+from smartfocusBackend.auth_cache import token_cache  # noqa: E402
+
+
+def _ops_per_sec(fn, tokens, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for t in tokens:
+            fn(t)
+    return repeat * len(tokens) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--tokens", type=int, default=50)
+    args = parser.parse_args()
+
+    tokens = [
+        auth.crear_token(subject=str(i), extra={"username": f"user{i}"})
+        for i in range(1, args.tokens + 1)
+    ]
+
+    def uncached(t: str):
+        return jwt.decode(t, auth.SECRET_KEY, algorithms=[auth.ALGORITHM])
+
+    token_cache.clear()
+    base = _ops_per_sec(uncached, tokens, args.repeat)
+    cached = _ops_per_sec(auth.decodificar_token, tokens, args.repeat)
+
+    async def principal_loop() -> float:
+        creds = [HTTPAuthorizationCredentials(scheme="Bearer", credentials=t) for t in tokens]
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for c in creds:
+                await auth.get_current_principal(c)
+        return args.repeat * len(creds) / (time.perf_counter() - start)
+
+    principal = anyio.run(principal_loop)
+
+    print(f"tokens distintos:        {len(tokens)}")
+    print(f"jwt.decode (sin cache):  {base:,.0f} ops/s ({1e6 / base:.1f} µs/op)")
+    print(f"decodificar_token:       {cached:,.0f} ops/s ({1e6 / cached:.1f} µs/op)")
+    print(f"get_current_principal:   {principal:,.0f} ops/s ({1e6 / principal:.1f} µs/op)")
+    print(f"speedup decode:          {cached / base:.1f}x")
+    print(f"cache:                   {token_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
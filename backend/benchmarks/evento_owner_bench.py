@@ -0,0 +1,115 @@
+# benchmarks/evento_owner_bench.py
+"""
+EXPLAIN antes/después de denormalizar evento_usuario_id (migración 0009).
+
+Uso (desde backend/):
+    BENCH_DATABASE_URL=postgresql+psycopg2://... python -m benchmarks.evento_owner_bench [--events 1000000] [--users 2000]
+
+Crea el schema aislado bench_owner con materias/eventos sintéticos y compara, para
+"todos mis eventos por fecha" (página keyset de /events/all):
+  - antes:   join evento -> materia filtrando materia_usuario_id
+  - después: filtro directo por evento_usuario_id sobre (usuario, fecha, id)
+Imprime EXPLAIN (ANALYZE, BUFFERS) de cada una y la mediana de N ejecuciones.
+Borra el schema al final.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import time
+
+from sqlalchemy import create_engine, text
+
+ANTES = """
+SELECT e.* FROM evento e
+JOIN materia m ON e.evento_materia_id = m.materia_id
+WHERE m.materia_usuario_id = :uid
+ORDER BY e.evento_fecha, e.evento_id
+LIMIT 51
+"""
+
+DESPUES = """
+SELECT e.* FROM evento e
+WHERE e.evento_usuario_id = :uid
+ORDER BY e.evento_fecha, e.evento_id
+LIMIT 51
+"""
+
+SETUP = [
+    "DROP SCHEMA IF EXISTS bench_owner CASCADE",
+    "CREATE SCHEMA bench_owner",
+    "SET search_path TO bench_owner",
+    "CREATE TABLE materia (materia_id int PRIMARY KEY, materia_usuario_id int NOT NULL, materia_nombre text NOT NULL)",
+    """CREATE TABLE evento (
+        evento_id int PRIMARY KEY, evento_materia_id int NOT NULL, evento_usuario_id int NOT NULL,
+        evento_nombre text NOT NULL, evento_fecha date NOT NULL, evento_estado text NOT NULL DEFAULT 'pendiente')""",
+    # ~8 materias por usuario
+    "INSERT INTO materia SELECT g, 1 + g % :users, 'Materia ' || g FROM generate_series(1, :users * 8) g",
+    """INSERT INTO evento
+       SELECT g, 1 + g % (:users * 8), 1 + (1 + g % (:users * 8)) % :users, 'Evento ' || g,
+              DATE '2024-01-01' + (g * 37 % 730)
+       FROM generate_series(1, :events) g""",
+    # Índices previos a la migración
+    "CREATE INDEX ON materia (materia_usuario_id)",
+    "CREATE INDEX ON evento (evento_materia_id)",
+    "CREATE INDEX ON evento (evento_fecha, evento_id)",
+    "CREATE INDEX ON evento (evento_materia_id, evento_fecha, evento_id)",
+    "ANALYZE",
+]
+
+
+def _explain(conn, sql: str, uid: int) -> None:
+    for line in conn.execute(text("EXPLAIN (ANALYZE, BUFFERS) " + sql), {"uid": uid}).scalars():
+        print("    " + line)
+
+
+def _median_ms(conn, sql: str, uid: int, runs: int) -> float:
+    tiempos = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        conn.execute(text(sql), {"uid": uid}).all()
+        tiempos.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(tiempos)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    url = os.getenv("BENCH_DATABASE_URL")
+    if not url:
+        parser.error("definí BENCH_DATABASE_URL")
+    engine = create_engine(url, future=True)
+    uid = args.users // 2
+
+    with engine.begin() as conn:
+        for stmt in SETUP:
+            conn.execute(text(stmt), {"users": args.users, "events": args.events})
+
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("SET search_path TO bench_owner"))
+            print(f"== {args.events:,} eventos, {args.users:,} usuarios (usuario {uid}) ==")
+            print("\n[antes] join con materia")
+            _explain(conn, ANTES, uid)
+            antes = _median_ms(conn, ANTES, uid, args.runs)
+
+            conn.execute(text("CREATE INDEX ON evento (evento_usuario_id, evento_fecha, evento_id)"))
+            conn.execute(text("ANALYZE evento"))
+            print("\n[después] evento_usuario_id + idx (usuario, fecha, id)")
+            _explain(conn, DESPUES, uid)
+            despues = _median_ms(conn, DESPUES, uid, args.runs)
+
+            print(f"\nmediana antes:   {antes:.2f} ms")
+            print(f"mediana después: {despues:.2f} ms ({antes / despues:.1f}x)")
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text("DROP SCHEMA IF EXISTS bench_owner CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# benchmarks/nl_fastpath_bench.py
+"""
+Tasa de aciertos y latencia del parser de reglas (nl_rules) sobre un corpus fixture.
+
+Uso (desde backend/):
+    python -m benchmarks.nl_fastpath_bench [ruta_corpus.json] [--repeat N]
+
+"expect" en el corpus es la tool esperada si la orden debería resolverse sin LLM,
+o null si debería delegarse en Gemini. "evento_id" (opcional) es el evento al que
+tiene que quedar resuelta la orden.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List
+
+from smartfocusBackend.services import nl_rules
+
+DEFAULT_CORPUS = Path(__file__).parent / "fixtures" / "nl_corpus.json"
+
+
+@dataclass(frozen=True)
+class _Row:
+    """Fila mínima con la misma forma que MateriaRef/EventoRef del snapshot."""
+    materia_id: int = 0
+    materia_nombre: str = ""
+    evento_id: int = 0
+    evento_materia_id: int = 0
+    evento_nombre: str = ""
+
+
+class _CorpusCatalog:
+    """Catálogo del fixture expuesto con la interfaz que usa nl_rules.parse."""
+
+    def __init__(self, materias: List[Dict[str, Any]], eventos: List[Dict[str, Any]]):
+        self.materias_by_id = {m["materia_id"]: _Row(**m) for m in materias}
+        self._eventos = [_Row(**e) for e in eventos]
+
+    def eventos_de(self, materia_id: int) -> List[_Row]:
+        return [e for e in self._eventos if e.evento_materia_id == materia_id]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("corpus", nargs="?", default=str(DEFAULT_CORPUS))
+    parser.add_argument("--repeat", type=int, default=1000)
+    args = parser.parse_args()
+
+    data = json.loads(Path(args.corpus).read_text(encoding="utf-8"))
+    catalog = _CorpusCatalog(data["materias"], data["eventos"])
+    today = date.fromisoformat(data["today"])
+    utterances = data["utterances"]
+
+    hits, correct = 0, 0
+    by_rule: Counter = Counter()
+    for u in utterances:
+        res = nl_rules.parse(u["text"], catalog, today)
+        accepted = res is not None and res.confidence >= nl_rules.FAST_PATH_MIN_CONFIDENCE
+        got = res.tool_calls[0]["name"] if accepted else None
+        ok = got == u["expect"]
+        if ok and accepted and "evento_id" in u:
+            ok = res.tool_calls[0]["args"].get("evento_id") == u["evento_id"]
+        hits += accepted
+        correct += ok
+        if accepted:
+            by_rule[res.rule] += 1
+        mark = "OK " if ok else "ERR"
+        print(f"{mark} {'fast' if accepted else 'llm ':4} {str(got):15} {u['text']}")
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for u in utterances:
+            nl_rules.parse(u["text"], catalog, today)
+    elapsed = time.perf_counter() - start
+    per_call_us = elapsed / (args.repeat * len(utterances)) * 1e6
+
+    n = len(utterances)
+    print()
+    print(f"utterances:      {n}")
+    print(f"fast-path hits:  {hits} ({hits / n:.1%})")
+    print(f"expected match:  {correct} ({correct / n:.1%})")
+    print(f"por regla:       {dict(by_rule)}")
+    print(f"latencia media:  {per_call_us:.1f} µs/orden")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+# benchmarks/password_calibrate.py
+"""
+Calibra los rounds de pbkdf2_sha256 para un tiempo de verify objetivo en este CPU.
+
+Uso (desde backend/):
+    python -m benchmarks.password_calibrate [--target-ms 50] [--samples 5]
+
+Imprime los rounds sugeridos y la línea a copiar en el entorno
+(PASSWORD_PBKDF2_ROUNDS). Los hashes existentes se migran solos en el
+próximo login exitoso (needs_update).
+"""
+from __future__ import annotations
+
+import argparse
+
+from smartfocusBackend import utils
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--target-ms", type=float, default=50.0)
+    parser.add_argument("--samples", type=int, default=5)
+    args = parser.parse_args()
+
+    rounds, medido = utils.calibrar_rounds(args.target_ms, muestras=args.samples)
+
+    print(f"política actual:  {utils.PASSWORD_HASH_PROFILE} ({utils.PBKDF2_ROUNDS} rounds)")
+    print("perfiles:         " + ", ".join(f"{k}={v}" for k, v in utils.PBKDF2_PROFILES.items()))
+    print(f"objetivo:         {args.target_ms:.1f} ms/verify")
+    print(f"sugerido:         {rounds} rounds (~{medido:.1f} ms medidos)")
+    print()
+    print(f"PASSWORD_PBKDF2_ROUNDS={rounds}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# benchmarks/search_bench.py
+"""
+Latencia de búsqueda por nombre: ILIKE secuencial vs GIN trigram (pg_trgm + unaccent).
+
+Uso (desde backend/):
+    BENCH_DATABASE_URL=postgresql+psycopg2://... python -m benchmarks.search_bench [--sizes 10000 100000 1000000]
+    python -m benchmarks.search_bench --sqlite [--sizes 10000 100000]
+
+Postgres: para cada tamaño crea el schema aislado bench_search con N eventos
+sintéticos (generate_series), mide las consultas sin índice y con el GIN de la
+migración 0008, e imprime mediana/p95 y el plan elegido. Requiere las extensiones
+pg_trgm/unaccent y la función f_unaccent (migración 0008). Borra el schema al final.
+SQLite: valida y mide el fallback LIKE/lower de search_service.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import time
+from typing import Callable, List
+
+from sqlalchemy import column, create_engine, select, table, text
+
+from smartfocusBackend.services import search_service
+from smartfocusBackend.services.search_service import name_fuzzy_matches, name_matches, name_similarity
+
+WORDS = [
+    "parcial", "final", "entrega", "práctico", "exposición", "recuperatorio", "coloquio",
+    "matemática", "física", "química", "álgebra", "análisis", "programación", "historia",
+    "biología", "economía", "estadística", "informática", "inglés", "geografía",
+]
+QUERIES = ["parc", "algebra", "analisis matem", "recuperatorio fisica", "exposicion", "quimca"]
+
+_evento = table("evento", column("evento_id"), column("evento_nombre"))
+
+
+def _timed(fn: Callable[[], object], runs: int) -> List[float]:
+    out = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        out.append((time.perf_counter() - t0) * 1000)
+    return out
+
+
+def _report(label: str, tiempos: List[float]) -> None:
+    p95 = sorted(tiempos)[max(0, int(len(tiempos) * 0.95) - 1)]
+    print(f"  {label:28} mediana {statistics.median(tiempos):8.2f} ms   p95 {p95:8.2f} ms")
+
+
+def _stmt(q: str, fuzzy: bool, limit: int = 20):
+    pred = name_fuzzy_matches(_evento.c.evento_nombre, q) if fuzzy else name_matches(_evento.c.evento_nombre, q)
+    score = name_similarity(_evento.c.evento_nombre, q)
+    return select(_evento.c.evento_id).where(pred).order_by(score.desc(), _evento.c.evento_id).limit(limit)
+
+
+def bench_postgres(url: str, sizes: List[int], runs: int) -> None:
+    engine = create_engine(url, future=True)
+    # El bench requiere 0008: usar los builders pg_trgm (en la app lo decide el probe del lifespan)
+    search_service.set_backend(True)
+    for n in sizes:
+        print(f"\n== Postgres, {n:,} eventos ==")
+        with engine.begin() as conn:
+            conn.execute(text("DROP SCHEMA IF EXISTS bench_search CASCADE"))
+            conn.execute(text("CREATE SCHEMA bench_search"))
+            conn.execute(text("SET search_path TO bench_search, public"))
+            conn.execute(text("CREATE TABLE evento (evento_id int PRIMARY KEY, evento_nombre varchar(150) NOT NULL)"))
+            conn.execute(
+                text(
+                    "INSERT INTO evento "
+                    "SELECT g, initcap(((:w)::text[])[1 + (g * 7) % :k] || ' ' || ((:w)::text[])[1 + (g * 13) % :k] || ' ' || g) "
+                    "FROM generate_series(1, :n) g"
+                ),
+                {"w": WORDS, "k": len(WORDS), "n": n},
+            )
+            conn.execute(text("ANALYZE evento"))
+
+        for fase in ("sin índice", "GIN trigram"):
+            with engine.begin() as conn:
+                conn.execute(text("SET search_path TO bench_search, public"))
+                if fase == "GIN trigram":
+                    conn.execute(text("CREATE INDEX ON evento USING gin (f_unaccent(evento_nombre) gin_trgm_ops)"))
+                    conn.execute(text("ANALYZE evento"))
+                print(f" [{fase}]")
+                for q in QUERIES:
+                    for fuzzy in (False, True):
+                        stmt = _stmt(q, fuzzy)
+                        tiempos = _timed(lambda: conn.execute(stmt).all(), runs)
+                        _report(f"{q!r}{' ~' if fuzzy else ''}", tiempos)
+                plan = conn.execute(text(
+                    "EXPLAIN SELECT evento_id FROM evento WHERE f_unaccent(evento_nombre) ILIKE f_unaccent('%algebra%')"
+                )).scalars().all()
+                print("  plan: " + " | ".join(line.strip() for line in plan[:3]))
+
+    with engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA IF EXISTS bench_search CASCADE"))
+
+
+def bench_sqlite(sizes: List[int], runs: int) -> None:
+    rnd = random.Random(42)
+    for n in sizes:
+        engine = create_engine("sqlite://", future=True)
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE evento (evento_id INTEGER PRIMARY KEY, evento_nombre TEXT NOT NULL)"))
+            conn.execute(
+                text("INSERT INTO evento VALUES (:i, :nombre)"),
+                [{"i": i, "nombre": f"{rnd.choice(WORDS).title()} {rnd.choice(WORDS)} {i}"} for i in range(1, n + 1)],
+            )
+        print(f"\n== SQLite (fallback LIKE), {n:,} eventos ==")
+        with engine.connect() as conn:
+            for q in QUERIES:
+                stmt = _stmt(q, fuzzy=False)
+                hits = len(conn.execute(stmt).all())
+                _report(f"{q!r} ({hits} hits)", _timed(lambda: conn.execute(stmt).all(), runs))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=None)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--sqlite", action="store_true", help="medir el fallback sin Postgres")
+    args = parser.parse_args()
+
+    if args.sqlite:
+        bench_sqlite(args.sizes or [10_000, 100_000], args.runs)
+        return
+    url = os.getenv("BENCH_DATABASE_URL")
+    if not url:
+        parser.error("definí BENCH_DATABASE_URL (o usá --sqlite)")
+    bench_postgres(url, args.sizes or [10_000, 100_000, 1_000_000], args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+-- 0001_llm_cache.sql
+-- Tier Postgres (opcional, LLM_CACHE_DB=1) del cache de tool calls del LLM.
+CREATE TABLE IF NOT EXISTS llm_cache (
+    cache_key        VARCHAR(64) PRIMARY KEY,
+    cache_tool_calls JSON        NOT NULL,
+    cache_expires_at TIMESTAMPTZ NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_llm_cache_expires ON llm_cache (cache_expires_at);
@@ -0,0 +1,11 @@
+-- 0002_auth_cache_version.sql
+-- Contador compartido del cache de usuarios autenticados (auth_cache.py).
+-- Cada invalidación lo incrementa; los demás workers vacían su cache al ver el cambio.
+CREATE TABLE IF NOT EXISTS auth_cache_version (
+    version_id    INTEGER PRIMARY KEY,
+    version_value BIGINT  NOT NULL DEFAULT 0
+);
+
+INSERT INTO auth_cache_version (version_id, version_value)
+VALUES (1, 0)
+ON CONFLICT (version_id) DO NOTHING;
@@ -0,0 +1,3 @@
+-- 0003_usuario_version.sql
+-- Versión del perfil del usuario; se firma en el access token (claim "pver").
+ALTER TABLE usuario ADD COLUMN IF NOT EXISTS usuario_version INTEGER NOT NULL DEFAULT 0;
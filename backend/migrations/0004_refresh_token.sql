@@ -0,0 +1,18 @@
+-- 0004_refresh_token.sql
+-- Refresh tokens opacos con rotación y detección de reuso (services/refresh_service.py).
+CREATE TABLE IF NOT EXISTS refresh_token (
+    token_id         SERIAL PRIMARY KEY,
+    token_usuario_id INTEGER     NOT NULL REFERENCES usuario (usuario_id) ON DELETE CASCADE ON UPDATE CASCADE,
+    token_hash       VARCHAR(64) NOT NULL,
+    token_familia    VARCHAR(32) NOT NULL,
+    token_expires_at TIMESTAMPTZ NOT NULL,
+    token_revoked_at TIMESTAMPTZ NULL,
+    token_created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_refresh_token_hash ON refresh_token (token_hash);
+
+-- Solo tokens activos: revocar una familia toca pocas filas y el índice se mantiene chico
+CREATE INDEX IF NOT EXISTS idx_refresh_token_familia_activos
+    ON refresh_token (token_familia)
+    WHERE token_revoked_at IS NULL;
@@ -0,0 +1,10 @@
+-- 0005_rate_limit_bucket.sql
+-- Backend compartido del rate limiter de /login (rate_limit.DbBackend, LOGIN_RATE_BACKEND=db).
+-- Una fila por clave (ip/email hasheados) con el theoretical arrival time del GCRA.
+CREATE TABLE IF NOT EXISTS rate_limit_bucket (
+    bucket_key VARCHAR(64) PRIMARY KEY,
+    bucket_tat TIMESTAMPTZ NOT NULL
+);
+
+-- Limpieza periódica sugerida:
+-- DELETE FROM rate_limit_bucket WHERE bucket_tat < now();
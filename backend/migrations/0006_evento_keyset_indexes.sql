@@ -0,0 +1,10 @@
+-- 0006_evento_keyset_indexes.sql
+-- Índice para la paginación keyset de eventos de una materia sobre (evento_fecha, evento_id).
+-- CONCURRENTLY: no bloquea escrituras (ejecutar fuera de una transacción).
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_evento_materia_fecha_id
+    ON evento (evento_materia_id, evento_fecha, evento_id);
+
+-- Los índices simples sobre evento_materia_id quedan cubiertos como prefijo del
+-- anterior (incluido el lookup del FK en borrados en cascada): solo suman costo de escritura
+DROP INDEX CONCURRENTLY IF EXISTS idx_evento_materia;
+DROP INDEX CONCURRENTLY IF EXISTS ix_evento_evento_materia_id;
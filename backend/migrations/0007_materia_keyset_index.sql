@@ -0,0 +1,5 @@
+-- 0007_materia_keyset_index.sql
+-- Paginación keyset de materias sobre (materia_nombre, materia_id), filtrada por usuario.
+-- CONCURRENTLY: no bloquea escrituras (ejecutar fuera de una transacción).
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_materia_usuario_nombre_id
+    ON materia (materia_usuario_id, materia_nombre, materia_id);
@@ -0,0 +1,19 @@
+-- 0008_search_trgm.sql
+-- Búsqueda por nombre con pg_trgm + unaccent (services/search_service.py, SEARCH_BACKEND=trgm).
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
+-- unaccent() es STABLE (depende del diccionario); el wrapper IMMUTABLE con el
+-- diccionario fijo permite usarlo en índices de expresión.
+CREATE OR REPLACE FUNCTION f_unaccent(text)
+RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$;
+
+-- GIN trigram: acelera ILIKE '%q%' y el operador de similitud % sobre la expresión
+-- (CONCURRENTLY: ejecutar fuera de una transacción)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_evento_nombre_trgm
+    ON evento USING gin (f_unaccent(evento_nombre) gin_trgm_ops);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_materia_nombre_trgm
+    ON materia USING gin (f_unaccent(materia_nombre) gin_trgm_ops);
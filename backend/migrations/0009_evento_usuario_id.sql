@@ -0,0 +1,69 @@
+-- 0009_evento_usuario_id.sql
+-- Dueño denormalizado en evento (= materia.materia_usuario_id) para queries por
+-- usuario sin join. Pasos pensados para tablas grandes con la app en línea.
+
+-- 1) Columna nullable (no reescribe la tabla)
+ALTER TABLE evento ADD COLUMN IF NOT EXISTS evento_usuario_id INTEGER;
+
+-- 2) Trigger: mantiene la columna consistente con la materia en INSERT y cuando
+--    cambia evento_materia_id (cubre también escrituras que no pasen por la app)
+CREATE OR REPLACE FUNCTION evento_set_usuario_id() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    SELECT m.materia_usuario_id INTO NEW.evento_usuario_id
+    FROM materia m
+    WHERE m.materia_id = NEW.evento_materia_id;
+    RETURN NEW;
+END $$;
+
+DROP TRIGGER IF EXISTS trg_evento_usuario_id ON evento;
+CREATE TRIGGER trg_evento_usuario_id
+    BEFORE INSERT OR UPDATE OF evento_materia_id ON evento
+    FOR EACH ROW EXECUTE FUNCTION evento_set_usuario_id();
+
+-- Si una materia cambia de dueño, sus eventos la siguen
+CREATE OR REPLACE FUNCTION materia_propagar_usuario_id() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE evento SET evento_usuario_id = NEW.materia_usuario_id
+    WHERE evento_materia_id = NEW.materia_id;
+    RETURN NEW;
+END $$;
+
+DROP TRIGGER IF EXISTS trg_materia_usuario_id ON materia;
+CREATE TRIGGER trg_materia_usuario_id
+    AFTER UPDATE OF materia_usuario_id ON materia
+    FOR EACH ROW
+    WHEN (OLD.materia_usuario_id IS DISTINCT FROM NEW.materia_usuario_id)
+    EXECUTE FUNCTION materia_propagar_usuario_id();
+
+-- 3) Backfill de filas existentes (re-ejecutable; en tablas muy grandes correrlo por lotes de id)
+UPDATE evento e
+SET evento_usuario_id = m.materia_usuario_id
+FROM materia m
+WHERE m.materia_id = e.evento_materia_id
+  AND e.evento_usuario_id IS DISTINCT FROM m.materia_usuario_id;
+
+-- 4) NOT NULL + FK sin escaneo bajo lock fuerte. SET NOT NULL y ADD FOREIGN KEY
+--    validan toda la tabla con ACCESS EXCLUSIVE / SHARE ROW EXCLUSIVE; en cambio
+--    ADD ... NOT VALID es instantáneo y VALIDATE CONSTRAINT escanea con
+--    SHARE UPDATE EXCLUSIVE (no bloquea lecturas ni escrituras).
+ALTER TABLE evento DROP CONSTRAINT IF EXISTS evento_usuario_id_not_null;
+ALTER TABLE evento
+    ADD CONSTRAINT evento_usuario_id_not_null CHECK (evento_usuario_id IS NOT NULL) NOT VALID;
+ALTER TABLE evento VALIDATE CONSTRAINT evento_usuario_id_not_null;
+-- PG12+: con el CHECK ya validado, SET NOT NULL no vuelve a escanear (lock breve)
+ALTER TABLE evento ALTER COLUMN evento_usuario_id SET NOT NULL;
+ALTER TABLE evento DROP CONSTRAINT evento_usuario_id_not_null;
+
+ALTER TABLE evento DROP CONSTRAINT IF EXISTS evento_evento_usuario_id_fkey;
+ALTER TABLE evento
+    ADD CONSTRAINT evento_evento_usuario_id_fkey
+    FOREIGN KEY (evento_usuario_id) REFERENCES usuario (usuario_id)
+    ON DELETE CASCADE ON UPDATE CASCADE
+    NOT VALID;
+ALTER TABLE evento VALIDATE CONSTRAINT evento_evento_usuario_id_fkey;
+
+-- 5) Índice de "todos mis eventos por fecha" (fuera de transacción por CONCURRENTLY)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_evento_usuario_fecha_id
+    ON evento (evento_usuario_id, evento_fecha, evento_id);
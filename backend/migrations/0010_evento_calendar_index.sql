@@ -0,0 +1,12 @@
+-- 0010_evento_calendar_index.sql
+-- /api/v1/events/range: rango de fechas por dueño. En vez de un segundo índice
+-- sobre (evento_usuario_id, evento_fecha), se reconstruye el de 0009 con INCLUDE
+-- de las columnas del formato columnar: el mismo índice sirve al keyset de
+-- /events/all y al calendario compacto como index-only scan.
+-- CONCURRENTLY: ejecutar fuera de una transacción.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_evento_usuario_fecha_id_new
+    ON evento (evento_usuario_id, evento_fecha, evento_id)
+    INCLUDE (evento_materia_id, evento_estado);
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_evento_usuario_fecha_id;
+ALTER INDEX idx_evento_usuario_fecha_id_new RENAME TO idx_evento_usuario_fecha_id;
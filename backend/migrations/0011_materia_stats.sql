@@ -0,0 +1,79 @@
+-- 0011_materia_stats.sql
+-- Resumen por materia de eventos por estado para /api/v1/stats (STATS_SUMMARY_TABLE=1).
+-- Lo mantienen triggers sobre evento: cada escritura ajusta +-1 en la fila de su
+-- materia, así leer el dashboard cuesta O(materias) y no O(eventos).
+-- Los pendientes vencidos dependen de la fecha actual y no se guardan acá.
+
+CREATE TABLE IF NOT EXISTS materia_stats (
+    stats_materia_id   INTEGER PRIMARY KEY
+        REFERENCES materia (materia_id) ON DELETE CASCADE ON UPDATE CASCADE,
+    stats_usuario_id   INTEGER NOT NULL,
+    stats_pendiente    INTEGER NOT NULL DEFAULT 0,
+    stats_aprobado     INTEGER NOT NULL DEFAULT 0,
+    stats_desaprobado  INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_materia_stats_usuario ON materia_stats (stats_usuario_id);
+
+-- Suma `delta` al contador de `estado` en la materia (crea la fila si no existe)
+CREATE OR REPLACE FUNCTION materia_stats_ajustar(p_materia INTEGER, p_usuario INTEGER, p_estado evento_estado, delta INTEGER)
+RETURNS void LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO materia_stats AS s (stats_materia_id, stats_usuario_id, stats_pendiente, stats_aprobado, stats_desaprobado)
+    VALUES (
+        p_materia, p_usuario,
+        CASE WHEN p_estado = 'pendiente'   THEN delta ELSE 0 END,
+        CASE WHEN p_estado = 'aprobado'    THEN delta ELSE 0 END,
+        CASE WHEN p_estado = 'desaprobado' THEN delta ELSE 0 END
+    )
+    ON CONFLICT (stats_materia_id) DO UPDATE SET
+        stats_usuario_id  = EXCLUDED.stats_usuario_id,
+        stats_pendiente   = s.stats_pendiente   + EXCLUDED.stats_pendiente,
+        stats_aprobado    = s.stats_aprobado    + EXCLUDED.stats_aprobado,
+        stats_desaprobado = s.stats_desaprobado + EXCLUDED.stats_desaprobado;
+END $$;
+
+CREATE OR REPLACE FUNCTION evento_materia_stats() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        -- La materia pudo haberse borrado en cascada: no recrear su fila
+        IF EXISTS (SELECT 1 FROM materia WHERE materia_id = OLD.evento_materia_id) THEN
+            PERFORM materia_stats_ajustar(OLD.evento_materia_id, OLD.evento_usuario_id, OLD.evento_estado, -1);
+        END IF;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM materia_stats_ajustar(NEW.evento_materia_id, NEW.evento_usuario_id, NEW.evento_estado, 1);
+    END IF;
+    RETURN NULL;
+END $$;
+
+DROP TRIGGER IF EXISTS trg_evento_materia_stats_ins_del ON evento;
+CREATE TRIGGER trg_evento_materia_stats_ins_del
+    AFTER INSERT OR DELETE ON evento
+    FOR EACH ROW EXECUTE FUNCTION evento_materia_stats();
+
+DROP TRIGGER IF EXISTS trg_evento_materia_stats_upd ON evento;
+CREATE TRIGGER trg_evento_materia_stats_upd
+    AFTER UPDATE OF evento_estado, evento_materia_id, evento_usuario_id ON evento
+    FOR EACH ROW
+    WHEN (OLD.evento_estado IS DISTINCT FROM NEW.evento_estado
+          OR OLD.evento_materia_id IS DISTINCT FROM NEW.evento_materia_id
+          OR OLD.evento_usuario_id IS DISTINCT FROM NEW.evento_usuario_id)
+    EXECUTE FUNCTION evento_materia_stats();
+
+-- Backfill (re-ejecutable: recalcula desde cero). Hacerlo con las escrituras
+-- pausadas o en la misma transacción que crea los triggers.
+INSERT INTO materia_stats (stats_materia_id, stats_usuario_id, stats_pendiente, stats_aprobado, stats_desaprobado)
+SELECT m.materia_id, m.materia_usuario_id,
+       count(*) FILTER (WHERE e.evento_estado = 'pendiente'),
+       count(*) FILTER (WHERE e.evento_estado = 'aprobado'),
+       count(*) FILTER (WHERE e.evento_estado = 'desaprobado')
+FROM materia m
+LEFT JOIN evento e ON e.evento_materia_id = m.materia_id
+GROUP BY m.materia_id, m.materia_usuario_id
+ON CONFLICT (stats_materia_id) DO UPDATE SET
+    stats_usuario_id  = EXCLUDED.stats_usuario_id,
+    stats_pendiente   = EXCLUDED.stats_pendiente,
+    stats_aprobado    = EXCLUDED.stats_aprobado,
+    stats_desaprobado = EXCLUDED.stats_desaprobado;
@@ -0,0 +1,108 @@
+-- 0012_delta_sync.sql
+-- Delta-sync para /api/v1/sync: updated_at + txid de la última escritura en
+-- materia/evento y tombstones para los borrados.
+--
+-- Por qué txid y no updated_at/secuencia como cursor: dos transacciones pueden
+-- commitear en distinto orden que el de sus timestamps (o nextval), y un cliente
+-- que ya avanzó su cursor se perdería la que commiteó tarde. El servicio solo
+-- entrega ventanas [desde, xmin del snapshot): todas las transacciones con txid
+-- menor a ese xmin ya terminaron, así ninguna fila puede aparecer después dentro
+-- de una ventana ya entregada. txid_current() es de 64 bits (con época): no hay wraparound.
+
+-- 1) Columnas (DEFAULT no volátil en ADD COLUMN: no reescribe la tabla en PG11+;
+--    el default real lo pone el trigger)
+ALTER TABLE materia ADD COLUMN IF NOT EXISTS materia_updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
+ALTER TABLE materia ADD COLUMN IF NOT EXISTS materia_sync_txid BIGINT NOT NULL DEFAULT 0;
+ALTER TABLE evento ADD COLUMN IF NOT EXISTS evento_updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
+ALTER TABLE evento ADD COLUMN IF NOT EXISTS evento_sync_txid BIGINT NOT NULL DEFAULT 0;
+
+ALTER TABLE materia ALTER COLUMN materia_sync_txid SET DEFAULT txid_current();
+ALTER TABLE evento ALTER COLUMN evento_sync_txid SET DEFAULT txid_current();
+
+-- 2) Sello de cada escritura (cubre también escrituras que no pasen por la app)
+CREATE OR REPLACE FUNCTION materia_sync_stamp() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.materia_updated_at := now();
+    NEW.materia_sync_txid := txid_current();
+    RETURN NEW;
+END $$;
+
+DROP TRIGGER IF EXISTS trg_materia_sync_stamp ON materia;
+CREATE TRIGGER trg_materia_sync_stamp
+    BEFORE INSERT OR UPDATE ON materia
+    FOR EACH ROW EXECUTE FUNCTION materia_sync_stamp();
+
+CREATE OR REPLACE FUNCTION evento_sync_stamp() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.evento_updated_at := now();
+    NEW.evento_sync_txid := txid_current();
+    RETURN NEW;
+END $$;
+
+-- El nombre ordena después de trg_evento_usuario_id (0009): los BEFORE corren
+-- en orden alfabético, así se sella con el dueño ya resuelto
+DROP TRIGGER IF EXISTS trg_evento_zsync_stamp ON evento;
+CREATE TRIGGER trg_evento_zsync_stamp
+    BEFORE INSERT OR UPDATE ON evento
+    FOR EACH ROW EXECUTE FUNCTION evento_sync_stamp();
+
+-- 3) Tombstones
+CREATE TABLE IF NOT EXISTS sync_tombstone (
+    tombstone_id          BIGSERIAL PRIMARY KEY,
+    tombstone_usuario_id  INTEGER NOT NULL,
+    tombstone_tabla       VARCHAR(16) NOT NULL,
+    tombstone_entidad_id  INTEGER NOT NULL,
+    tombstone_sync_txid   BIGINT NOT NULL DEFAULT txid_current(),
+    tombstone_deleted_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_sync_tombstone_usuario_txid ON sync_tombstone (tombstone_usuario_id, tombstone_sync_txid);
+CREATE INDEX IF NOT EXISTS idx_sync_tombstone_deleted_at ON sync_tombstone (tombstone_deleted_at);
+
+-- Borrado, o cambio de dueño (el dueño anterior tiene que quitar la fila)
+CREATE OR REPLACE FUNCTION sync_registrar_tombstone() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'materia' THEN
+        INSERT INTO sync_tombstone (tombstone_usuario_id, tombstone_tabla, tombstone_entidad_id)
+        VALUES (OLD.materia_usuario_id, 'materia', OLD.materia_id);
+    ELSE
+        INSERT INTO sync_tombstone (tombstone_usuario_id, tombstone_tabla, tombstone_entidad_id)
+        VALUES (OLD.evento_usuario_id, 'evento', OLD.evento_id);
+    END IF;
+    RETURN NULL;
+END $$;
+
+DROP TRIGGER IF EXISTS trg_materia_sync_tombstone ON materia;
+CREATE TRIGGER trg_materia_sync_tombstone
+    AFTER DELETE ON materia
+    FOR EACH ROW EXECUTE FUNCTION sync_registrar_tombstone();
+
+DROP TRIGGER IF EXISTS trg_materia_sync_tombstone_owner ON materia;
+CREATE TRIGGER trg_materia_sync_tombstone_owner
+    AFTER UPDATE OF materia_usuario_id ON materia
+    FOR EACH ROW
+    WHEN (OLD.materia_usuario_id IS DISTINCT FROM NEW.materia_usuario_id)
+    EXECUTE FUNCTION sync_registrar_tombstone();
+
+DROP TRIGGER IF EXISTS trg_evento_sync_tombstone ON evento;
+CREATE TRIGGER trg_evento_sync_tombstone
+    AFTER DELETE ON evento
+    FOR EACH ROW EXECUTE FUNCTION sync_registrar_tombstone();
+
+DROP TRIGGER IF EXISTS trg_evento_sync_tombstone_owner ON evento;
+CREATE TRIGGER trg_evento_sync_tombstone_owner
+    AFTER UPDATE OF evento_usuario_id ON evento
+    FOR EACH ROW
+    WHEN (OLD.evento_usuario_id IS DISTINCT FROM NEW.evento_usuario_id)
+    EXECUTE FUNCTION sync_registrar_tombstone();
+
+-- 4) Índices de la ventana por usuario (fuera de transacción por CONCURRENTLY).
+--    Las filas existentes quedan con txid 0: entran en la primera sync completa,
+--    paginadas por id dentro de ese txid como cualquier transacción grande.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_materia_usuario_sync
+    ON materia (materia_usuario_id, materia_sync_txid, materia_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_evento_usuario_sync
+    ON evento (evento_usuario_id, evento_sync_txid, evento_id);
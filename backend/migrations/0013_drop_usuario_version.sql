@@ -0,0 +1,5 @@
+-- 0013_drop_usuario_version.sql
+-- El claim "pver" (0003) ya no se firma en el access token: nada comparaba la
+-- versión de perfil y el principal stateless solo lleva usuario_id.
+-- DROP COLUMN solo toca el catálogo (no reescribe la tabla).
+ALTER TABLE usuario DROP COLUMN IF EXISTS usuario_version;
@@ -1,4 +1,5 @@
 # auth.py Este es una prueba de edición
+import logging
 import os
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Optional
@@ -9,7 +10,10 @@ from sqlalchemy.orm import Session
 from sqlalchemy import select
 from jose import jwt, JWTError
 
-from . import models, utils, database, schemas
+from . import models, database, schemas
+from .auth_cache import UsuarioPrincipal, token_cache, user_cache
+from .password_pool import password_pool
+from .services import refresh_service
 
 class InvalidCredentialsError(Exception):
     """Excepción para credenciales inválidas"""
@@ -39,7 +43,12 @@ def crear_token(subject: str, minutos_expira: int = ACCESS_TOKEN_EXPIRE_MINUTES,
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
 def decodificar_token(token: str) -> Dict[str, Any]:
-    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    # Hit: claims ya verificados y no vencidos (exp se re-chequea en cada hit)
+    claims = token_cache.get(token)
+    if claims is None:
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        token_cache.set(token, claims)
+    return claims
 
 # =========================
 # Core de autenticación
@@ -52,30 +61,71 @@ def _buscar_usuario_por_email(db: Session, email: str) -> Optional[models.Usuari
 def _buscar_usuario_por_id(db: Session, usuario_id: int) -> Optional[models.Usuario]:
     return db.get(models.Usuario, usuario_id)
 
+def _actualizar_hash(db: Session, usuario: models.Usuario, nuevo_hash: str) -> None:
+    """Migra el hash a la política actual (esquema/rounds). Si falla, el login sigue igual."""
+    try:
+        usuario.usuario_password = nuevo_hash
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logging.warning(f"login_user: No se pudo actualizar el hash del usuario {usuario.usuario_id}: {str(e)}")
+
 def login_user(request: schemas.LoginRequest, db: Session):
     usuario = _buscar_usuario_por_email(db, request.email)
-    if not usuario or not utils.verificar_clave(request.password, usuario.usuario_password):
+    # pbkdf2 corre en el pool de procesos (PasswordPoolSaturado si está lleno)
+    if not usuario:
         # Mensaje genérico para no filtrar existencia
         raise InvalidCredentialsError("Credenciales inválidas")
+    ok, nuevo_hash = password_pool.verify_and_update(request.password, usuario.usuario_password)
+    if not ok:
+        raise InvalidCredentialsError("Credenciales inválidas")
+    if nuevo_hash:
+        _actualizar_hash(db, usuario, nuevo_hash)
+
+    return _emitir_par(usuario.usuario_id, usuario.usuario_nombre, refresh_service.emitir(db, usuario.usuario_id))
+
+def refrescar_tokens(db: Session, refresh_token: str):
+    """
+    Rota el refresh token y emite un access token nuevo: un lookup indexado,
+    sin verificación de contraseña. Propaga RefreshTokenInvalido / RefreshTokenReutilizado.
+    """
+    usuario_id, nombre, nuevo_refresh = refresh_service.rotar(db, refresh_token)
+    return _emitir_par(usuario_id, nombre, nuevo_refresh)
 
+def _emitir_par(usuario_id: int, nombre: str, refresh_token: str) -> Dict[str, Any]:
     # sub = id (recomendado); puedes agregar claims no sensibles si querés
-    token = crear_token(subject=str(usuario.usuario_id), extra={
-        "username": usuario.usuario_nombre
+    token = crear_token(subject=str(usuario_id), extra={
+        "username": nombre
     })
 
     # Respuesta consistente con tu schema TokenResponse
     return {
         "access_token": token,
         "token_type": "Bearer",
+        "refresh_token": refresh_token,
     }
 
-def get_current_user(
-    creds: HTTPAuthorizationCredentials = Depends(_http_bearer),
-    db: Session = Depends(database.get_db),
-):
+class Principal:
     """
-    Lee Authorization: Bearer <token>, valida y retorna el usuario.
+    Identidad mínima del request, armada solo con claims firmados del JWT (sin DB).
+    Inmutable y con __slots__: es barata de crear en cada request.
+    Solo lleva el id (no cambia nunca): datos de perfil como el nombre pueden
+    quedar viejos en el token, para eso está get_current_user.
     """
+    __slots__ = ("usuario_id",)
+
+    def __init__(self, usuario_id: int):
+        object.__setattr__(self, "usuario_id", usuario_id)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("Principal es inmutable")
+
+    def __repr__(self) -> str:
+        return f"<Principal id={self.usuario_id}>"
+
+
+def _claims_desde_credenciales(creds: Optional[HTTPAuthorizationCredentials]) -> Dict[str, Any]:
+    """Valida el header Bearer y retorna los claims (con 'sub' garantizado)."""
     if creds is None or creds.scheme.lower() != "bearer":
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="No autenticado")
 
@@ -88,10 +138,42 @@ def get_current_user(
     sub = claims.get("sub")
     if not sub:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido (sin sub)")
+    return claims
 
-    usuario = _buscar_usuario_por_id(db, int(sub))
-    if not usuario:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuario no encontrado")
+
+async def get_current_principal(
+    creds: HTTPAuthorizationCredentials = Depends(_http_bearer),
+) -> Principal:
+    """
+    Modo stateless: para endpoints que solo necesitan usuario_id.
+    No abre sesión ni consulta la DB (async: no pasa por el threadpool).
+    """
+    claims = _claims_desde_credenciales(creds)
+    try:
+        return Principal(usuario_id=int(claims["sub"]))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token inválido (sub)")
+
+
+def get_current_user(
+    creds: HTTPAuthorizationCredentials = Depends(_http_bearer),
+    db: Session = Depends(database.get_db),
+) -> UsuarioPrincipal:
+    """
+    Lee Authorization: Bearer <token>, valida y retorna el usuario completo
+    (UsuarioPrincipal inmutable, no la fila ORM). Para /me y /profile.
+    """
+    claims = _claims_desde_credenciales(creds)
+
+    usuario_id = int(claims["sub"])
+    # Cache de principals: la mayoría de los requests no tocan la tabla usuario
+    # (la Session no abre conexión hasta el primer uso; el chequeo de versión compartida la reutiliza)
+    usuario = user_cache.get(usuario_id, db)
+    if usuario is None:
+        row = _buscar_usuario_por_id(db, usuario_id)
+        if not row:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuario no encontrado")
+        usuario = user_cache.set(UsuarioPrincipal.from_model(row))
 
     # (Opcional) si tienes un flag de activo:
     # if not usuario.activo: raise HTTPException(status_code=403, detail="Usuario inactivo")
@@ -0,0 +1,227 @@
+# backend/smartfocusBackend/auth_cache.py
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from . import database, models
+
+
+@dataclass(frozen=True)
+class UsuarioPrincipal:
+    """
+    Foto inmutable del usuario autenticado (sin password).
+    Tiene los mismos atributos que UsuarioResponse, así /me la serializa tal cual.
+    """
+    usuario_id: int
+    usuario_nombre: str
+    usuario_email: str
+    usuario_daltonismo: models.TipoDaltonismo
+    usuario_created_at: datetime
+
+    @classmethod
+    def from_model(cls, usuario: models.Usuario) -> "UsuarioPrincipal":
+        return cls(
+            usuario_id=usuario.usuario_id,
+            usuario_nombre=usuario.usuario_nombre,
+            usuario_email=usuario.usuario_email,
+            usuario_daltonismo=usuario.usuario_daltonismo,
+            usuario_created_at=usuario.usuario_created_at,
+        )
+
+
+class UserPrincipalCache:
+    """
+    Cache de usuarios autenticados por usuario_id.
+    - LRU en memoria con TTL y tamaño máximo (por proceso).
+    - Coordinación entre workers (AUTH_CACHE_SHARED=1): cada invalidación incrementa
+      auth_cache_version; como mucho cada sync_seconds cada worker lee el contador y,
+      si cambió, vacía su cache. El TTL acota la staleness si la DB no responde.
+      La lectura usa la Session del request que autentica (no abre otra conexión):
+      a lo sumo un request por worker cada sync_seconds paga ese SELECT.
+    """
+
+    def __init__(self, *, max_entries: int = 4096, ttl_seconds: int = 60,
+                 sync_seconds: float = 5.0, shared: bool = True):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.sync_seconds = sync_seconds
+        self.shared = shared
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._entries: "OrderedDict[int, Tuple[float, UsuarioPrincipal]]" = OrderedDict()
+        self._known_version: Optional[int] = None
+        self._next_sync = 0.0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0,
+                       "invalidations": 0, "flushes": 0}
+
+    # --- API ---
+    def get(self, usuario_id: int, db: Session) -> Optional[UsuarioPrincipal]:
+        if self.shared:
+            self._sync(db)
+        now = time.monotonic()
+        with self._lock:
+            item = self._entries.get(usuario_id)
+            if item is not None and item[0] <= now:
+                del self._entries[usuario_id]
+                self._stats["expirations"] += 1
+                item = None
+            if item is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(usuario_id)
+            self._stats["hits"] += 1
+            return item[1]
+
+    def set(self, principal: UsuarioPrincipal) -> UsuarioPrincipal:
+        with self._lock:
+            self._entries[principal.usuario_id] = (time.monotonic() + self.ttl_seconds, principal)
+            self._entries.move_to_end(principal.usuario_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+        return principal
+
+    def invalidate(self, usuario_id: int) -> None:
+        """Llamar después del commit que modificó al usuario."""
+        with self._lock:
+            self._entries.pop(usuario_id, None)
+            self._stats["invalidations"] += 1
+        if self.shared:
+            self._bump_shared()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "size": len(self._entries), "max_entries": self.max_entries,
+                    "shared": self.shared, "version": self._known_version}
+
+    # --- internos ---
+    def _sync(self, db: Session) -> None:
+        if time.monotonic() < self._next_sync:
+            return
+        # Un solo thread consulta la DB; el resto sigue con lo que hay en memoria
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            self._next_sync = time.monotonic() + self.sync_seconds
+            version = self._db_read_version(db)
+            if version is None:
+                return
+            with self._lock:
+                if self._known_version is not None and version != self._known_version:
+                    self._entries.clear()
+                    self._stats["flushes"] += 1
+                self._known_version = version
+        finally:
+            self._sync_lock.release()
+
+    def _db_read_version(self, db: Session) -> Optional[int]:
+        try:
+            stmt = select(models.AuthCacheVersion.version_value).where(models.AuthCacheVersion.version_id == 1)
+            return db.execute(stmt).scalar_one_or_none()
+        except Exception as e:
+            # Que el error no deje abortada la transacción del request
+            db.rollback()
+            logging.warning(f"UserPrincipalCache: Error leyendo versión compartida: {str(e)}")
+            return None
+
+    def _bump_shared(self) -> None:
+        # Sesión propia: corre después del commit del llamador (solo en invalidaciones, no en el hot path)
+        try:
+            with database.SessionLocal() as db:
+                stmt = (
+                    update(models.AuthCacheVersion)
+                    .where(models.AuthCacheVersion.version_id == 1)
+                    .values(version_value=models.AuthCacheVersion.version_value + 1)
+                    .returning(models.AuthCacheVersion.version_value)
+                )
+                version = db.execute(stmt).scalar_one_or_none()
+                db.commit()
+        except Exception as e:
+            logging.warning(f"UserPrincipalCache: Error incrementando versión compartida: {str(e)}")
+            return
+        with self._lock:
+            # Si nadie más invalidó en el medio, este worker ya está al día
+            if version is not None and self._known_version is not None and version == self._known_version + 1:
+                self._known_version = version
+
+
+class DecodedTokenCache:
+    """
+    LRU de claims ya verificados, por digest del token (sha256; el token no queda en memoria).
+    Saca la verificación HMAC del hot path: un mismo cliente manda el mismo bearer
+    cientos de veces por sesión. Cada hit vuelve a chequear 'exp' contra el reloj;
+    solo se cachean tokens que pasaron jwt.decode y traen 'exp'.
+    """
+
+    def __init__(self, *, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[bytes, Tuple[int, Dict[str, Any]]]" = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        key = self._digest(token)
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None and item[0] <= time.time():
+                # Vencido: que lo rechace jwt.decode con su error habitual
+                del self._entries[key]
+                self._stats["expirations"] += 1
+                item = None
+            if item is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return dict(item[1])
+
+    def set(self, token: str, claims: Dict[str, Any]) -> None:
+        exp = claims.get("exp")
+        if not isinstance(exp, (int, float)) or self.max_entries <= 0:
+            return
+        key = self._digest(token)
+        with self._lock:
+            self._entries[key] = (exp, dict(claims))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "size": len(self._entries), "max_entries": self.max_entries}
+
+# Instancia compartida del proceso
+user_cache = UserPrincipalCache(
+    max_entries=int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "4096")),
+    ttl_seconds=int(os.getenv("AUTH_CACHE_TTL_SECONDS", "60")),
+    sync_seconds=float(os.getenv("AUTH_CACHE_SYNC_SECONDS", "5")),
+    shared=os.getenv("AUTH_CACHE_SHARED", "1").lower() in ("1", "true", "yes"),
+)
+
+token_cache = DecodedTokenCache(
+    max_entries=int(os.getenv("JWT_CACHE_MAX_ENTRIES", "2048")),
+)
@@ -1,6 +1,7 @@
 # database.py
 import os
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 DB_USER = os.getenv("DB_USER")
@@ -12,6 +13,10 @@ DB_NAME = os.getenv("DB_NAME")
 SQLALCHEMY_DATABASE_URL = (
     f"postgresql+psycopg2://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 )
+# Misma base, driver asyncpg (endpoints async que no deben pasar por el threadpool)
+SQLALCHEMY_ASYNC_DATABASE_URL = (
+    f"postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+)
 
 # ── Engine con settings seguros de pool ───────────────────────────────────────
 engine = create_engine(
@@ -32,6 +37,23 @@ SessionLocal = sessionmaker(
     future=True,
 )
 
+# ── Engine async (asyncpg) con los mismos settings de pool ───────────────────
+async_engine = create_async_engine(
+    SQLALCHEMY_ASYNC_DATABASE_URL,
+    pool_pre_ping=True,
+    pool_size=10,
+    max_overflow=20,
+    pool_recycle=1800,
+)
+
+# expire_on_commit=False: en async no hay lazy-load implícito tras el commit
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # Instancia db para models SQLAlchemy
 Base = declarative_base()
 
@@ -41,3 +63,7 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
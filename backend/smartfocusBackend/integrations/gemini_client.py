@@ -3,10 +3,45 @@ from __future__ import annotations
 
 import os
 import logging
+import threading
+from functools import lru_cache
 from typing import Any, Dict, List, Optional
 import google.generativeai as genai
 
 
+_SYSTEM_INSTRUCTION = (
+    "Eres un asistente especializado en gestión académica. Tu tarea es analizar las instrucciones "
+    "del usuario y usar las funciones que el usuario indique (tools) disponibles para realizar las acciones solicitadas. "
+    "\n\nFunciones disponibles:"
+    "\n- create_materia: crear nuevas materias (con descripción opcional)"
+    "\n- update_materia: modificar materias existentes"
+    "\n- delete_materia: eliminar materias"
+    "\n- create_evento: crear eventos (exámenes, parciales, etc.) con descripción opcional"
+    "\n- update_evento: modificar eventos existentes"
+    "\n- delete_evento: eliminar eventos"
+    "\n\nREGLAS IMPORTANTES:"
+    "\n1. SIEMPRE QUE SE ESPECIFIQUEN (no deben ser necesariamente especificadas textualmente iguales a como se encuentran en la base de datos) usa function calls para responder a las solicitudes del usuario"
+    "\n2. Si el usuario menciona una materia por nombre, usa 'materia_ref'"
+    "\n3. Las fechas deben estar en formato ISO 'YYYY-MM-DD'"
+    "\n4. Para eventos, usa estado 'pendiente' si no se especifica otro"
+    "\n5. Incluye descripciones cuando el usuario proporcione detalles adicionales sobre eventos o materias"
+    "\n6. Para modificar/eliminar eventos puedes usar:"
+    "\n   - 'evento_id' si se conoce el ID específico"
+    "\n   - 'evento_ref' con el nombre del evento"
+    "\n   - 'materia_ref' con el nombre de la materia (si tiene un solo evento)"
+    "\n   - Combinación de 'evento_ref' y 'materia_ref' para mayor precisión"
+    "\n7. NO respondas con texto normal, SOLO usa function calls"
+    "\n\nEjemplos:"
+    "\n- 'crear materia matemáticas' → usar create_materia"
+    "\n- 'agregar examen de física para mañana' → usar create_evento"
+    "\n- 'crear parcial de álgebra con calculadora permitida para el viernes' → usar create_evento con descripción"
+    "\n- 'cambiar el nombre de la materia historia' → usar update_materia"
+    "\n- 'borrar el parcial de química' → usar delete_evento con evento_ref='parcial' y materia_ref='química'"
+    "\n- 'eliminar el evento de matemáticas' → usar delete_evento con materia_ref='matemáticas'"
+    "\n- 'cambiar fecha del examen de física' → usar update_evento con evento_ref='examen' y materia_ref='física'"
+)
+
+
 class GeminiClient:
     """
     Adaptador mínimo para Gemini con Function Calling.
@@ -27,6 +62,8 @@ class GeminiClient:
             logging.info("GeminiClient: GEMINI_API_KEY no configurada en el entorno")
 
         model_name = "gemini-2.5-pro"
+        self.api_key = api_key
+        self.model_name = model_name
         
         genai.configure(api_key=api_key)
 
@@ -36,37 +73,7 @@ class GeminiClient:
             self.model = genai.GenerativeModel(
                 model_name=model_name,
                 tools=tools,
-                system_instruction=(
-                    "Eres un asistente especializado en gestión académica. Tu tarea es analizar las instrucciones "
-                    "del usuario y usar las funciones que el usuario indique (tools) disponibles para realizar las acciones solicitadas. "
-                    "\n\nFunciones disponibles:"
-                    "\n- create_materia: crear nuevas materias (con descripción opcional)"
-                    "\n- update_materia: modificar materias existentes"
-                    "\n- delete_materia: eliminar materias"
-                    "\n- create_evento: crear eventos (exámenes, parciales, etc.) con descripción opcional"
-                    "\n- update_evento: modificar eventos existentes"
-                    "\n- delete_evento: eliminar eventos"
-                    "\n\nREGLAS IMPORTANTES:"
-                    "\n1. SIEMPRE QUE SE ESPECIFIQUEN (no deben ser necesariamente especificadas textualmente iguales a como se encuentran en la base de datos) usa function calls para responder a las solicitudes del usuario"
-                    "\n2. Si el usuario menciona una materia por nombre, usa 'materia_ref'"
-                    "\n3. Las fechas deben estar en formato ISO 'YYYY-MM-DD'"
-                    "\n4. Para eventos, usa estado 'pendiente' si no se especifica otro"
-                    "\n5. Incluye descripciones cuando el usuario proporcione detalles adicionales sobre eventos o materias"
-                    "\n6. Para modificar/eliminar eventos puedes usar:"
-                    "\n   - 'evento_id' si se conoce el ID específico"
-                    "\n   - 'evento_ref' con el nombre del evento"
-                    "\n   - 'materia_ref' con el nombre de la materia (si tiene un solo evento)"
-                    "\n   - Combinación de 'evento_ref' y 'materia_ref' para mayor precisión"
-                    "\n7. NO respondas con texto normal, SOLO usa function calls"
-                    "\n\nEjemplos:"
-                    "\n- 'crear materia matemáticas' → usar create_materia"
-                    "\n- 'agregar examen de física para mañana' → usar create_evento"
-                    "\n- 'crear parcial de álgebra con calculadora permitida para el viernes' → usar create_evento con descripción"
-                    "\n- 'cambiar el nombre de la materia historia' → usar update_materia"
-                    "\n- 'borrar el parcial de química' → usar delete_evento con evento_ref='parcial' y materia_ref='química'"
-                    "\n- 'eliminar el evento de matemáticas' → usar delete_evento con materia_ref='matemáticas'"
-                    "\n- 'cambiar fecha del examen de física' → usar update_evento con evento_ref='examen' y materia_ref='física'"
-                    ),
+                system_instruction=_SYSTEM_INSTRUCTION,
             )
             logging.info(f"GeminiClient: Modelo '{model_name}' configurado exitosamente")
         except Exception as e:
@@ -89,10 +96,94 @@ class GeminiClient:
             logging.error(f"GeminiClient: Error al generar contenido con Gemini API: {str(e)}")
             return []
 
+    async def get_tool_calls_async(self, text: str, *, locale: str = "es-AR") -> List[Dict[str, Any]]:
+        """
+        Igual que get_tool_calls pero usando la generación async del SDK:
+        no bloquea el event loop ni ocupa un hilo durante el round trip a Gemini.
+        """
+        prompt = f"[locale={locale}] {text}".strip()
+        try:
+            resp = await self.model.generate_content_async(prompt)
+
+            tool_calls = _parse_tool_calls(resp)
+            logging.info(f"GeminiClient: Recibidas {len(tool_calls)} tool calls (async)")
+            return tool_calls
+        except Exception as e:
+            logging.error(f"GeminiClient: Error al generar contenido con Gemini API (async): {str(e)}")
+            return []
+
+
+class GeminiClientPool:
+    """
+    Mantiene un GeminiClient "caliente" compartido por todo el proceso
+    (modelo, tools y system instruction se construyen una sola vez).
+    - startup(): lo crea al arrancar la app (si falla, se reintenta en el primer get()).
+    - get(): devuelve el cliente; si cambió GEMINI_API_KEY en el entorno, lo recrea (hot reload).
+    - health(): estado para readiness/diagnóstico; deep=True consulta el modelo en la API.
+    genai.configure es global al proceso, así que alcanza con un cliente por (api_key, modelo).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._client: Optional[GeminiClient] = None
+        self._last_error: Optional[str] = None
+
+    def startup(self) -> None:
+        try:
+            self.get()
+        except Exception as e:
+            logging.warning(f"GeminiClientPool: no se pudo inicializar el cliente al arrancar: {str(e)}")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._client = None
+
+    def get(self) -> GeminiClient:
+        api_key = os.getenv("GEMINI_API_KEY")
+        client = self._client
+        if client is not None and client.api_key == api_key:
+            return client
+
+        with self._lock:
+            client = self._client
+            if client is not None and client.api_key == api_key:
+                return client
+            if client is not None:
+                logging.info("GeminiClientPool: GEMINI_API_KEY cambió, recreando el cliente")
+            try:
+                self._client = GeminiClient(api_key=api_key)
+                self._last_error = None
+            except Exception as e:
+                self._last_error = str(e)
+                raise
+            return self._client
+
+    def health(self, *, deep: bool = False) -> Dict[str, Any]:
+        client = self._client
+        if client is None:
+            return {"status": "unavailable", "error": self._last_error}
+        info: Dict[str, Any] = {
+            "status": "ok",
+            "model": client.model_name,
+            "stale_key": client.api_key != os.getenv("GEMINI_API_KEY"),
+        }
+        if deep:
+            try:
+                genai.get_model(f"models/{client.model_name}")
+            except Exception as e:
+                info.update(status="degraded", error=str(e))
+        return info
+
+
+# Instancia compartida del proceso (se inicializa en el lifespan de la app)
+gemini_pool = GeminiClientPool()
+
 
+@lru_cache(maxsize=1)
 def _tools_definitions() -> List[Dict[str, Any]]:
     """
     Declaración de tools alineada al contrato que espera nl_service._normalize_tool_call.
+    Se construye una sola vez por proceso (no mutar el resultado).
     """
     return [{
         "function_declarations": [
@@ -0,0 +1,151 @@
+# backend/smartfocusBackend/integrations/llm_cache.py
+from __future__ import annotations
+
+import copy
+import hashlib
+import logging
+import os
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from .. import database, models
+
+ToolCalls = List[Dict[str, Any]]
+
+
+def normalize_text(text: str) -> str:
+    """casefold + sin acentos + espacios colapsados: 'Agregar  Exámen' -> 'agregar examen'."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.casefold().split())
+
+
+def make_key(text: str, *, locale: str, today: date, catalog_version: str) -> str:
+    """
+    Clave del cache: texto normalizado + locale + fecha de referencia (resuelve
+    'mañana', 'el viernes', ...) + versión del catálogo del usuario.
+    """
+    raw = "|".join((normalize_text(text), locale, today.isoformat(), catalog_version))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ToolCallCache:
+    """
+    Cache de tool calls del LLM.
+    - Tier 1: LRU en memoria con TTL y tamaño máximo (por proceso).
+    - Tier 2 (opcional, LLM_CACHE_DB=1): tabla llm_cache en Postgres, compartida entre workers.
+    Nunca cachea respuestas vacías (el cliente Gemini devuelve [] ante errores).
+    """
+
+    def __init__(self, *, max_entries: int = 1024, ttl_seconds: int = 3600, db_enabled: bool = False):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_enabled = db_enabled
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, ToolCalls]]" = OrderedDict()
+        self._stats = {"hits": 0, "db_hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    # --- API ---
+    def get(self, key: str) -> Optional[ToolCalls]:
+        """Busca en memoria y, si está habilitado, en Postgres (I/O bloqueante)."""
+        value = self._get_local(key)
+        tier = "hits"
+        if value is None and self.db_enabled:
+            value = self._db_get(key)
+            if value is not None:
+                self._put_local(key, value)
+                tier = "db_hits"
+        with self._lock:
+            self._stats[tier if value is not None else "misses"] += 1
+        return copy.deepcopy(value) if value is not None else None
+
+    def set(self, key: str, value: ToolCalls) -> None:
+        if not value:
+            return
+        value = copy.deepcopy(value)
+        self._put_local(key, value)
+        if self.db_enabled:
+            self._db_set(key, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "size": len(self._entries), "max_entries": self.max_entries, "db_enabled": self.db_enabled}
+
+    # --- internos ---
+    def _get_local(self, key: str) -> Optional[ToolCalls]:
+        now = time.monotonic()
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            if item[0] <= now:
+                del self._entries[key]
+                self._stats["expirations"] += 1
+                return None
+            self._entries.move_to_end(key)
+            return item[1]
+
+    def _put_local(self, key: str, value: ToolCalls) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def _db_get(self, key: str) -> Optional[ToolCalls]:
+        try:
+            with database.SessionLocal() as db:
+                stmt = select(models.LlmCache.cache_tool_calls).where(
+                    models.LlmCache.cache_key == key,
+                    models.LlmCache.cache_expires_at > datetime.now(tz=timezone.utc),
+                )
+                return db.execute(stmt).scalar_one_or_none()
+        except Exception as e:
+            logging.warning(f"ToolCallCache: Error leyendo cache en DB: {str(e)}")
+            return None
+
+    def _db_set(self, key: str, value: ToolCalls) -> None:
+        expires_at = datetime.now(tz=timezone.utc) + timedelta(seconds=self.ttl_seconds)
+        try:
+            with database.SessionLocal() as db:
+                stmt = pg_insert(models.LlmCache).values(
+                    cache_key=key, cache_tool_calls=value, cache_expires_at=expires_at,
+                ).on_conflict_do_update(
+                    index_elements=[models.LlmCache.cache_key],
+                    set_={"cache_tool_calls": value, "cache_expires_at": expires_at},
+                )
+                db.execute(stmt)
+                db.commit()
+        except Exception as e:
+            logging.warning(f"ToolCallCache: Error escribiendo cache en DB: {str(e)}")
+
+    def purge_expired(self) -> int:
+        """Borra del tier Postgres las entradas vencidas. Retorna la cantidad borrada."""
+        if not self.db_enabled:
+            return 0
+        with database.SessionLocal() as db:
+            res = db.execute(
+                delete(models.LlmCache).where(models.LlmCache.cache_expires_at <= datetime.now(tz=timezone.utc))
+            )
+            db.commit()
+            return int(res.rowcount or 0)
+
+
+# Instancia compartida del proceso
+tool_call_cache = ToolCallCache(
+    max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024")),
+    ttl_seconds=int(os.getenv("LLM_CACHE_TTL_SECONDS", "3600")),
+    db_enabled=os.getenv("LLM_CACHE_DB", "0").lower() in ("1", "true", "yes"),
+)
@@ -1,10 +1,19 @@
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
-from .database import get_db
+from .database import AsyncSessionLocal, async_engine, get_db
 from sqlalchemy import text
-from .routers import v1_auth, v1_events, v1_nl, v1_subjects, v1_users, v1_whisper
+from .integrations.gemini_client import gemini_pool
+from .auth_cache import token_cache, user_cache
+from .password_pool import password_pool
+from .rate_limit import login_limiter
+from .maintenance import maintenance
+from .integrations.llm_cache import tool_call_cache
+from .services import search_service
+from .services.pagination import NEXT_CURSOR_HEADER
+from .routers import v1_auth, v1_events, v1_nl, v1_search, v1_stats, v1_subjects, v1_sync, v1_users, v1_whisper
 
 # Configurar logging
 logging.basicConfig(
@@ -12,10 +21,32 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Cliente Gemini compartido: se calienta una vez por proceso
+    gemini_pool.startup()
+    # Procesos de hashing levantados antes del primer /login
+    password_pool.startup()
+    # Purga periódica de refresh tokens vencidos, tombstones de sync y cache LLM
+    maintenance.startup()
+    # Búsqueda con pg_trgm solo si la migración 0008 está aplicada; si no (o sin DB), LIKE
+    try:
+        async with AsyncSessionLocal() as db:
+            logging.info(f"Búsqueda por nombre: backend '{await search_service.detect_backend_async(db)}'")
+    except Exception as e:
+        logging.warning(f"No se pudo verificar pg_trgm al arrancar, la búsqueda usa LIKE: {str(e)}")
+    yield
+    maintenance.shutdown()
+    gemini_pool.shutdown()
+    password_pool.shutdown()
+    await async_engine.dispose()
+
+
 app = FastAPI(
     title="SmartFocus Backend V2",
     description="Autenticación de usuarios, gestión de eventos y materias con IA",
-    version="1.0"
+    version="1.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -24,11 +55,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Sin esto el navegador no deja leer el cursor keyset desde JS
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 app.include_router(v1_auth.router)
 app.include_router(v1_events.router)
 app.include_router(v1_nl.router)  
+app.include_router(v1_search.router)
+app.include_router(v1_stats.router)
 app.include_router(v1_subjects.router)
+app.include_router(v1_sync.router)
 app.include_router(v1_users.router)
-app.include_router(v1_whisper.router)
\ No newline at end of file
+app.include_router(v1_whisper.router)
+
+
+@app.get("/ready", tags=["health"], summary="Readiness: base de datos + estado del cliente LLM")
+def ready(deep: bool = False, db: Session = Depends(get_db)):
+    try:
+        db.execute(text("SELECT 1"))
+    except Exception:
+        raise HTTPException(status_code=503, detail="Base de datos no disponible")
+    # El LLM se informa pero no bloquea la readiness (los endpoints CRUD siguen sirviendo)
+    return {"status": "ok", "llm": gemini_pool.health(deep=deep), "llm_cache": tool_call_cache.stats(), "auth_cache": user_cache.stats(), "jwt_cache": token_cache.stats(), "password_pool": password_pool.stats(), "login_rate_limit": login_limiter.stats(), "maintenance": maintenance.stats(), "search_backend": search_service.backend()}
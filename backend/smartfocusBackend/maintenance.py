@@ -0,0 +1,103 @@
+# backend/smartfocusBackend/maintenance.py
+from __future__ import annotations
+
+import logging
+import os
+import random
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from . import database
+from .integrations.llm_cache import tool_call_cache
+from .services import refresh_service, sync_service
+
+
+class MaintenanceScheduler:
+    """
+    Limpieza periódica de tablas que solo crecen (refresh tokens vencidos,
+    tombstones de sync, cache LLM en Postgres) en un thread daemon por proceso.
+    - interval_seconds: período entre corridas (0 = deshabilitado; correr
+      `python -m smartfocusBackend.maintenance` desde un cron en su lugar).
+    - Con varios workers cada uno purga por su cuenta: los DELETE son idempotentes
+      y el jitter evita que coincidan.
+    """
+
+    def __init__(self, jobs: List[Tuple[str, Callable[[], int]]], *, interval_seconds: float = 3600.0):
+        self.jobs = jobs
+        self.interval_seconds = interval_seconds
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats: Dict[str, Any] = {"runs": 0, "errors": 0, "deleted": {name: 0 for name, _ in jobs}}
+
+    # --- ciclo de vida ---
+    def startup(self) -> None:
+        if self.interval_seconds <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="maintenance", daemon=True)
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=5)
+
+    # --- API ---
+    def run_once(self) -> Dict[str, int]:
+        """Corre todos los jobs una vez; un job que falla no frena a los demás."""
+        out: Dict[str, int] = {}
+        for name, job in self.jobs:
+            try:
+                out[name] = job()
+            except Exception as e:
+                logging.warning(f"MaintenanceScheduler: Error en '{name}': {str(e)}")
+                with self._lock:
+                    self._stats["errors"] += 1
+                continue
+            with self._lock:
+                self._stats["deleted"][name] += out[name]
+        with self._lock:
+            self._stats["runs"] += 1
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "deleted": dict(self._stats["deleted"]), "interval_seconds": self.interval_seconds}
+
+    # --- internos ---
+    def _loop(self) -> None:
+        # Primera corrida con jitter: que los workers no arranquen todos a la vez
+        delay = random.uniform(0, min(self.interval_seconds, 60.0))
+        while not self._stop.wait(delay):
+            result = self.run_once()
+            if any(result.values()):
+                logging.info(f"MaintenanceScheduler: Purga {result}")
+            delay = self.interval_seconds * random.uniform(0.9, 1.1)
+
+
+def _con_sesion(fn: Callable[[Session], int]) -> Callable[[], int]:
+    def job() -> int:
+        with database.SessionLocal() as db:
+            return fn(db)
+    return job
+
+
+# Instancia compartida del proceso
+maintenance = MaintenanceScheduler(
+    [
+        ("refresh_tokens", _con_sesion(refresh_service.purge_expired)),
+        ("sync_tombstones", _con_sesion(sync_service.purge_tombstones)),
+        ("llm_cache", tool_call_cache.purge_expired),
+    ],
+    interval_seconds=float(os.getenv("MAINTENANCE_INTERVAL_SECONDS", "3600")),
+)
+
+
+if __name__ == "__main__":
+    # Para cron, con MAINTENANCE_INTERVAL_SECONDS=0 en la app
+    logging.basicConfig(level=logging.INFO)
+    print(maintenance.run_once())
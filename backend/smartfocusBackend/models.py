@@ -3,7 +3,7 @@ from datetime import datetime, date
 from typing import List, Optional
 import enum
 
-from sqlalchemy import (Integer, String, Text, DateTime, Date, ForeignKey, Index, Enum, func)
+from sqlalchemy import (BigInteger, Integer, String, Text, DateTime, Date, ForeignKey, Index, Enum, JSON, func, text)
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from .database import Base
 
@@ -74,6 +74,14 @@ class Materia(Base):
     materia_created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, server_default=func.now()
     )
+    # Delta-sync (migración 0012): los mantiene un trigger BEFORE INSERT/UPDATE.
+    # sync_txid = txid_current() de la transacción que escribió la fila.
+    materia_updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now()
+    )
+    materia_sync_txid: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default=text("txid_current()")
+    )
 
     # Relaciones
     usuario: Mapped["Usuario"] = relationship("Usuario", back_populates="materias")
@@ -86,7 +94,13 @@ class Materia(Base):
 
     __table_args__ = (
         Index("idx_materia_usuario", "materia_usuario_id"),
+        # Keyset (materia_nombre, materia_id) por usuario: filtro + orden salen del índice
+        Index("idx_materia_usuario_nombre_id", "materia_usuario_id", "materia_nombre", "materia_id"),
+        # /api/v1/sync: cambios del usuario en una ventana de txids
+        Index("idx_materia_usuario_sync", "materia_usuario_id", "materia_sync_txid", "materia_id"),
     )
+    # Trae los server defaults (created_at) en el mismo INSERT ... RETURNING
+    __mapper_args__ = {"eager_defaults": True}
 
     # Metodo representation, utilizable en depuracion (logs, debugging)
     def __repr__(self) -> str:
@@ -108,7 +122,13 @@ class Evento(Base):
         Integer,
         ForeignKey("materia.materia_id", ondelete="CASCADE", onupdate="CASCADE"),
         nullable=False,
-        index=True,
+    )
+    # Denormalizado: dueño de la materia (lo mantiene el service y, en la DB, el
+    # trigger de la migración 0009). Evita el join con materia en queries por usuario.
+    evento_usuario_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("usuario.usuario_id", ondelete="CASCADE", onupdate="CASCADE"),
+        nullable=False,
     )
     evento_nombre: Mapped[str] = mapped_column(String(150), nullable=False)
     evento_descripcion: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -118,15 +138,163 @@ class Evento(Base):
     evento_created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=False, server_default=func.now()
     )
+    # Delta-sync (migración 0012), igual que en Materia
+    evento_updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now()
+    )
+    evento_sync_txid: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default=text("txid_current()")
+    )
 
     # Relaciones
     materia: Mapped["Materia"] = relationship("Materia", back_populates="eventos")
 
     __table_args__ = (
-        Index("idx_evento_materia", "evento_materia_id"),
         Index("idx_evento_fecha", "evento_fecha"),
+        # Keyset (evento_fecha, evento_id) por materia (/events); como prefijo también
+        # sirve al FK evento_materia_id (reemplaza a idx_evento_materia)
+        Index("idx_evento_materia_fecha_id", "evento_materia_id", "evento_fecha", "evento_id"),
+        # "Todos mis eventos por fecha": range scan sin join (keyset de /events/all).
+        # El INCLUDE cubre el formato columnar de /events/range: index-only scan
+        Index(
+            "idx_evento_usuario_fecha_id", "evento_usuario_id", "evento_fecha", "evento_id",
+            postgresql_include=["evento_materia_id", "evento_estado"],
+        ),
+        # /api/v1/sync: cambios del usuario en una ventana de txids
+        Index("idx_evento_usuario_sync", "evento_usuario_id", "evento_sync_txid", "evento_id"),
     )
+    # Trae los server defaults (created_at, estado) en el mismo INSERT ... RETURNING
+    __mapper_args__ = {"eager_defaults": True}
     
     # Metodo representation, utilizable en depuracion (logs, debugging)
     def __repr__(self) -> str:
         return f"<Evento id={self.evento_id} estado={self.evento_estado} fecha={self.evento_fecha}>"
+
+
+class LlmCache(Base):
+    """Tier compartido (opcional) del cache de tool calls del LLM."""
+    __tablename__ = "llm_cache"
+
+    cache_key: Mapped[str] = mapped_column(String(64), primary_key=True)  # sha256 hex
+    cache_tool_calls: Mapped[list] = mapped_column(JSON, nullable=False)
+    cache_expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("idx_llm_cache_expires", "cache_expires_at"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<LlmCache key={self.cache_key[:12]} expires={self.cache_expires_at}>"
+
+
+class AuthCacheVersion(Base):
+    """Contador compartido entre workers para invalidar el cache de usuarios autenticados."""
+    __tablename__ = "auth_cache_version"
+
+    version_id: Mapped[int] = mapped_column(Integer, primary_key=True)  # fila única (id=1)
+    version_value: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
+
+    def __repr__(self) -> str:
+        return f"<AuthCacheVersion value={self.version_value}>"
+
+
+class RefreshToken(Base):
+    """
+    Refresh tokens opacos con rotación. Solo se guarda el sha256 del token.
+    Todos los tokens de una misma sesión de login comparten token_familia:
+    si un token ya rotado se vuelve a presentar (reuso), se revoca la familia entera.
+    """
+    __tablename__ = "refresh_token"
+
+    token_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    token_usuario_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("usuario.usuario_id", ondelete="CASCADE", onupdate="CASCADE"),
+        nullable=False,
+    )
+    token_hash: Mapped[str] = mapped_column(String(64), nullable=False)  # sha256 hex
+    token_familia: Mapped[str] = mapped_column(String(32), nullable=False)  # uuid4 hex
+    token_expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    token_revoked_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    token_created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+    __table_args__ = (
+        # Lookup del /refresh: un solo acceso por índice único
+        Index("idx_refresh_token_hash", "token_hash", unique=True),
+        # Índice de revocación compacto: solo los tokens aún activos de cada familia
+        Index(
+            "idx_refresh_token_familia_activos", "token_familia",
+            postgresql_where=text("token_revoked_at IS NULL"),
+        ),
+    )
+
+    def __repr__(self) -> str:
+        return f"<RefreshToken id={self.token_id} usuario={self.token_usuario_id} revocado={self.token_revoked_at is not None}>"
+
+
+class RateLimitBucket(Base):
+    """Estado GCRA compartido del rate limiter de /login (LOGIN_RATE_BACKEND=db)."""
+    __tablename__ = "rate_limit_bucket"
+
+    bucket_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    bucket_tat: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<RateLimitBucket key={self.bucket_key} tat={self.bucket_tat}>"
+
+
+class MateriaStats(Base):
+    """
+    Resumen por materia de eventos por estado, mantenido incrementalmente por
+    triggers sobre evento (migración 0011). Lo lee /api/v1/stats con STATS_SUMMARY_TABLE=1.
+    """
+    __tablename__ = "materia_stats"
+
+    stats_materia_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("materia.materia_id", ondelete="CASCADE", onupdate="CASCADE"),
+        primary_key=True,
+    )
+    stats_usuario_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    stats_pendiente: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    stats_aprobado: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    stats_desaprobado: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+
+    __table_args__ = (
+        Index("idx_materia_stats_usuario", "stats_usuario_id"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<MateriaStats materia={self.stats_materia_id} p={self.stats_pendiente} a={self.stats_aprobado} d={self.stats_desaprobado}>"
+
+
+class SyncTombstone(Base):
+    """
+    Registro de borrados para /api/v1/sync (lo llenan triggers AFTER DELETE sobre
+    materia y evento, migración 0012). También se registra cuando una fila pasa a
+    otro usuario, para que el dueño anterior la quite. maintenance.py los purga pasado
+    SYNC_TOMBSTONE_TTL_DAYS; un cursor más viejo que eso obliga a resincronizar completo.
+    """
+    __tablename__ = "sync_tombstone"
+
+    tombstone_id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    # Sin FK: el borrado en cascada de un usuario genera tombstones de ese mismo usuario
+    tombstone_usuario_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    tombstone_tabla: Mapped[str] = mapped_column(String(16), nullable=False)  # "materia" | "evento"
+    tombstone_entidad_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    tombstone_sync_txid: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default=text("txid_current()")
+    )
+    tombstone_deleted_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+    __table_args__ = (
+        Index("idx_sync_tombstone_usuario_txid", "tombstone_usuario_id", "tombstone_sync_txid"),
+        Index("idx_sync_tombstone_deleted_at", "tombstone_deleted_at"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<SyncTombstone {self.tombstone_tabla}={self.tombstone_entidad_id} usuario={self.tombstone_usuario_id}>"
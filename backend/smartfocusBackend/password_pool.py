@@ -0,0 +1,135 @@
+# backend/smartfocusBackend/password_pool.py
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from . import utils
+
+
+class PasswordPoolSaturado(Exception):
+    """El pool de hashing está lleno (o no respondió a tiempo): el router responde 503."""
+
+
+def _warmup() -> None:
+    # Fuerza la carga del backend de passlib en el worker antes del primer request
+    utils.hash_clave("warmup")
+
+
+class PasswordHasherPool:
+    """
+    Pool de procesos dedicado a pbkdf2 (hash/verify), aislado del threadpool de CRUD.
+    - workers: procesos del pool (0 = inline, sin aislamiento; útil en scripts).
+    - max_pending: trabajos en vuelo (ejecutando + en cola). Si se supera, falla rápido
+      con PasswordPoolSaturado en lugar de encolar sin límite.
+    - timeout_seconds: espera máxima por un resultado antes de tratarlo como saturación.
+    """
+
+    def __init__(self, *, workers: int = 2, max_pending: int = 8, timeout_seconds: float = 5.0):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout_seconds = timeout_seconds
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._stats = {"submitted": 0, "rejected": 0, "timeouts": 0, "restarts": 0}
+
+    # --- ciclo de vida ---
+    def startup(self) -> None:
+        if self.workers > 0:
+            self._get_executor()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    # --- API ---
+    def hash(self, plain_password: str) -> str:
+        return self._run(utils.hash_clave, plain_password)
+
+    def verify_and_update(self, plain_password: str, stored_hash: str) -> Tuple[bool, Optional[str]]:
+        return self._run(utils.verificar_y_actualizar, plain_password, stored_hash)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "workers": self.workers, "max_pending": self.max_pending}
+
+    # --- internos ---
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: el hijo no hereda engines/threads del proceso web
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warmup,
+                )
+            return self._executor
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def _restart(self, broken: ProcessPoolExecutor, error: BaseException) -> None:
+        # Solo si sigue siendo el pool actual: otro thread pudo haberlo recreado ya
+        with self._lock:
+            if self._executor is not broken:
+                return
+            self._executor = None
+            self._stats["restarts"] += 1
+        logging.error(f"PasswordHasherPool: Pool roto, reiniciando: {str(error)}")
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        # Backpressure: sin slot libre se rechaza al instante (503 rápido)
+        if not self._slots.acquire(blocking=False):
+            self._count("rejected")
+            raise PasswordPoolSaturado()
+        self._count("submitted")
+        if self.workers <= 0:
+            try:
+                return fn(*args)
+            finally:
+                self._slots.release()
+
+        executor = self._get_executor()
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool as e:
+            self._slots.release()
+            self._restart(executor, e)
+            raise PasswordPoolSaturado()
+        except BaseException:
+            self._slots.release()
+            raise
+        # El slot se libera cuando el trabajo termina de verdad (o se cancela antes de
+        # empezar), no al vencer el timeout: cancel() no frena un pbkdf2 ya en curso,
+        # y max_pending tiene que acotar el trabajo real de los workers
+        future.add_done_callback(lambda _f: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout_seconds)
+        except FutureTimeoutError:
+            future.cancel()
+            self._count("timeouts")
+            raise PasswordPoolSaturado()
+        except BrokenProcessPool as e:
+            # Un worker murió: se recrea el pool y se responde 503. Nunca inline:
+            # eso volvería a competir por el GIL con los requests
+            self._restart(executor, e)
+            raise PasswordPoolSaturado()
+
+
+# Instancia compartida del proceso
+_workers = int(os.getenv("PASSWORD_POOL_WORKERS", "2"))
+password_pool = PasswordHasherPool(
+    workers=_workers,
+    max_pending=int(os.getenv("PASSWORD_POOL_MAX_PENDING", str(max(_workers, 1) * 4))),
+    timeout_seconds=float(os.getenv("PASSWORD_POOL_TIMEOUT_SECONDS", "5")),
+)
@@ -0,0 +1,212 @@
+# backend/smartfocusBackend/rate_limit.py
+from __future__ import annotations
+
+import hashlib
+import ipaddress
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Protocol, Sequence, Tuple, Union
+
+from sqlalchemy import text
+
+from . import database
+
+
+class RateLimitExcedido(Exception):
+    """Demasiados intentos: el router responde 429 con Retry-After."""
+
+    def __init__(self, retry_after: float, dimension: str):
+        super().__init__(f"Rate limit excedido ({dimension})")
+        self.retry_after = retry_after
+        self.dimension = dimension
+
+
+@dataclass(frozen=True)
+class Limite:
+    """GCRA: `por_minuto` de tasa sostenida y hasta `rafaga` intentos seguidos."""
+    por_minuto: float
+    rafaga: int
+
+    @property
+    def intervalo(self) -> float:
+        return 60.0 / self.por_minuto
+
+    @property
+    def tolerancia(self) -> float:
+        return self.intervalo * self.rafaga
+
+
+class RateLimitBackend(Protocol):
+    def consume(self, key: str, limite: Limite) -> Tuple[bool, float]:
+        """Retorna (permitido, segundos hasta el próximo intento permitido)."""
+        ...
+
+
+class MemoryBackend:
+    """
+    GCRA en memoria del proceso (un worker). Guarda solo el TAT (theoretical
+    arrival time) por clave; las claves ya vencidas se podan al superar max_keys.
+    """
+
+    def __init__(self, *, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._tat: Dict[str, float] = {}
+
+    def consume(self, key: str, limite: Limite) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            nuevo_tat = max(self._tat.get(key, now), now) + limite.intervalo
+            exceso = nuevo_tat - now - limite.tolerancia
+            if exceso > 0:
+                return False, exceso
+            self._tat[key] = nuevo_tat
+            if len(self._tat) > self.max_keys:
+                self._tat = {k: v for k, v in self._tat.items() if v > now}
+            return True, 0.0
+
+
+class DbBackend:
+    """
+    GCRA compartido entre workers sobre Postgres (tabla rate_limit_bucket): un solo
+    UPSERT atómico por intento. Es el stand-in de un store compartido tipo Redis.
+    Si la DB falla, deja pasar (fail-open) para no bloquear logins legítimos.
+    """
+
+    _SQL = text(
+        """
+        INSERT INTO rate_limit_bucket AS b (bucket_key, bucket_tat)
+        VALUES (:key, :now + :intervalo)
+        ON CONFLICT (bucket_key) DO UPDATE
+            SET bucket_tat = GREATEST(b.bucket_tat, :now) + :intervalo
+            WHERE GREATEST(b.bucket_tat, :now) + :intervalo - :now <= :tolerancia
+        RETURNING bucket_tat
+        """
+    )
+
+    def consume(self, key: str, limite: Limite) -> Tuple[bool, float]:
+        now = datetime.now(tz=timezone.utc)
+        params = {
+            "key": key,
+            "now": now,
+            "intervalo": timedelta(seconds=limite.intervalo),
+            "tolerancia": timedelta(seconds=limite.tolerancia),
+        }
+        try:
+            with database.SessionLocal() as db:
+                tat = db.execute(self._SQL, params).scalar_one_or_none()
+                db.commit()
+        except Exception as e:
+            logging.warning(f"DbBackend: Error consultando rate limit: {str(e)}")
+            return True, 0.0
+        # Sin fila devuelta = el WHERE del UPDATE rechazó el intento
+        return (True, 0.0) if tat is not None else (False, limite.intervalo)
+
+
+class LoginRateLimiter:
+    """
+    Corta abuso de /login antes de buscar el usuario o correr pbkdf2:
+    un límite por IP (fuerza bruta / stuffing desde un origen) y otro por email
+    (ataque distribuido contra una cuenta).
+    """
+
+    def __init__(self, backend: RateLimitBackend, *, por_ip: Limite, por_email: Limite, enabled: bool = True):
+        self.backend = backend
+        self.por_ip = por_ip
+        self.por_email = por_email
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._stats = {"allowed": 0, "rejected_ip": 0, "rejected_email": 0}
+
+    @staticmethod
+    def _key(dimension: str, valor: str) -> str:
+        # Emails/IPs no quedan en claro en el store
+        return f"login:{dimension}:" + hashlib.sha256(valor.encode("utf-8")).hexdigest()[:32]
+
+    def check(self, ip: Optional[str], email: str) -> None:
+        """Lanza RateLimitExcedido si algún límite se superó."""
+        if not self.enabled:
+            return
+        for dimension, valor, limite in (
+            ("ip", ip or "desconocida", self.por_ip),
+            ("email", email.strip().lower(), self.por_email),
+        ):
+            ok, retry_after = self.backend.consume(self._key(dimension, valor), limite)
+            if not ok:
+                with self._lock:
+                    self._stats[f"rejected_{dimension}"] += 1
+                raise RateLimitExcedido(retry_after, dimension)
+        with self._lock:
+            self._stats["allowed"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "enabled": self.enabled, "backend": type(self.backend).__name__}
+
+
+# =========================
+# IP del cliente detrás de un proxy
+# =========================
+_Red = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+def _redes(valor: str) -> Tuple[_Red, ...]:
+    return tuple(ipaddress.ip_network(v.strip(), strict=False) for v in valor.split(",") if v.strip())
+
+
+# Proxies/balanceadores de confianza (IPs o CIDRs separados por coma, p.ej.
+# "10.0.0.0/8,172.16.0.0/12"). Vacío: X-Forwarded-For se ignora y cuenta la IP
+# de la conexión. Alternativa: uvicorn --proxy-headers --forwarded-allow-ips=<proxies>
+# ya deja el cliente real en request.client.host; en ese caso dejar esto vacío.
+TRUSTED_PROXIES = _redes(os.getenv("TRUSTED_PROXIES", ""))
+
+
+def _es_confiable(ip: str, trusted: Sequence[_Red]) -> bool:
+    try:
+        addr = ipaddress.ip_address(ip)
+    except ValueError:
+        return False
+    return any(addr in red for red in trusted)
+
+
+def client_ip(peer: Optional[str], forwarded_for: Optional[str], trusted: Optional[Sequence[_Red]] = None) -> Optional[str]:
+    """
+    IP del cliente para el límite por IP. X-Forwarded-For solo se lee si la conexión
+    viene de un proxy de confianza, y se recorre de derecha a izquierda saltando los
+    proxies de confianza: el primer salto que no lo es es el cliente. Lo que está más
+    a la izquierda lo puede escribir el propio cliente, así que no se usa.
+    """
+    trusted = TRUSTED_PROXIES if trusted is None else trusted
+    if not peer or not forwarded_for or not _es_confiable(peer, trusted):
+        return peer
+    ip = peer
+    for salto in reversed([h.strip() for h in forwarded_for.split(",") if h.strip()]):
+        ip = salto
+        if not _es_confiable(salto, trusted):
+            break
+    return ip
+
+
+def _backend_desde_env() -> RateLimitBackend:
+    if os.getenv("LOGIN_RATE_BACKEND", "memory").lower() == "db":
+        return DbBackend()
+    return MemoryBackend()
+
+
+# Instancia compartida del proceso
+login_limiter = LoginRateLimiter(
+    _backend_desde_env(),
+    por_ip=Limite(
+        por_minuto=float(os.getenv("LOGIN_RATE_IP_PER_MIN", "30")),
+        rafaga=int(os.getenv("LOGIN_RATE_IP_BURST", "10")),
+    ),
+    por_email=Limite(
+        por_minuto=float(os.getenv("LOGIN_RATE_EMAIL_PER_MIN", "5")),
+        rafaga=int(os.getenv("LOGIN_RATE_EMAIL_BURST", "5")),
+    ),
+    enabled=os.getenv("LOGIN_RATE_LIMIT", "1").lower() in ("1", "true", "yes"),
+)
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 
 from .. import schemas, auth
 from ..database import get_db  # ajusta si tu módulo se llama distinto
-from ..services import user_service
+from ..password_pool import PasswordPoolSaturado
+from ..rate_limit import RateLimitExcedido, client_ip, login_limiter
+from ..services import refresh_service, user_service
 
 router = APIRouter(prefix="/api/v1/auth", tags=["auth"])
 
@@ -13,18 +15,55 @@ router = APIRouter(prefix="/api/v1/auth", tags=["auth"])
     response_model=schemas.TokenResponse,
     summary="Iniciar sesión",
     status_code=status.HTTP_200_OK,
+    responses={
+        429: {"description": "Demasiados intentos de login"},
+    },
 )
-def login_endpoint(payload: schemas.LoginRequest, db: Session = Depends(get_db)):
+def login_endpoint(request: Request, payload: schemas.LoginRequest, db: Session = Depends(get_db)):
     try:
+        # Antes de tocar la DB o pbkdf2: por IP y por email
+        ip = client_ip(request.client.host if request.client else None, request.headers.get("x-forwarded-for"))
+        login_limiter.check(ip, payload.email)
         return auth.login_user(payload, db)
+    except RateLimitExcedido as e:
+        raise HTTPException(
+            status_code=429,
+            detail="Demasiados intentos, reintentá más tarde",
+            headers={"Retry-After": str(max(1, int(e.retry_after + 0.999)))},
+        )
     except auth.InvalidCredentialsError:
         # mensaje genérico para no filtrar si el usuario existe
         raise HTTPException(status_code=401, detail="Credenciales inválidas")
+    except PasswordPoolSaturado:
+        raise HTTPException(
+            status_code=503,
+            detail="Servicio de autenticación saturado, reintentá en unos segundos",
+            headers={"Retry-After": "1"},
+        )
     except Exception as e:
         # evita filtrar detalles internos
         raise HTTPException(status_code=500, detail="Error de autenticación")
 
 
+@router.post(
+    "/refresh",
+    response_model=schemas.TokenResponse,
+    summary="Renovar el access token con un refresh token (rotación)",
+    status_code=status.HTTP_200_OK,
+    responses={
+        401: {"description": "Refresh token inválido, vencido o reutilizado"},
+    },
+)
+def refresh_endpoint(payload: schemas.RefreshRequest, db: Session = Depends(get_db)):
+    try:
+        return auth.refrescar_tokens(db, payload.refresh_token)
+    except refresh_service.RefreshTokenReutilizado:
+        # La familia completa quedó revocada: el cliente debe volver a /login
+        raise HTTPException(status_code=401, detail="Refresh token reutilizado, sesión revocada")
+    except refresh_service.RefreshTokenInvalido:
+        raise HTTPException(status_code=401, detail="Refresh token inválido o expirado")
+
+
 @router.get(
     "/me",
     response_model=schemas.UsuarioResponse,
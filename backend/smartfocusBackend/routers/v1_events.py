@@ -1,10 +1,13 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from datetime import date
+from typing import List, Literal, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..database import get_db
+from ..database import get_async_db, get_db
 from .. import auth, schemas
 from ..services import event_service as svc
+from ..services.pagination import set_next_cursor
 
 router = APIRouter(prefix="/api/v1/events", tags=["events"])
 
@@ -18,7 +21,7 @@ router = APIRouter(prefix="/api/v1/events", tags=["events"])
 def create_event_endpoint(
     payload: schemas.EventoCreate,
     db: Session = Depends(get_db),
-    usuario=Depends(auth.get_current_user),
+    usuario=Depends(auth.get_current_principal),
 ):
     try:
         return svc.create_event(db, usuario.usuario_id, payload)
@@ -33,16 +36,22 @@ def create_event_endpoint(
     response_model=List[schemas.EventoResponse],
     summary="Listar eventos de una materia propia (filtro por estado, paginado)",
 )
-def list_events_endpoint(
+async def list_events_endpoint(
+    response: Response,
     materia_id: int = Query(..., ge=1, description="ID de la materia"),
     estado: Optional[schemas.EventoEstado] = Query(None, description="Filtrar por estado"),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
-    db: Session = Depends(get_db),
-    usuario=Depends(auth.get_current_user),
+    cursor: Optional[str] = Query(None, description="Cursor de X-Next-Cursor (si viene, se ignora skip)"),
+    db: AsyncSession = Depends(get_async_db),
+    usuario=Depends(auth.get_current_principal),
 ):
     try:
-        return svc.list_events(db, usuario.usuario_id, materia_id, estado, skip, limit)
+        page = await svc.list_events_async(db, usuario.usuario_id, materia_id, estado, skip, limit, cursor)
+        set_next_cursor(response, page.next_cursor)
+        return page.items
+    except svc.CursorInvalido:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
     except svc.MateriaNoEncontrada:
         raise HTTPException(status_code=404, detail="Materia no encontrada")
     except svc.AccesoNoAutorizado:
@@ -54,14 +63,48 @@ def list_events_endpoint(
     response_model=List[schemas.EventoResponse],
     summary="Obtener todos los eventos del usuario autenticado (búsqueda/paginado)",
 )
-def get_user_events_endpoint(
+async def get_user_events_endpoint(
+    response: Response,
     q: Optional[str] = Query(None, description="Buscar por nombre"),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
-    db: Session = Depends(get_db),
-    usuario=Depends(auth.get_current_user),
+    cursor: Optional[str] = Query(None, description="Cursor de X-Next-Cursor (si viene, se ignora skip)"),
+    db: AsyncSession = Depends(get_async_db),
+    usuario=Depends(auth.get_current_principal),
 ):
-    return svc.get_user_events(db, usuario.usuario_id, q, skip, limit)
+    try:
+        page = await svc.get_user_events_async(db, usuario.usuario_id, q, skip, limit, cursor)
+    except svc.CursorInvalido:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    set_next_cursor(response, page.next_cursor)
+    return page.items
+
+
+@router.get(
+    "/range",
+    response_model=Union[List[schemas.EventoResponse], schemas.EventoColumnas],
+    summary="Eventos propios en un rango de fechas (vistas de calendario)",
+    responses={400: {"description": "Rango inválido"}},
+)
+async def list_events_range_endpoint(
+    desde: date = Query(..., alias="from", description="Fecha inicial (inclusive)"),
+    hasta: date = Query(..., alias="to", description="Fecha final (inclusive)"),
+    estado: Optional[schemas.EventoEstado] = Query(None, description="Filtrar por estado"),
+    format: Literal["full", "columnar"] = Query("full", description="columnar: arrays paralelos (id, materia, fecha, estado)"),
+    db: AsyncSession = Depends(get_async_db),
+    usuario=Depends(auth.get_current_principal),
+):
+    try:
+        if format == "columnar":
+            return schemas.EventoColumnas(
+                **await svc.list_event_columns_in_range_async(db, usuario.usuario_id, desde, hasta, estado)
+            )
+        return await svc.list_events_in_range_async(db, usuario.usuario_id, desde, hasta, estado)
+    except svc.RangoInvalido:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Rango inválido: 'to' debe ser >= 'from' y abarcar a lo sumo {svc.RANGE_MAX_DAYS} días",
+        )
 
 
 @router.get(
@@ -69,13 +112,13 @@ def get_user_events_endpoint(
     response_model=schemas.EventoResponse,
     summary="Obtener un evento propio por ID",
 )
-def get_event_endpoint(
+async def get_event_endpoint(
     evento_id: int,
-    db: Session = Depends(get_db),
-    usuario=Depends(auth.get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    usuario=Depends(auth.get_current_principal),
 ):
     try:
-        return svc.get_event(db, usuario.usuario_id, evento_id)
+        return await svc.get_event_async(db, usuario.usuario_id, evento_id)
     except svc.EventoNoEncontrado:
         raise HTTPException(status_code=404, detail="Evento no encontrado")
     except svc.AccesoNoAutorizado:
@@ -90,7 +133,7 @@ def update_event_endpoint(
     evento_id: int,
     payload: schemas.EventoUpdate,
     db: Session = Depends(get_db),
-    usuario=Depends(auth.get_current_user),
+    usuario=Depends(auth.get_current_principal),
 ):
     try:
         return svc.update_event(db, usuario.usuario_id, evento_id, payload)
@@ -108,7 +151,7 @@ def update_event_endpoint(
 def delete_event_endpoint(
     evento_id: int,
     db: Session = Depends(get_db),
-    usuario=Depends(auth.get_current_user),
+    usuario=Depends(auth.get_current_principal),
 ):
     try:
         svc.delete_event(db, usuario.usuario_id, evento_id)
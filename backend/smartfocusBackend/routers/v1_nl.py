@@ -3,13 +3,14 @@ from __future__ import annotations
 import logging
 from typing import Any, Dict, List, Literal, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 from ..database import get_db
 from .. import auth
 from ..services import nl_service as svc
-from ..integrations.gemini_client import GeminiClient  # ← nuevo adaptador
+from ..integrations.gemini_client import GeminiClient, gemini_pool  # ← nuevo adaptador
 
 router = APIRouter(prefix="/api/v1/nl", tags=["nl"])
 
@@ -38,9 +39,10 @@ class NLExecuteResponse(BaseModel):
 
 def get_llm_client() -> GeminiClient:
     """
-    Lee GEMINI_API_KEY / GEMINI_MODEL del entorno.
+    Devuelve el cliente compartido del proceso (creado en el arranque de la app).
+    Se recrea solo si cambia GEMINI_API_KEY en el entorno.
     """
-    return GeminiClient()
+    return gemini_pool.get()
 
 
 @router.post(
@@ -54,10 +56,10 @@ def get_llm_client() -> GeminiClient:
         500: {"description": "Error interno"},
     },
 )
-def nl_command(
+async def nl_command(
     payload: NLCommandRequest,
     db: Session = Depends(get_db),
-    usuario=Depends(auth.get_current_user),
+    usuario=Depends(auth.get_current_principal),
     llm: GeminiClient = Depends(get_llm_client),  # ← inyección del cliente
 ):
     """
@@ -66,23 +68,27 @@ def nl_command(
       - mode='execute':
           * si vienen actions (del plan), ejecuta esas;
           * si no, planifica y ejecuta en el mismo request.
+    El LLM se consulta de forma async (no ocupa hilos del threadpool durante el
+    round trip); solo el trabajo de DB pasa por el threadpool.
     """
     try:
         logging.info(f"nl_command: {payload.mode} - '{payload.text}' (usuario: {usuario.usuario_id})")
         
         if payload.mode == "plan":
-            plan = svc.plan_actions(db, usuario.usuario_id, payload.text, llm)
+            plan = await svc.plan_actions_async(db, usuario.usuario_id, payload.text, llm)
             result = svc.serialize_plan(plan)
             logging.info(f"nl_command: Plan generado con {len(result.get('actions', []))} acciones")
             return result
 
         # execute
+        snapshot = None  # snapshot del catálogo reutilizado entre plan y ejecución
         if payload.actions:
             # Verificar si son acciones de ejemplo de Swagger
             if len(payload.actions) == 1 and "additionalProp1" in payload.actions[0]:
                 logging.warning("nl_command: Ignorando acciones de ejemplo de Swagger")
-                plan = svc.plan_actions(db, usuario.usuario_id, payload.text, llm)
+                plan = await svc.plan_actions_async(db, usuario.usuario_id, payload.text, llm)
                 actions = plan.actions
+                snapshot = plan.snapshot
             else:
                 logging.info(f"nl_command: Usando {len(payload.actions)} acciones predefinidas")
                 try:
@@ -91,8 +97,9 @@ def nl_command(
                     logging.error(f"nl_command: Error deserializando acciones: {str(e)}")
                     raise ValueError(f"Formato de acciones inválido: {str(e)}")
         else:
-            plan = svc.plan_actions(db, usuario.usuario_id, payload.text, llm)
+            plan = await svc.plan_actions_async(db, usuario.usuario_id, payload.text, llm)
             actions = plan.actions
+            snapshot = plan.snapshot
 
         # Filtrar solo acciones permitidas
         allowed_actions = [a for a in actions if getattr(a, 'allow', True)]
@@ -101,12 +108,10 @@ def nl_command(
             logging.warning(f"nl_command: 0 de {len(actions)} acciones permitidas")
             return {"summary": "No hay acciones válidas para ejecutar", "results": []}
 
-        results = svc.execute_actions(db, usuario.usuario_id, allowed_actions)
+        results = await run_in_threadpool(svc.execute_actions, db, usuario.usuario_id, allowed_actions, snapshot)
         logging.info(f"nl_command: {len(results)} acciones ejecutadas exitosamente")
         
-        summary = "Acciones ejecutadas:\n" + "\n".join(f"- {r.get('kind')}" for r in results) if results else "Sin cambios."
-
-        return {"summary": summary, "results": results}
+        return {"summary": svc.summarize_results(results), "results": results}
 
     except PermissionError as e:
         logging.error(f"nl_command: Error de permisos: {str(e)}")
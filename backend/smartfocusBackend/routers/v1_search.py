@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_async_db
+from .. import auth, schemas
+from ..services import search_service as svc
+
+router = APIRouter(prefix="/api/v1/search", tags=["search"])
+
+
+@router.get(
+    "",
+    response_model=schemas.SearchResponse,
+    summary="Buscar materias y eventos propios por nombre (tolerante a acentos y typos)",
+)
+async def search_endpoint(
+    q: str = Query(..., min_length=1, max_length=100, description="Texto a buscar"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    usuario=Depends(auth.get_current_principal),
+):
+    materias, eventos = await svc.search_async(db, usuario.usuario_id, q.strip(), limit)
+    return schemas.SearchResponse(materias=materias, eventos=eventos)
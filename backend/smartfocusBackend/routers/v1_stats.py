@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_async_db
+from .. import auth, schemas
+from ..services import stats_service as svc
+
+router = APIRouter(prefix="/api/v1/stats", tags=["stats"])
+
+
+@router.get(
+    "",
+    response_model=schemas.StatsResponse,
+    summary="Dashboard: eventos por estado (global y por materia), vencidos y próximos",
+)
+async def stats_endpoint(
+    proximos: int = Query(5, ge=0, le=50, description="Cantidad de próximos eventos pendientes"),
+    db: AsyncSession = Depends(get_async_db),
+    usuario=Depends(auth.get_current_principal),
+):
+    stats = await svc.get_stats_async(db, usuario.usuario_id, proximos=proximos)
+    return schemas.StatsResponse(**{"global": stats.global_}, materias=stats.materias, proximos=stats.proximos)
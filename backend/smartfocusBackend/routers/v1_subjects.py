@@ -1,10 +1,12 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..database import get_db
+from ..database import get_async_db, get_db
 from .. import auth, schemas
 from ..services import subject_service as svc
+from ..services.pagination import set_next_cursor
 
 router = APIRouter(prefix="/api/v1/subjects", tags=["subjects"])
 
@@ -23,7 +25,7 @@ router = APIRouter(prefix="/api/v1/subjects", tags=["subjects"])
 def create_subject_endpoint(
     payload: schemas.MateriaCreate,
     db: Session = Depends(get_db),
-    usuario=Depends(auth.get_current_user),
+    usuario=Depends(auth.get_current_principal),
 ):
     try:
         # Forzamos ownership: ignoramos materia_usuario_id del payload y usamos el del usuario autenticado
@@ -39,14 +41,21 @@ def create_subject_endpoint(
     response_model=List[schemas.MateriaResponse],
     summary="Listar materias propias (búsqueda/paginado)",
 )
-def list_subjects_endpoint(
+async def list_subjects_endpoint(
+    response: Response,
     q: Optional[str] = Query(None, description="Buscar por nombre"),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
-    db: Session = Depends(get_db),
-    usuario=Depends(auth.get_current_user),
+    cursor: Optional[str] = Query(None, description="Cursor de X-Next-Cursor (si viene, se ignora skip)"),
+    db: AsyncSession = Depends(get_async_db),
+    usuario=Depends(auth.get_current_principal),
 ):
-    return svc.list_subjects(db, usuario.usuario_id, q, skip, limit)
+    try:
+        page = await svc.list_subjects_async(db, usuario.usuario_id, q, skip, limit, cursor)
+    except svc.CursorInvalido:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    set_next_cursor(response, page.next_cursor)
+    return page.items
 
 
 @router.get(
@@ -54,13 +63,13 @@ def list_subjects_endpoint(
     response_model=schemas.MateriaResponse,
     summary="Obtener una materia propia por ID",
 )
-def get_subject_endpoint(
+async def get_subject_endpoint(
     materia_id: int,
-    db: Session = Depends(get_db),
-    usuario=Depends(auth.get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    usuario=Depends(auth.get_current_principal),
 ):
     try:
-        return svc.get_subject(db, usuario.usuario_id, materia_id)
+        return await svc.get_subject_async(db, usuario.usuario_id, materia_id)
     except svc.MateriaNoEncontrada:
         raise HTTPException(status_code=404, detail="Materia no encontrada")
     except svc.AccesoNoAutorizado:
@@ -82,7 +91,7 @@ def update_subject_endpoint(
     materia_id: int,
     payload: schemas.MateriaUpdate,
     db: Session = Depends(get_db),
-    usuario=Depends(auth.get_current_user),
+    usuario=Depends(auth.get_current_principal),
 ):
     try:
         return svc.update_subject(db, usuario.usuario_id, materia_id, payload)
@@ -102,7 +111,7 @@ def update_subject_endpoint(
 def delete_subject_endpoint(
     materia_id: int,
     db: Session = Depends(get_db),
-    usuario=Depends(auth.get_current_user),
+    usuario=Depends(auth.get_current_principal),
 ):
     try:
         svc.delete_subject(db, usuario.usuario_id, materia_id)
@@ -0,0 +1,35 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_async_db
+from .. import auth, schemas
+from ..services import sync_service as svc
+
+router = APIRouter(prefix="/api/v1/sync", tags=["sync"])
+
+
+@router.get(
+    "",
+    response_model=schemas.SyncResponse,
+    summary="Materias y eventos cambiados (y ids borrados) desde el cursor",
+)
+async def sync_endpoint(
+    since: Optional[str] = Query(None, description="next_cursor de la sync anterior; vacío = sync completa"),
+    limit: int = Query(svc.SYNC_PAGE_LIMIT, ge=1, le=2000, description="Cambios máximos por tipo"),
+    db: AsyncSession = Depends(get_async_db),
+    usuario=Depends(auth.get_current_principal),
+):
+    try:
+        delta = await svc.sync_async(db, usuario.usuario_id, since, limit)
+    except svc.CursorInvalido:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    except svc.CursorExpirado:
+        raise HTTPException(status_code=410, detail="Cursor expirado: sincronizar de nuevo sin 'since'")
+    return schemas.SyncResponse(
+        materias=delta.materias,
+        eventos=delta.eventos,
+        eliminados=schemas.SyncEliminados(materias=delta.materias_eliminadas, eventos=delta.eventos_eliminados),
+        next_cursor=delta.next_cursor,
+        has_more=delta.has_more,
+    )
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 
 from ..database import get_db
 from .. import schemas
+from ..password_pool import PasswordPoolSaturado
 from ..services import user_service as svc
 
 router = APIRouter(prefix="/api/v1/users", tags=["users"])
@@ -16,6 +17,7 @@ router = APIRouter(prefix="/api/v1/users", tags=["users"])
     responses={
         201: {"description": "Usuario registrado"},
         409: {"description": "El email ya está registrado"},
+        503: {"description": "Servicio de hashing saturado"},
     },
 )
 def register_endpoint(
@@ -26,3 +28,9 @@ def register_endpoint(
         return svc.register_user(db, payload)
     except svc.UsuarioDuplicado:
         raise HTTPException(status_code=409, detail="El email ya está registrado")
+    except PasswordPoolSaturado:
+        raise HTTPException(
+            status_code=503,
+            detail="Servicio de autenticación saturado, reintentá en unos segundos",
+            headers={"Retry-After": "1"},
+        )
@@ -3,8 +3,10 @@ import logging
 
 from fastapi import APIRouter, Depends, File, Form, UploadFile, HTTPException
 from pydantic import BaseModel
+from sqlalchemy.orm import Session
 
 from .. import auth
+from ..database import get_db
 
 router = APIRouter(prefix="/api/v1/whisper", tags=["whisper"])
 
@@ -26,7 +28,8 @@ class AudioToNLResponse(BaseModel):
 async def process_audio_endpoint(
     file: UploadFile = File(..., description="Audio a procesar (mp3/wav/m4a/webm/ogg - máx 3MB)"),
     language: Optional[str] = Form("es", description="Idioma del audio"),
-    current_user=Depends(auth.get_current_user),
+    db: Session = Depends(get_db),
+    current_user=Depends(auth.get_current_principal),
 ):
     """
     Endpoint que SOLO recibe y valida el archivo de audio.
@@ -39,13 +42,12 @@ async def process_audio_endpoint(
         if not file:
             raise HTTPException(status_code=400, detail="Archivo de audio requerido")
         
-        # Obtener token JWT de la sesión actual
-        token = auth.crear_token(str(current_user.usuario_id))
-        
+        # El usuario ya está autenticado: se pasa directo junto con la sesión del request
         result = await process_audio_with_nl(
             file=file,
             language=language,
-            user_token=token
+            usuario_id=current_user.usuario_id,
+            db=db,
         )
         
         return AudioToNLResponse(**result)
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from datetime import datetime, date
-from typing import Literal, Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel, EmailStr, Field
 import enum
 
@@ -44,7 +44,12 @@ class ORMModel(BaseModel):
 class TokenResponse(BaseModel):
     token_type: str = "Bearer"
     access_token: str
-    # Si más adelante usas refresh tokens, puedes añadir: refresh_token: Optional[str] = None
+    # Opaco, de un solo uso: se canjea en /auth/refresh por un par nuevo (rotación)
+    refresh_token: Optional[str] = None
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str = Field(..., min_length=1, description="Refresh token recibido en /login o en el último /refresh")
 
 
 # =========================
@@ -111,6 +116,7 @@ class MateriaResponse(ORMModel):
     materia_nombre: str
     materia_descripcion: Optional[str] = None
     materia_created_at: datetime
+    materia_updated_at: Optional[datetime] = None
 
 
 # =========================
@@ -151,3 +157,70 @@ class EventoResponse(ORMModel):
     evento_fecha: date
     evento_estado: EventoEstado
     evento_created_at: datetime
+    evento_updated_at: Optional[datetime] = None
+
+
+class EventoColumnas(BaseModel):
+    """
+    Formato compacto de /events/range?format=columnar: arrays paralelos,
+    la posición i de cada lista corresponde al mismo evento.
+    """
+    evento_id: List[int] = Field(default_factory=list)
+    evento_materia_id: List[int] = Field(default_factory=list)
+    evento_fecha: List[date] = Field(default_factory=list)
+    evento_estado: List[EventoEstado] = Field(default_factory=list)
+
+
+# =========================
+# BÚSQUEDA
+# =========================
+class SearchResponse(BaseModel):
+    """Resultados de /api/v1/search ordenados por similitud con la consulta."""
+    materias: List[MateriaResponse] = Field(default_factory=list)
+    eventos: List[EventoResponse] = Field(default_factory=list)
+
+
+# =========================
+# SYNC INCREMENTAL
+# =========================
+class SyncEliminados(BaseModel):
+    materias: List[int] = Field(default_factory=list)
+    eventos: List[int] = Field(default_factory=list)
+
+
+class SyncResponse(BaseModel):
+    """
+    Cambios desde el cursor de /api/v1/sync. El cliente aplica upserts y borrados,
+    guarda `next_cursor` y, si `has_more`, vuelve a llamar enseguida.
+    """
+    materias: List[MateriaResponse] = Field(default_factory=list)
+    eventos: List[EventoResponse] = Field(default_factory=list)
+    eliminados: SyncEliminados = Field(default_factory=SyncEliminados)
+    next_cursor: str
+    has_more: bool = False
+
+
+# =========================
+# ESTADÍSTICAS (dashboard)
+# =========================
+class EstadoConteos(BaseModel):
+    pendiente: int = 0
+    aprobado: int = 0
+    desaprobado: int = 0
+    total: int = 0
+    vencidos_pendientes: int = Field(0, description="Pendientes con fecha anterior a hoy")
+
+
+class MateriaStatsResponse(EstadoConteos):
+    materia_id: int
+    materia_nombre: str
+
+
+class StatsResponse(BaseModel):
+    global_: EstadoConteos = Field(..., alias="global")
+    materias: List[MateriaStatsResponse] = Field(default_factory=list)
+    proximos: List[EventoResponse] = Field(default_factory=list, description="Próximos eventos pendientes (desde hoy)")
+
+    class Config:
+        populate_by_name = True                 # Pydantic v2
+        allow_population_by_field_name = True   # Pydantic v1
@@ -0,0 +1,17 @@
+# services/_db.py
+from __future__ import annotations
+
+from sqlalchemy.orm import Session
+
+
+def _persist(db: Session, obj=None, *, commit: bool = True) -> None:
+    """
+    commit=True: commit + refresh (comportamiento por defecto de los endpoints).
+    commit=False: solo flush; el llamador controla la transacción (p.ej. savepoints del executor NL).
+    """
+    if commit:
+        db.commit()
+        if obj is not None:
+            db.refresh(obj)
+    else:
+        db.flush()
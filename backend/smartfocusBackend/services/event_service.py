@@ -1,17 +1,26 @@
 # services/event_service.py
 from __future__ import annotations
 
-from typing import List, Optional
+from datetime import date
+from typing import Dict, List, Optional, Tuple, Union
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import select, delete as sa_delete
+from sqlalchemy import select, tuple_, delete as sa_delete
 
 from .. import models, schemas
+from ._db import _persist
+from .pagination import CursorInvalido, Page, build_page, decode_cursor  # CursorInvalido: lo mapea el router
+from .search_service import name_matches
 
 
 # Excepciones de dominio (el router las mapea a HTTP)
 class MateriaNoEncontrada(Exception): ...
 class EventoNoEncontrado(Exception): ...
 class AccesoNoAutorizado(Exception): ...
+class RangoInvalido(Exception): ...
+
+# Ventana máxima de /events/range (un año alcanza para cualquier vista de calendario)
+RANGE_MAX_DAYS = 366
 
 
 def _assert_materia_propia(db: Session, materia_id: int, usuario_id: int) -> models.Materia:
@@ -23,52 +32,76 @@ def _assert_materia_propia(db: Session, materia_id: int, usuario_id: int) -> mod
     return materia
 
 
-def _get_evento_autorizado(db: Session, evento_id: int, usuario_id: int) -> models.Evento:
-    ev = db.get(models.Evento, evento_id)
-    if not ev:
+def _evento_con_dueno_stmt(evento_id: int):
+    # Evento + dueño (denormalizado en evento_usuario_id, sin join). No se filtra por
+    # usuario en el WHERE a propósito: así se distingue "no existe" (sin fila) de "es de otro" (fila ajena).
+    return select(models.Evento, models.Evento.evento_usuario_id).where(models.Evento.evento_id == evento_id)
+
+
+def _check_dueno(row, usuario_id: int) -> models.Evento:
+    if row is None:
         raise EventoNoEncontrado()
-    mat = db.get(models.Materia, ev.evento_materia_id)
-    if not mat or mat.materia_usuario_id != usuario_id:
+    ev, dueno_id = row
+    if dueno_id != usuario_id:
         raise AccesoNoAutorizado()
     return ev
 
 
-def create_event(db: Session, usuario_id: int, payload: schemas.EventoCreate) -> models.Evento:
+def get_evento_autorizado(db: Session, evento_id: int, usuario_id: int) -> models.Evento:
+    """
+    Fetch autorizado en un round trip (antes: db.get(Evento) + db.get(Materia)).
+    Lo usan get/update/delete_event y, a través de ellos, el executor NL.
+    """
+    return _check_dueno(db.execute(_evento_con_dueno_stmt(evento_id)).one_or_none(), usuario_id)
+
+
+def create_event(db: Session, usuario_id: int, payload: schemas.EventoCreate, *, commit: bool = True) -> models.Evento:
     _assert_materia_propia(db, payload.evento_materia_id, usuario_id)
 
-    ev = models.Evento(
+    ev = _build_evento(usuario_id, payload)
+    db.add(ev)
+    _persist(db, ev, commit=commit)
+    return ev
+
+
+def _build_evento(usuario_id: int, payload: schemas.EventoCreate) -> models.Evento:
+    return models.Evento(
         evento_materia_id=payload.evento_materia_id,
+        evento_usuario_id=usuario_id,  # = dueño de la materia (ya verificado por el llamador)
         evento_nombre=payload.evento_nombre,
         evento_descripcion=payload.evento_descripcion,
         evento_fecha=payload.evento_fecha,
         evento_estado=payload.evento_estado,
     )
-    db.add(ev)
-    db.commit()
-    db.refresh(ev)
-    return ev
-
 
-def list_events(
-    db: Session,
-    usuario_id: int,
-    materia_id: int,
-    estado: Optional[schemas.EventoEstado] = None,
-    skip: int = 0,
-    limit: int = 50,
-) -> List[models.Evento]:
-    _assert_materia_propia(db, materia_id, usuario_id)
 
-    stmt = select(models.Evento).where(models.Evento.evento_materia_id == materia_id)
-    if estado:
-        stmt = stmt.where(models.Evento.evento_estado == estado)
-    stmt = stmt.order_by(models.Evento.evento_fecha.asc()).offset(skip).limit(limit)
-
-    return db.execute(stmt).scalars().all()
+def _duenos_stmt(materia_ids: List[int]):
+    return select(models.Materia.materia_id, models.Materia.materia_usuario_id).where(
+        models.Materia.materia_id.in_(materia_ids)
+    )
 
 
-def get_event(db: Session, usuario_id: int, evento_id: int) -> models.Evento:
-    return _get_evento_autorizado(db, evento_id, usuario_id)
+def build_events(
+    db: Session, usuario_id: int, payloads: List[schemas.EventoCreate]
+) -> List[Union[models.Evento, Exception]]:
+    """
+    Variante en lote de create_event para inserts en bloque (executor NL): misma
+    verificación de dueño de la materia, con una sola query para todo el lote.
+    No inserta nada: por cada payload devuelve el evento armado o la excepción
+    de dominio que habría lanzado create_event.
+    """
+    ids = list({p.evento_materia_id for p in payloads})
+    duenos: Dict[int, int] = dict(db.execute(_duenos_stmt(ids)).all()) if ids else {}
+    out: List[Union[models.Evento, Exception]] = []
+    for payload in payloads:
+        dueno = duenos.get(payload.evento_materia_id)
+        if dueno is None:
+            out.append(MateriaNoEncontrada())
+        elif dueno != usuario_id:
+            out.append(AccesoNoAutorizado())
+        else:
+            out.append(_build_evento(usuario_id, payload))
+    return out
 
 
 def update_event(
@@ -76,58 +109,101 @@ def update_event(
     usuario_id: int,
     evento_id: int,
     payload: schemas.EventoUpdate,
+    *,
+    commit: bool = True,
 ) -> models.Evento:
-    ev = _get_evento_autorizado(db, evento_id, usuario_id)
+    ev = get_evento_autorizado(db, evento_id, usuario_id)
 
     data = payload.model_dump(exclude_unset=True)
     for k, v in data.items():
         setattr(ev, k, v)
 
     db.add(ev)
-    db.commit()
-    db.refresh(ev)
+    _persist(db, ev, commit=commit)
     return ev
 
 
-def get_user_events(
-    db: Session, 
-    usuario_id: int,
-    q: Optional[str] = None,
-    skip: int = 0,
-    limit: int = 50,
-) -> List[models.Evento]:
-    """
-    Obtiene todos los eventos de todas las materias del usuario con búsqueda y paginación.
-    """
-    # Query que une eventos con materias para filtrar por usuario
-    stmt = (
-        select(models.Evento)
-        .join(models.Materia, models.Evento.evento_materia_id == models.Materia.materia_id)
-        .where(models.Materia.materia_usuario_id == usuario_id)
+def _range_stmt(stmt, usuario_id: int, desde: date, hasta: date, estado: Optional[str]):
+    if hasta < desde or (hasta - desde).days > RANGE_MAX_DAYS:
+        raise RangoInvalido()
+    # (evento_usuario_id, evento_fecha) -> range scan sobre idx_evento_usuario_fecha_id
+    stmt = stmt.where(
+        models.Evento.evento_usuario_id == usuario_id,
+        models.Evento.evento_fecha >= desde,
+        models.Evento.evento_fecha <= hasta,
     )
+    if estado:
+        stmt = stmt.where(models.Evento.evento_estado == estado)
+    return stmt.order_by(models.Evento.evento_fecha.asc(), models.Evento.evento_id.asc())
+
+
+# Columnas del formato compacto de calendario (todas en el INCLUDE del índice: index-only scan)
+_CALENDAR_COLUMNS = (
+    models.Evento.evento_id,
+    models.Evento.evento_materia_id,
+    models.Evento.evento_fecha,
+    models.Evento.evento_estado,
+)
+
+
+def _to_columns(rows) -> Dict[str, list]:
+    """Filas -> arrays paralelos (una lista por columna)."""
+    cols: Dict[str, list] = {c.key: [] for c in _CALENDAR_COLUMNS}
+    for row in rows:
+        for c, value in zip(_CALENDAR_COLUMNS, row):
+            cols[c.key].append(value)
+    return cols
+
+
+# Keyset: orden total (evento_fecha, evento_id); el id desempata fechas iguales
+_Cursor = Tuple[date, int]
+
+
+def _evento_key(ev: models.Evento) -> _Cursor:
+    return ev.evento_fecha, ev.evento_id
+
+
+def _decode(cursor: Optional[str]) -> Optional[_Cursor]:
+    return decode_cursor(cursor, (date.fromisoformat, int)) if cursor else None
+
+
+def _paginate(stmt, skip: int, limit: int, after: Optional[_Cursor]):
+    """Orden estable + keyset (si hay cursor) u OFFSET (compatibilidad). Pide limit+1 para saber si hay más."""
+    if after is not None:
+        stmt = stmt.where(tuple_(models.Evento.evento_fecha, models.Evento.evento_id) > tuple_(*after))
+    else:
+        stmt = stmt.offset(skip)
+    return stmt.order_by(models.Evento.evento_fecha.asc(), models.Evento.evento_id.asc()).limit(limit + 1)
+
+
+def _list_events_stmt(materia_id: int, estado: Optional[str], skip: int, limit: int, after: Optional[_Cursor] = None):
+    stmt = select(models.Evento).where(models.Evento.evento_materia_id == materia_id)
+    if estado:
+        stmt = stmt.where(models.Evento.evento_estado == estado)
+    return _paginate(stmt, skip, limit, after)
+
+
+def _user_events_stmt(usuario_id: int, q: Optional[str], skip: int, limit: int, after: Optional[_Cursor] = None):
+    # Filtro por el dueño denormalizado: sin join con materia; con el keyset
+    # (fecha, id) es un range scan sobre idx_evento_usuario_fecha_id
+    stmt = select(models.Evento).where(models.Evento.evento_usuario_id == usuario_id)
     
     # Búsqueda por nombre del evento si se proporciona 'q'
     if q:
-        try:
-            # Postgres: ILIKE para búsqueda insensible a mayúsculas
-            stmt = stmt.where(models.Evento.evento_nombre.ilike(f"%{q}%"))
-        except AttributeError:
-            # Fallback para dialectos sin ilike
-            stmt = stmt.where(models.Evento.evento_nombre.like(f"%{q}%"))
-    
-    # Ordenar por fecha y aplicar paginación
-    stmt = stmt.order_by(models.Evento.evento_fecha.asc()).offset(skip).limit(limit)
+        # Substring sin mayúsculas ni acentos; en Postgres usa el GIN trigram (ver search_service)
+        stmt = stmt.where(name_matches(models.Evento.evento_nombre, q))
     
-    return db.execute(stmt).scalars().all()
+    # Ordenar por (fecha, id) y aplicar paginación
+    return _paginate(stmt, skip, limit, after)
 
 
-def delete_event(db: Session, usuario_id: int, evento_id: int) -> None:
-    ev = _get_evento_autorizado(db, evento_id, usuario_id)
+def delete_event(db: Session, usuario_id: int, evento_id: int, *, commit: bool = True) -> None:
+    ev = get_evento_autorizado(db, evento_id, usuario_id)
     db.delete(ev)
-    db.commit()
+    _persist(db, commit=commit)
 
 
-def delete_events_by_materia(db: Session, usuario_id: int, materia_id: int) -> int:
+def delete_events_by_materia(db: Session, usuario_id: int, materia_id: int, *, commit: bool = True) -> int:
     """
     Elimina todos los eventos de una materia (verifica ownership).
     Retorna la cantidad de eventos eliminados.
@@ -138,12 +214,86 @@ def delete_events_by_materia(db: Session, usuario_id: int, materia_id: int) -> i
     # Borrar en bloque
     stmt = sa_delete(models.Evento).where(models.Evento.evento_materia_id == materia_id)
     res = db.execute(stmt)
-    db.commit()
+    _persist(db, commit=commit)
+
+    return _rowcount(res)
 
+
+def _rowcount(res) -> int:
     # rowcount puede ser None dependiendo del driver; manejar ese caso
     try:
-        deleted = int(res.rowcount) if getattr(res, 'rowcount', None) is not None else 0
+        return int(res.rowcount) if getattr(res, 'rowcount', None) is not None else 0
     except Exception:
-        deleted = 0
+        return 0
+
+
+# =========================
+# Versiones async (AsyncSession / asyncpg)
+# Misma semántica y excepciones que las sync; las queries se comparten.
+# =========================
+async def _assert_materia_propia_async(db: AsyncSession, materia_id: int, usuario_id: int) -> models.Materia:
+    materia = await db.get(models.Materia, materia_id)
+    if not materia:
+        raise MateriaNoEncontrada()
+    if materia.materia_usuario_id != usuario_id:
+        raise AccesoNoAutorizado()
+    return materia
+
+
+async def get_evento_autorizado_async(db: AsyncSession, evento_id: int, usuario_id: int) -> models.Evento:
+    return _check_dueno((await db.execute(_evento_con_dueno_stmt(evento_id))).one_or_none(), usuario_id)
+
+
+async def list_events_async(
+    db: AsyncSession,
+    usuario_id: int,
+    materia_id: int,
+    estado: Optional[schemas.EventoEstado] = None,
+    skip: int = 0,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+) -> Page[models.Evento]:
+    await _assert_materia_propia_async(db, materia_id, usuario_id)
+    rows = (await db.execute(_list_events_stmt(materia_id, estado, skip, limit, _decode(cursor)))).scalars().all()
+    return build_page(rows, limit, _evento_key)
+
+
+async def get_event_async(db: AsyncSession, usuario_id: int, evento_id: int) -> models.Evento:
+    return await get_evento_autorizado_async(db, evento_id, usuario_id)
+
+
+async def get_user_events_async(
+    db: AsyncSession,
+    usuario_id: int,
+    q: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+) -> Page[models.Evento]:
+    rows = (await db.execute(_user_events_stmt(usuario_id, q, skip, limit, _decode(cursor)))).scalars().all()
+    return build_page(rows, limit, _evento_key)
+
+
+async def list_events_in_range_async(
+    db: AsyncSession,
+    usuario_id: int,
+    desde: date,
+    hasta: date,
+    estado: Optional[schemas.EventoEstado] = None,
+) -> List[models.Evento]:
+    """Eventos del usuario con evento_fecha en [desde, hasta], ordenados por (fecha, id)."""
+    return (await db.execute(_range_stmt(select(models.Evento), usuario_id, desde, hasta, estado))).scalars().all()
+
+
+async def list_event_columns_in_range_async(
+    db: AsyncSession,
+    usuario_id: int,
+    desde: date,
+    hasta: date,
+    estado: Optional[schemas.EventoEstado] = None,
+) -> Dict[str, list]:
+    """Igual que list_events_in_range_async pero como arrays paralelos (id, materia, fecha, estado)."""
+    stmt = _range_stmt(select(*_CALENDAR_COLUMNS), usuario_id, desde, hasta, estado)
+    return _to_columns((await db.execute(stmt)).all())
+
 
-    return deleted
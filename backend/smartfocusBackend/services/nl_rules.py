@@ -0,0 +1,304 @@
+# services/nl_rules.py
+"""
+Parser determinístico (regex + mini gramática de fechas en español) para órdenes
+simples y formulaicas. Emite los mismos dicts {name, args} que
+gemini_client._parse_tool_calls, de modo que nl_service los procesa igual.
+Si la confianza es baja (referencias que no existen, varias órdenes en una
+frase, fechas ambiguas), nl_service cae al LLM.
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+# Por debajo de este umbral nl_service delega en Gemini
+FAST_PATH_MIN_CONFIDENCE = 0.9
+
+
+@dataclass
+class FastPathResult:
+    tool_calls: List[Dict[str, Any]]
+    confidence: float
+    rule: str
+
+
+# =========
+# Normalización (1 carácter original -> 1 carácter normalizado, para recortar spans)
+# =========
+def _fold_char(ch: str) -> str:
+    base = "".join(c for c in unicodedata.normalize("NFD", ch) if not unicodedata.combining(c))
+    return (base or ch).lower()[:1] or ch
+
+
+def _fold(text: str) -> str:
+    return "".join(_fold_char(c) for c in text)
+
+
+def _clean(text: str) -> str:
+    return " ".join((text or "").strip().rstrip(".!?").split())
+
+
+# =========
+# Gramática de fechas
+# =========
+_WEEKDAYS = {
+    "lunes": 0, "martes": 1, "miercoles": 2, "jueves": 3,
+    "viernes": 4, "sabado": 5, "domingo": 6,
+}
+_MONTHS = {
+    "enero": 1, "febrero": 2, "marzo": 3, "abril": 4, "mayo": 5, "junio": 6, "julio": 7,
+    "agosto": 8, "septiembre": 9, "setiembre": 9, "octubre": 10, "noviembre": 11, "diciembre": 12,
+}
+_NUMBERS = {"un": 1, "uno": 1, "una": 1, "dos": 2, "tres": 3, "cuatro": 4, "cinco": 5,
+            "seis": 6, "siete": 7, "ocho": 8, "nueve": 9, "diez": 10, "quince": 15}
+
+_DATE_RE = (
+    r"(?:(?:para|el|al|del|a|en)\s+)*"
+    r"(?P<fecha>"
+    r"hoy|pasado\s+manana|manana"
+    r"|(?:(?:este|proximo|el\s+proximo)\s+)?(?:lunes|martes|miercoles|jueves|viernes|sabado|domingo)(?:\s+que\s+viene)?"
+    r"|\d{1,2}[/-]\d{1,2}(?:[/-]\d{2,4})?"
+    r"|\d{4}-\d{2}-\d{2}"
+    r"|\d{1,2}\s+de\s+(?:enero|febrero|marzo|abril|mayo|junio|julio|agosto|septiembre|setiembre|octubre|noviembre|diciembre)(?:\s+de\s+\d{4})?"
+    r"|(?:dentro\s+de\s+)?(?:\d{1,2}|un|una|dos|tres|cuatro|cinco|seis|siete|ocho|nueve|diez|quince)\s+(?:dias?|semanas?)"
+    r"|la\s+semana\s+que\s+viene"
+    r")"
+)
+
+
+def _safe_date(y: int, m: int, d: int) -> Optional[date]:
+    try:
+        return date(y, m, d)
+    except ValueError:
+        return None
+
+
+def parse_fecha(expr: str, today: date) -> Optional[date]:
+    """Resuelve una expresión de fecha (ya normalizada) relativa a `today`."""
+    expr = " ".join(expr.split())
+    if expr == "hoy":
+        return today
+    if expr == "manana":
+        return today + timedelta(days=1)
+    if expr == "pasado manana":
+        return today + timedelta(days=2)
+    if expr == "la semana que viene":
+        return today + timedelta(days=7)
+
+    m = re.fullmatch(r"(?:(este|proximo|el proximo) )?(\w+)( que viene)?", expr)
+    if m and m.group(2) in _WEEKDAYS:
+        # Siempre la próxima ocurrencia estrictamente futura ("el viernes" dicho un viernes = +7)
+        delta = (_WEEKDAYS[m.group(2)] - today.weekday()) % 7 or 7
+        return today + timedelta(days=delta)
+
+    m = re.fullmatch(r"(\d{4})-(\d{2})-(\d{2})", expr)
+    if m:
+        return _safe_date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+
+    m = re.fullmatch(r"(\d{1,2})[/-](\d{1,2})(?:[/-](\d{2,4}))?", expr)
+    if m:
+        d, mo = int(m.group(1)), int(m.group(2))
+        if m.group(3):
+            y = int(m.group(3))
+            return _safe_date(y + 2000 if y < 100 else y, mo, d)
+        return _next_occurrence(today, mo, d)
+
+    m = re.fullmatch(r"(\d{1,2}) de (\w+)(?: de (\d{4}))?", expr)
+    if m and m.group(2) in _MONTHS:
+        d, mo = int(m.group(1)), _MONTHS[m.group(2)]
+        if m.group(3):
+            return _safe_date(int(m.group(3)), mo, d)
+        return _next_occurrence(today, mo, d)
+
+    m = re.fullmatch(r"(?:dentro de )?(\w+) (dias?|semanas?)", expr)
+    if m:
+        n = int(m.group(1)) if m.group(1).isdigit() else _NUMBERS.get(m.group(1))
+        if n is None:
+            return None
+        return today + timedelta(days=n * (7 if m.group(2).startswith("semana") else 1))
+
+    return None
+
+
+def _next_occurrence(today: date, month: int, day: int) -> Optional[date]:
+    """Fecha sin año: este año, o el próximo si ya pasó."""
+    d = _safe_date(today.year, month, day)
+    if d is not None and d < today:
+        d = _safe_date(today.year + 1, month, day)
+    return d
+
+
+# =========
+# Reglas
+# =========
+_CREATE_VERBS = r"crear|crea|creame|agregar|agrega|agregame|anadir|anade|anotar|anota|agendar|agenda|cargar|carga|registrar|registra"
+_CREATE = rf"(?:{_CREATE_VERBS}|nueva|nuevo)"
+_DELETE = r"(?:borrar|borra|borrame|eliminar|elimina|eliminame|quitar|quita|sacar|saca|cancelar|cancela)"
+_UPDATE = r"(?:cambiar|cambia|mover|move|pasar|pasa|reprogramar|reprograma|posponer|pospone)"
+_VERBS_RE = re.compile(rf"\b(?:{_CREATE_VERBS}|{_DELETE}|{_UPDATE}|marcar|marca|aprobe|desaprobe|renombrar|renombra)\b")
+
+_TIPOS = (
+    r"examen(?:\s+final)?|parcial(?:ito)?|final|recuperatorio|coloquio|oral|tp|trabajo\s+practico"
+    r"|entrega|evaluacion|prueba|quiz|presentacion|evento"
+)
+
+_RE_CREATE_MATERIA = re.compile(
+    rf"^(?:por favor\s+)?{_CREATE}\s+(?:(?:una|la)\s+)?(?:nueva\s+)?materia\s+(?:llamada\s+|que se llame\s+)?(?P<nombre>.+)$"
+)
+_RE_DELETE_MATERIA = re.compile(
+    rf"^(?:por favor\s+)?{_DELETE}\s+(?:(?:la|una)\s+)?materia\s+(?P<ref>.+)$"
+)
+_RE_CREATE_EVENTO = re.compile(
+    rf"^(?:por favor\s+)?{_CREATE}\s+(?:(?:un|una|el|la)\s+)?(?P<tipo>{_TIPOS})\s+(?:de|en|para)\s+(?P<resto>.+?)\s+{_DATE_RE}$"
+)
+_RE_DELETE_EVENTO = re.compile(
+    rf"^(?:por favor\s+)?{_DELETE}\s+(?:(?:el|la|un|una)\s+)?(?:evento\s+)?(?P<frase>.+)$"
+)
+_RE_MOVE_EVENTO = re.compile(
+    rf"^(?:por favor\s+)?{_UPDATE}\s+(?:la\s+fecha\s+(?:del|de\s+la)\s+|(?:el|la)\s+)?(?P<frase>.+?)\s+{_DATE_RE}$"
+)
+_RE_ESTADO_EVENTO = re.compile(
+    r"^(?:por favor\s+)?marca(?:r)?\s+(?:(?:el|la)\s+)?(?P<frase>.+?)\s+como\s+(?P<estado>pendiente|aprobado|desaprobado)$"
+)
+_RE_APROBE = re.compile(
+    r"^(?P<verbo>aprobe|desaprobe)\s+(?:(?:el|la)\s+)?(?P<frase>.+)$"
+)
+
+_DESCRIPCION_RE = re.compile(r"\b(?:con\s+descripcion|descripcion|que\s+diga|con\s+calculadora|con\s+apuntes)\b")
+
+
+def _match_materia(snapshot, folded_ref: str) -> Optional[Any]:
+    """Busca una materia del snapshot ignorando mayúsculas/acentos (y un 'la materia' inicial)."""
+    folded_ref = re.sub(r"^(?:la\s+)?materia\s+", "", " ".join(folded_ref.split()))
+    for m in snapshot.materias_by_id.values():
+        if " ".join(_fold(m.materia_nombre).split()) == folded_ref:
+            return m
+    return None
+
+
+def _split_evento_materia(snapshot, original: str, folded: str) -> Optional[Tuple[str, Any]]:
+    """
+    Parte '<evento> de <materia>' probando cada ' de ' (los nombres pueden
+    contener 'de') y se queda con el corte cuya materia existe en el snapshot.
+    Retorna (evento_ref_original, materia) o None.
+    """
+    for m in re.finditer(r"\s+(?:de|del|en)\s+(?:la\s+)?", folded):
+        evento_f = folded[: m.start()]
+        materia = _match_materia(snapshot, folded[m.end():])
+        if materia is not None and evento_f.strip():
+            return _clean(original[: m.start()]), materia
+    return None
+
+
+def _eventos_matching(snapshot, materia_id: int, evento_ref: str) -> List[Any]:
+    needle = _fold(evento_ref).strip()
+    return [e for e in snapshot.eventos_de(materia_id) if needle in _fold(e.evento_nombre or "")]
+
+
+def _evento_target(snapshot, original: str, folded: str) -> Optional[Tuple[Dict[str, Any], float]]:
+    """Resuelve '<evento> de <materia>' a args de update/delete + confianza."""
+    split = _split_evento_materia(snapshot, original, folded)
+    if split is None:
+        return None
+    evento_ref, materia = split
+    matches = _eventos_matching(snapshot, materia.materia_id, evento_ref)
+    if len(matches) != 1:
+        return {"evento_ref": evento_ref, "materia_ref": materia.materia_nombre}, 0.4
+    # Se emite el id del match (y el nombre canónico): el resolver de nl_service
+    # compara sin ignorar acentos y no encontraría "examen" en "Exámen final"
+    ev = matches[0]
+    return {"evento_id": ev.evento_id, "evento_ref": ev.evento_nombre, "materia_ref": materia.materia_nombre}, 1.0
+
+
+def parse(text: str, snapshot, today: date) -> Optional[FastPathResult]:
+    """
+    Intenta interpretar `text` sin LLM. `snapshot` es el UserCatalogSnapshot del
+    usuario (se usa para validar referencias y devolver nombres canónicos).
+    Retorna None si ninguna regla aplica.
+    """
+    original = _clean(text)
+    folded = _fold(original)
+    if not folded:
+        return None
+
+    # Varias órdenes en una misma frase: que las separe el LLM
+    if len(_VERBS_RE.findall(folded)) > 1:
+        return None
+
+    m = _RE_CREATE_MATERIA.match(folded)
+    if m:
+        nombre = _clean(original[m.start("nombre"):])
+        if not nombre or _DESCRIPCION_RE.search(m.group("nombre")):
+            return FastPathResult([], 0.3, "create_materia")
+        return FastPathResult(
+            [{"name": "create_materia", "args": {"materia_nombre": nombre}}], 0.95, "create_materia"
+        )
+
+    m = _RE_DELETE_MATERIA.match(folded)
+    if m:
+        materia = _match_materia(snapshot, m.group("ref"))
+        if materia is None:
+            return FastPathResult([], 0.3, "delete_materia")
+        return FastPathResult(
+            [{"name": "delete_materia", "args": {"materia_ref": materia.materia_nombre}}], 1.0, "delete_materia"
+        )
+
+    m = _RE_CREATE_EVENTO.match(folded)
+    if m:
+        fecha = parse_fecha(m.group("fecha"), today)
+        materia = _match_materia(snapshot, m.group("resto"))
+        if fecha is None or materia is None or _DESCRIPCION_RE.search(m.group("resto")):
+            return FastPathResult([], 0.3, "create_evento")
+        tipo = _clean(original[m.start("tipo"):m.end("tipo")])
+        return FastPathResult(
+            [{
+                "name": "create_evento",
+                "args": {
+                    "materia_ref": materia.materia_nombre,
+                    "evento_nombre": tipo.upper() if len(tipo) <= 2 else tipo[:1].upper() + tipo[1:],
+                    "evento_fecha": fecha.isoformat(),
+                    "evento_estado": "pendiente",
+                },
+            }],
+            1.0,
+            "create_evento",
+        )
+
+    m = _RE_MOVE_EVENTO.match(folded)
+    if m:
+        fecha = parse_fecha(m.group("fecha"), today)
+        target = _evento_target(snapshot, original[m.start("frase"):m.end("frase")], m.group("frase"))
+        if fecha is None or target is None:
+            return FastPathResult([], 0.3, "update_evento_fecha")
+        args, confidence = target
+        return FastPathResult(
+            [{"name": "update_evento", "args": {**args, "evento_fecha": fecha.isoformat()}}],
+            confidence,
+            "update_evento_fecha",
+        )
+
+    m = _RE_ESTADO_EVENTO.match(folded) or _RE_APROBE.match(folded)
+    if m:
+        estado = m.groupdict().get("estado") or ("aprobado" if m.group("verbo") == "aprobe" else "desaprobado")
+        target = _evento_target(snapshot, original[m.start("frase"):m.end("frase")], m.group("frase"))
+        if target is None:
+            return FastPathResult([], 0.3, "update_evento_estado")
+        args, confidence = target
+        return FastPathResult(
+            [{"name": "update_evento", "args": {**args, "evento_estado": estado}}],
+            confidence,
+            "update_evento_estado",
+        )
+
+    m = _RE_DELETE_EVENTO.match(folded)
+    if m:
+        target = _evento_target(snapshot, original[m.start("frase"):], m.group("frase"))
+        if target is None:
+            return FastPathResult([], 0.3, "delete_evento")
+        args, confidence = target
+        return FastPathResult([{"name": "delete_evento", "args": args}], confidence, "delete_evento")
+
+    return None
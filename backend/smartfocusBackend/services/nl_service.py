@@ -1,16 +1,24 @@
 # services/nl_service.py
 from __future__ import annotations
 
+import hashlib
 import logging
-from dataclasses import dataclass
+import os
+from dataclasses import dataclass, field
 from typing import Any, Dict, List, Literal, Optional
 from datetime import date
 
 from sqlalchemy.orm import Session
 from sqlalchemy import select
+from anyio import CapacityLimiter, to_thread
 
 from .. import models, schemas
-from . import subject_service, event_service
+from ..integrations.llm_cache import make_key, tool_call_cache
+from . import subject_service, event_service, nl_rules
+
+NL_LOCALE = "es-AR"
+# Parser de reglas antes del LLM (NL_FAST_PATH=0 para desactivarlo)
+NL_FAST_PATH_ENABLED = os.getenv("NL_FAST_PATH", "1").lower() not in ("0", "false", "no")
 
 ActionKind = Literal[
     "create_materia",
@@ -32,24 +40,156 @@ class PlannedAction:
 class PlanResult:
     actions: List[PlannedAction]
     summary: str
+    snapshot: Optional["UserCatalogSnapshot"] = None  # reutilizable por execute_actions
 
 
 # =========
-# Utilidades de acceso/ownership
+# Snapshot del catálogo del usuario (materias + eventos)
 # =========
-def _get_materia_by_name(db: Session, usuario_id: int, nombre: str) -> Optional[models.Materia]:
-    stmt = select(models.Materia).where(
-        models.Materia.materia_usuario_id == usuario_id,
-        models.Materia.materia_nombre == nombre.strip(),
-    )
-    return db.execute(stmt).scalar_one_or_none()
+@dataclass(frozen=True)
+class MateriaRef:
+    materia_id: int
+    materia_nombre: str
+
+@dataclass(frozen=True)
+class EventoRef:
+    evento_id: int
+    evento_materia_id: int
+    evento_nombre: str
+    evento_fecha: date
+
+@dataclass
+class UserCatalogSnapshot:
+    """
+    Carga una sola vez todas las materias y eventos del usuario y expone
+    índices por id y por nombre. Planificación y ejecución resuelven referencias
+    contra este snapshot, de modo que un comando NL cuesta una cantidad fija de
+    queries sin importar cuántas tool calls traiga.
+    Guarda filas planas (no instancias ORM) para que los commits intermedios
+    no las expiren y disparen recargas.
+    """
+    usuario_id: int
+    materias_by_id: Dict[int, MateriaRef] = field(default_factory=dict)
+    materias_by_name: Dict[str, MateriaRef] = field(default_factory=dict)
+    eventos_by_id: Dict[int, EventoRef] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, db: Session, usuario_id: int) -> "UserCatalogSnapshot":
+        snap = cls(usuario_id=usuario_id)
+
+        materias = db.execute(
+            select(models.Materia.materia_id, models.Materia.materia_nombre)
+            .where(models.Materia.materia_usuario_id == usuario_id)
+        ).all()
+        for m in materias:
+            snap.add_materia(m)
+
+        eventos = db.execute(
+            select(
+                models.Evento.evento_id,
+                models.Evento.evento_materia_id,
+                models.Evento.evento_nombre,
+                models.Evento.evento_fecha,
+            )
+            .where(models.Evento.evento_usuario_id == usuario_id)
+        ).all()
+        for e in eventos:
+            snap.add_evento(e)
+
+        logging.info(
+            f"UserCatalogSnapshot: {len(snap.materias_by_id)} materias y "
+            f"{len(snap.eventos_by_id)} eventos cargados para usuario {usuario_id}"
+        )
+        return snap
+
+    # --- mantenimiento (el executor lo actualiza a medida que crea/borra) ---
+    def add_materia(self, m: Any) -> None:
+        """Acepta una fila o un models.Materia (solo se copian id y nombre)."""
+        ref = MateriaRef(materia_id=m.materia_id, materia_nombre=m.materia_nombre)
+        prev = self.materias_by_id.get(ref.materia_id)
+        if prev is not None:  # renombre: descartar la clave vieja
+            self.materias_by_name.pop(prev.materia_nombre.strip(), None)
+        self.materias_by_id[ref.materia_id] = ref
+        self.materias_by_name[ref.materia_nombre.strip()] = ref
+
+    def remove_materia(self, materia_id: int) -> None:
+        m = self.materias_by_id.pop(materia_id, None)
+        if m is not None:
+            self.materias_by_name.pop(m.materia_nombre.strip(), None)
+        self.remove_eventos_de_materia(materia_id)
+
+    def add_evento(self, e: Any) -> None:
+        """Acepta una fila o un models.Evento."""
+        ref = EventoRef(
+            evento_id=e.evento_id,
+            evento_materia_id=e.evento_materia_id,
+            evento_nombre=e.evento_nombre,
+            evento_fecha=e.evento_fecha,
+        )
+        self.eventos_by_id[ref.evento_id] = ref
+
+    def remove_evento(self, evento_id: int) -> None:
+        self.eventos_by_id.pop(evento_id, None)
+
+    def remove_eventos_de_materia(self, materia_id: int) -> None:
+        for evid in [e.evento_id for e in self.eventos_de(materia_id)]:
+            self.eventos_by_id.pop(evid, None)
+
+    # --- consultas ---
+    def materia(self, materia_id: Optional[int]) -> Optional[MateriaRef]:
+        if not materia_id:
+            return None
+        try:
+            return self.materias_by_id.get(int(materia_id))
+        except (TypeError, ValueError):
+            return None
+
+    def materia_by_name(self, nombre: Optional[str]) -> Optional[MateriaRef]:
+        if not nombre:
+            return None
+        return self.materias_by_name.get(nombre.strip())
+
+    def evento(self, evento_id: Optional[int]) -> Optional[EventoRef]:
+        if not evento_id:
+            return None
+        try:
+            return self.eventos_by_id.get(int(evento_id))
+        except (TypeError, ValueError):
+            return None
+
+    def eventos_de(self, materia_id: int) -> List[EventoRef]:
+        return [e for e in self.eventos_by_id.values() if e.evento_materia_id == materia_id]
+
+    def version(self) -> str:
+        """Huella del catálogo (cambia si se crea/renombra/borra una materia o evento)."""
+        h = hashlib.sha1()
+        for m in sorted(self.materias_by_id.values(), key=lambda r: r.materia_id):
+            h.update(f"m{m.materia_id}:{m.materia_nombre}\n".encode("utf-8"))
+        for e in sorted(self.eventos_by_id.values(), key=lambda r: r.evento_id):
+            h.update(f"e{e.evento_id}:{e.evento_materia_id}:{e.evento_nombre}:{e.evento_fecha}\n".encode("utf-8"))
+        return h.hexdigest()
+
+    def find_evento_by_natural_key(self, materia_id: int, nombre: str, fecha_val) -> Optional[EventoRef]:
+        if isinstance(fecha_val, str):
+            try:
+                fecha_val = date.fromisoformat(fecha_val)
+            except ValueError:
+                return None
+        nombre = (nombre or "").strip()
+        for e in self.eventos_de(materia_id):
+            if e.evento_nombre == nombre and e.evento_fecha == fecha_val:
+                return e
+        return None
+
 
+# =========
+# Utilidades de acceso/ownership (resueltas contra el snapshot)
+# =========
 def _find_evento_by_references(
-    db: Session, 
-    usuario_id: int, 
-    evento_ref: Optional[str] = None, 
+    snapshot: UserCatalogSnapshot,
+    evento_ref: Optional[str] = None,
     materia_ref: Optional[str] = None
-) -> Optional[models.Evento]:
+) -> Optional[EventoRef]:
     """
     Busca evento por nombre y/o materia. Si materia tiene un solo evento y no se especifica evento_ref, 
     retorna ese evento único.
@@ -57,50 +197,36 @@ def _find_evento_by_references(
     # Si tenemos materia_ref, buscar la materia primero
     materia = None
     if materia_ref:
-        materia = _get_materia_by_name(db, usuario_id, materia_ref)
+        materia = snapshot.materia_by_name(materia_ref)
         if not materia:
             return None
-    
-    # Construir query base
-    query = select(models.Evento).join(models.Materia).where(
-        models.Materia.materia_usuario_id == usuario_id
+
+    eventos = (
+        snapshot.eventos_de(materia.materia_id) if materia
+        else list(snapshot.eventos_by_id.values())
     )
-    
-    # Filtrar por materia si se especificó
-    if materia:
-        query = query.where(models.Evento.evento_materia_id == materia.materia_id)
-    
-    # Filtrar por nombre del evento si se especificó
+
+    # Filtrar por nombre del evento si se especificó (equivalente a ILIKE '%ref%')
     if evento_ref:
-        query = query.where(models.Evento.evento_nombre.ilike(f"%{evento_ref.strip()}%"))
-    
-    eventos = db.execute(query).scalars().all()
-    
+        needle = evento_ref.strip().casefold()
+        eventos = [e for e in eventos if needle in (e.evento_nombre or "").casefold()]
+
     # Si encontramos exactamente un evento, retornarlo
     if len(eventos) == 1:
         return eventos[0]
-    
-    # Si hay múltiples eventos y no se especificó evento_ref, pero sí materia_ref
-    # verificar si la materia tiene exactamente un evento
-    if len(eventos) > 1 and not evento_ref and materia_ref:
-        # Verificar cuántos eventos tiene esta materia específica
-        materia_eventos = [e for e in eventos if e.evento_materia_id == materia.materia_id]
-        if len(materia_eventos) == 1:
-            return materia_eventos[0]
-    
+
     return None
 
-def _ensure_ownership_materia(db: Session, usuario_id: int, materia_id: int) -> models.Materia:
-    mat = db.get(models.Materia, materia_id)
-    if not mat or mat.materia_usuario_id != usuario_id:
+def _ensure_ownership_materia(snapshot: UserCatalogSnapshot, materia_id: int) -> MateriaRef:
+    mat = snapshot.materia(materia_id)
+    if not mat:
         raise ValueError("Materia no encontrada")
     return mat
 
-def _ensure_ownership_evento(db: Session, usuario_id: int, evento_id: int) -> models.Evento:
-    ev = db.get(models.Evento, evento_id)
+def _ensure_ownership_evento(snapshot: UserCatalogSnapshot, evento_id: int) -> EventoRef:
+    ev = snapshot.evento(evento_id)
     if not ev:
         raise ValueError("Evento no encontrado")
-    _ensure_ownership_materia(db, usuario_id, ev.evento_materia_id)
     return ev
 
 
@@ -112,12 +238,17 @@ def _normalize_tool_call(
     raw: Dict[str, Any],
     db: Session,
     usuario_id: int,
+    snapshot: Optional[UserCatalogSnapshot] = None,
 ) -> tuple[List[PlannedAction], List[str]]:
     """
     Normaliza un solo tool_call (puede expandirse a varias acciones).
     Soporta referencias por nombre de materia: arg 'materia_ref' (nombre) → materia_id.
+    Las referencias se resuelven contra el snapshot (se carga si no se pasa uno).
     Retorna (acciones_exitosas, errores_encontrados)
     """
+    if snapshot is None:
+        snapshot = UserCatalogSnapshot.load(db, usuario_id)
+
     name = raw.get("name")
     args = raw.get("args") or {}
     logging.info(f"_normalize_tool_call: Procesando tool '{name}' con args: {args}")
@@ -129,7 +260,7 @@ def _normalize_tool_call(
         def materia_ref_to_id(mref: Optional[str]) -> Optional[int]:
             if mref is None:
                 return None
-            found = _get_materia_by_name(db, usuario_id, mref)
+            found = snapshot.materia_by_name(mref)
             return found.materia_id if found else None
 
         if name == "create_materia":
@@ -162,7 +293,7 @@ def _normalize_tool_call(
                 errors.append(f"Actualizar materia: no se pudo identificar la materia (falta materia_id o materia_ref válido)")
             else:
                 try:
-                    _ensure_ownership_materia(db, usuario_id, materia_id)
+                    _ensure_ownership_materia(snapshot, materia_id)
                     update_args = {}
                     if materia_nombre is not None:
                         update_args["materia_nombre"] = materia_nombre.strip()
@@ -187,7 +318,7 @@ def _normalize_tool_call(
                 errors.append(f"Eliminar materia: no se pudo identificar la materia (falta materia_id o materia_ref válido)")
             else:
                 try:
-                    _ensure_ownership_materia(db, usuario_id, materia_id)
+                    _ensure_ownership_materia(snapshot, materia_id)
                     out.append(
                         PlannedAction(
                             kind="delete_materia",
@@ -226,7 +357,7 @@ def _normalize_tool_call(
                 errors.append(f"Crear evento: {', '.join(validation_errors)}")
             else:
                 try:
-                    _ensure_ownership_materia(db, usuario_id, materia_id)
+                    _ensure_ownership_materia(snapshot, materia_id)
                     out.append(
                         PlannedAction(
                             kind="create_evento",
@@ -253,7 +384,7 @@ def _normalize_tool_call(
                 
                 if evento_ref or materia_ref:
                     try:
-                        evento = _find_evento_by_references(db, usuario_id, evento_ref, materia_ref)
+                        evento = _find_evento_by_references(snapshot, evento_ref, materia_ref)
                         if evento:
                             evento_id = evento.evento_id
                             logging.info(f"_normalize_tool_call: Evento encontrado por referencias - ID: {evento_id}")
@@ -267,7 +398,7 @@ def _normalize_tool_call(
                     errors.append(f"Actualizar evento: proporciona evento_id, evento_ref, o materia_ref")
             else:
                 try:
-                    _ensure_ownership_evento(db, usuario_id, int(evento_id))
+                    _ensure_ownership_evento(snapshot, int(evento_id))
                     update_args = {}
                     for k in ("evento_nombre", "evento_fecha", "evento_estado", "evento_descripcion"):
                         if k in args and args[k] is not None:
@@ -292,7 +423,7 @@ def _normalize_tool_call(
                 
                 if evento_ref or materia_ref:
                     try:
-                        evento = _find_evento_by_references(db, usuario_id, evento_ref, materia_ref)
+                        evento = _find_evento_by_references(snapshot, evento_ref, materia_ref)
                         if evento:
                             evento_id = evento.evento_id
                             logging.info(f"_normalize_tool_call: Evento encontrado por referencias - ID: {evento_id}")
@@ -306,7 +437,7 @@ def _normalize_tool_call(
                     errors.append(f"Eliminar evento: proporciona evento_id, evento_ref, o materia_ref")
             else:
                 try:
-                    _ensure_ownership_evento(db, usuario_id, int(evento_id))
+                    _ensure_ownership_evento(snapshot, int(evento_id))
                     out.append(
                         PlannedAction(
                             kind="delete_evento",
@@ -335,7 +466,7 @@ def _normalize_tool_call(
             else:
                 try:
                     # verificar que la materia pertenece al usuario
-                    _ensure_ownership_materia(db, usuario_id, materia_id)
+                    _ensure_ownership_materia(snapshot, materia_id)
                     out.append(
                         PlannedAction(
                             kind="delete_eventos_materia",
@@ -363,21 +494,88 @@ def _normalize_tool_call(
 # =========
 # API del servicio
 # =========
-def plan_actions(db: Session, usuario_id: int, user_text: str, llm) -> PlanResult:
+async def plan_actions_async(
+    db: Session,
+    usuario_id: int,
+    user_text: str,
+    llm,
+    *,
+    limiter: Optional[CapacityLimiter] = None,
+) -> PlanResult:
     """
-    Obtiene tool_calls desde el cliente LLM, normaliza a acciones y
-    verifica existencias para aplicar la regla de idempotencia:
+    Obtiene tool_calls (reglas, cache o LLM), normaliza a acciones y verifica
+    existencias para aplicar la regla de idempotencia:
       - Si existe -> solo UPDATE/DELETE (CREATE prohibido)
       - Si NO existe -> solo CREATE (UPDATE/DELETE prohibido)
     Anota cada acción con: a.allow (bool), a.resolved (dict), a.conflict (str|None)
-    y construye un summary legible.
-    NUEVA FUNCIONALIDAD: Procesa múltiples acciones de manera independiente,
-    reportando errores individuales sin cancelar toda la operación.
+    y construye un summary legible. Las referencias se resuelven contra un
+    UserCatalogSnapshot cargado una sola vez, que viaja en el PlanResult para que
+    execute_actions lo reutilice. Sin bloquear el event loop:
+      - la carga del snapshot (única parte con DB) corre en el threadpool;
+      - órdenes simples se resuelven con el parser de reglas (nl_rules) sin LLM;
+      - con el snapshot se arma la clave del cache de tool calls; en un hit no se llama al LLM;
+      - en un miss, la llamada al LLM usa la generación async del SDK (no ocupa un hilo);
+      - la normalización/verificación es CPU pura contra el snapshot y corre en el event loop.
+    `limiter` permite acotar los hilos usados (p.ej. un pool propio para el pipeline de voz).
+    """
+    logging.info(f"plan_actions_async: Procesando texto del usuario: '{user_text}'")
+    snapshot = await to_thread.run_sync(UserCatalogSnapshot.load, db, usuario_id, limiter=limiter)
+    tool_calls = _fast_path_tool_calls(user_text, snapshot)
+    if tool_calls is not None:
+        return _plan_from_tool_calls(db, usuario_id, user_text, tool_calls, snapshot)
+
+    key = _tool_calls_cache_key(user_text, snapshot)
+    if tool_call_cache.db_enabled:
+        tool_calls = await to_thread.run_sync(tool_call_cache.get, key, limiter=limiter)
+    else:
+        tool_calls = tool_call_cache.get(key)
+    if tool_calls is None:
+        tool_calls = await llm.get_tool_calls_async(user_text, locale=NL_LOCALE)
+        if tool_call_cache.db_enabled:
+            await to_thread.run_sync(tool_call_cache.set, key, tool_calls, limiter=limiter)
+        else:
+            tool_call_cache.set(key, tool_calls)
+    else:
+        logging.info("plan_actions_async: Tool calls servidas desde cache")
+    return _plan_from_tool_calls(db, usuario_id, user_text, tool_calls, snapshot)
+
+
+def _fast_path_tool_calls(user_text: str, snapshot: UserCatalogSnapshot) -> Optional[List[Dict[str, Any]]]:
+    """Tool calls del parser de reglas si la confianza alcanza; None para delegar en el LLM."""
+    if not NL_FAST_PATH_ENABLED:
+        return None
+    try:
+        fast = nl_rules.parse(user_text, snapshot, date.today())
+    except Exception as e:
+        logging.warning(f"_fast_path_tool_calls: Error en parser de reglas, se usa el LLM: {str(e)}")
+        return None
+    if fast is None or fast.confidence < nl_rules.FAST_PATH_MIN_CONFIDENCE:
+        return None
+    logging.info(f"_fast_path_tool_calls: Regla '{fast.rule}' (confianza {fast.confidence}) sin LLM: {fast.tool_calls}")
+    return fast.tool_calls
+
+
+def _tool_calls_cache_key(user_text: str, snapshot: UserCatalogSnapshot) -> str:
+    return make_key(
+        user_text,
+        locale=NL_LOCALE,
+        today=date.today(),
+        catalog_version=snapshot.version(),
+    )
+
+
+def _plan_from_tool_calls(
+    db: Session,
+    usuario_id: int,
+    user_text: str,
+    tool_calls: List[Dict[str, Any]],
+    snapshot: UserCatalogSnapshot,
+) -> PlanResult:
+    """
+    Normaliza tool calls y aplica la regla de existencias contra el snapshot.
+    No toca la base de datos (el snapshot ya está cargado).
     """
-    logging.info(f"plan_actions: Procesando texto del usuario: '{user_text}'")
-    
     # 1) tool calls -> acciones normalizadas
-    tool_calls = llm.get_tool_calls(user_text, locale="es-AR")
     logging.info(f"plan_actions: Recibidas {len(tool_calls)} tool calls: {tool_calls}")
     
     actions: List[PlannedAction] = []
@@ -386,7 +584,7 @@ def plan_actions(db: Session, usuario_id: int, user_text: str, llm) -> PlanResul
     # Procesar cada tool call de manera independiente
     for i, call in enumerate(tool_calls):
         try:
-            normalized_actions, call_errors = _normalize_tool_call(call, db, usuario_id)
+            normalized_actions, call_errors = _normalize_tool_call(call, db, usuario_id, snapshot)
             logging.info(f"plan_actions: Tool call {i+1} '{call.get('name')}' generó {len(normalized_actions)} acciones normalizadas")
             actions.extend(normalized_actions)
             
@@ -401,25 +599,6 @@ def plan_actions(db: Session, usuario_id: int, user_text: str, llm) -> PlanResul
             logging.error(f"plan_actions: {error_msg}")
 
     # 2) verificación de existencias + regla de negocio (allow/conflict/resolved)
-    def _find_materia_by_name(uid: int, nombre: str) -> Optional[models.Materia]:
-        q = select(models.Materia).where(
-            models.Materia.materia_usuario_id == uid,
-            models.Materia.materia_nombre == nombre.strip()
-        )
-        return db.execute(q).scalar_one_or_none()
-
-    def _find_evento_by_natural_key(mid: int, nombre: str, fecha_val) -> Optional[models.Evento]:
-        if isinstance(fecha_val, str):
-            try:
-                fecha_val = date.fromisoformat(fecha_val)
-            except ValueError:
-                return None
-        q = select(models.Evento).where(
-            models.Evento.evento_materia_id == mid,
-            models.Evento.evento_nombre == nombre.strip(),
-            models.Evento.evento_fecha == fecha_val,
-        )
-        return db.execute(q).scalar_one_or_none()
 
     summary_lines: List[str] = []
     
@@ -432,7 +611,11 @@ def plan_actions(db: Session, usuario_id: int, user_text: str, llm) -> PlanResul
     
     if not actions and not processing_errors:
         logging.warning(f"plan_actions: No se generaron acciones ni errores para el texto '{user_text}'. Tool calls recibidas: {tool_calls}")
-        return PlanResult(actions=[], summary="No se detectaron acciones válidas. Podés reformular o ser más específico.")
+        return PlanResult(
+            actions=[],
+            summary="No se detectaron acciones válidas. Podés reformular o ser más específico.",
+            snapshot=snapshot,
+        )
     
     # Procesar acciones válidas
     if actions:
@@ -457,7 +640,7 @@ def plan_actions(db: Session, usuario_id: int, user_text: str, llm) -> PlanResul
             if kind == "create_materia":
                 nombre = args.get("materia_nombre", "")
                 logging.info(f"plan_actions: Verificando si materia '{nombre}' ya existe para usuario {usuario_id}")
-                m = _find_materia_by_name(usuario_id, nombre) if nombre else None
+                m = snapshot.materia_by_name(nombre)
                 a.resolved["materia_id"] = m.materia_id if m else None
                 if m:
                     a.allow = False
@@ -471,10 +654,10 @@ def plan_actions(db: Session, usuario_id: int, user_text: str, llm) -> PlanResul
             elif kind in ("update_materia", "delete_materia"):
                 mid = args.get("materia_id")
                 if not mid and "materia_nombre" in args:
-                    m2 = _find_materia_by_name(usuario_id, args["materia_nombre"])
+                    m2 = snapshot.materia_by_name(args["materia_nombre"])
                     mid = m2.materia_id if m2 else None
                 a.resolved["materia_id"] = mid
-                if not mid or not db.get(models.Materia, mid):
+                if not snapshot.materia(mid):
                     a.allow = False
                     a.conflict = "Materia no existe; no se permite update/delete."
                     summary_lines.append(f"   ✖ {kind.replace('_', ' ').title()} materia: no existe.")
@@ -499,14 +682,14 @@ def plan_actions(db: Session, usuario_id: int, user_text: str, llm) -> PlanResul
                             continue
                         else:
                             # Buscar materia existente
-                            materia = _find_materia_by_name(usuario_id, materia_ref)
+                            materia = snapshot.materia_by_name(materia_ref)
                             if materia:
                                 mid = materia.materia_id
                                 a.resolved["materia_id"] = mid
                 
                 a.resolved["materia_id"] = mid
 
-                m_ok = bool(mid and db.get(models.Materia, mid))
+                m_ok = snapshot.materia(mid) is not None
                 if not m_ok and not a.resolved.get("will_be_created"):
                     a.allow = False
                     a.conflict = "Materia no existe; no se puede crear el evento."
@@ -516,7 +699,7 @@ def plan_actions(db: Session, usuario_id: int, user_text: str, llm) -> PlanResul
                     # Ya se manejo arriba, no hacer nada más
                     pass
                 else:
-                    ev = _find_evento_by_natural_key(mid, nombre, fecha_val)
+                    ev = snapshot.find_evento_by_natural_key(mid, nombre, fecha_val)
                     a.resolved["evento_id"] = ev.evento_id if ev else None
                     if ev:
                         a.allow = False
@@ -532,7 +715,7 @@ def plan_actions(db: Session, usuario_id: int, user_text: str, llm) -> PlanResul
             elif kind in ("update_evento", "delete_evento"):
                 evid = args.get("evento_id")
                 a.resolved["evento_id"] = evid
-                ev = db.get(models.Evento, evid) if evid else None
+                ev = snapshot.evento(evid)
                 if not ev:
                     a.allow = False
                     a.conflict = "Evento no existe; no se permite update/delete."
@@ -564,13 +747,285 @@ def plan_actions(db: Session, usuario_id: int, user_text: str, llm) -> PlanResul
             summary_lines.append(f"📊 RESUMEN: Se detectaron {total_requested} instrucciones. {total_valid} se pueden ejecutar.")
 
     summary = "\n".join(summary_lines)
-    return PlanResult(actions=actions, summary=summary)
+    return PlanResult(actions=actions, summary=summary, snapshot=snapshot)
+
+
+def _materia_to_dict(m: models.Materia) -> Dict[str, Any]:
+    return {
+        "materia_id": m.materia_id,
+        "materia_nombre": m.materia_nombre,
+        "materia_descripcion": m.materia_descripcion,
+        "materia_usuario_id": m.materia_usuario_id,
+        "materia_created_at": m.materia_created_at.isoformat() if m.materia_created_at else None
+    }
+
+
+def _evento_to_dict(e: models.Evento) -> Dict[str, Any]:
+    return {
+        "evento_id": e.evento_id,
+        "evento_nombre": e.evento_nombre,
+        "evento_descripcion": e.evento_descripcion,
+        "evento_fecha": e.evento_fecha.isoformat() if e.evento_fecha else None,
+        "evento_estado": e.evento_estado,
+        "evento_materia_id": e.evento_materia_id,
+        "evento_created_at": e.evento_created_at.isoformat() if e.evento_created_at else None
+    }
+
+
+def _error_result(i: int, a: PlannedAction, e: Exception) -> tuple[Dict[str, Any], str]:
+    logging.error(f"execute_actions: Error ejecutando acción {a.kind}: {str(e)}", exc_info=True)
+    return (
+        {"kind": a.kind, "status": "error", "error": str(e), "description": a.description},
+        f"Acción {i+1} ({a.kind}): {str(e)}",
+    )
+
+
+def _created_result(
+    a: PlannedAction, obj: Any, created_materias: Dict[str, int], snapshot: UserCatalogSnapshot
+) -> Dict[str, Any]:
+    """Registra una materia/evento recién creado (para referencias posteriores) y arma su resultado."""
+    if a.kind == "create_materia":
+        created_materias[obj.materia_nombre] = obj.materia_id
+        snapshot.add_materia(obj)
+        return {"kind": a.kind, "status": "success", "materia": _materia_to_dict(obj)}
+    snapshot.add_evento(obj)
+    return {"kind": a.kind, "status": "success", "evento": _evento_to_dict(obj)}
+
+
+def _execute_single(
+    db: Session,
+    usuario_id: int,
+    i: int,
+    a: PlannedAction,
+    created_materias: Dict[str, int],
+    snapshot: UserCatalogSnapshot,
+    *,
+    commit: bool = True,
+) -> tuple[Dict[str, Any], Optional[str]]:
+    """
+    Ejecuta una acción vía los servicios de dominio.
+    Retorna (resultado_serializable, mensaje_de_error | None).
+    """
+    try:
+        logging.info(f"execute_actions: Procesando acción {i+1}: {a.kind}")
+
+        # Verificar que la acción esté permitida
+        if not getattr(a, 'allow', True):
+            logging.warning(f"execute_actions: Acción {a.kind} no permitida, saltando")
+            error_msg = f"Acción {i+1} ({a.kind}): no permitida - {getattr(a, 'conflict', 'sin razón específica')}"
+            return {
+                "kind": a.kind, 
+                "status": "skipped", 
+                "reason": getattr(a, 'conflict', 'no permitida'),
+                "description": a.description
+            }, error_msg
+
+        # Resolver dependencias dinámicamente para eventos
+        if a.kind in ("create_evento", "update_evento", "delete_evento"):
+            a.args = _resolve_materia_dependencies(a.args, created_materias, snapshot)
+
+        # Ejecutar según el tipo de acción
+        if a.kind == "create_materia":
+            logging.info(f"execute_actions: Creando materia con args: {a.args}")
+            payload = schemas.MateriaCreate(**a.args)
+            m = subject_service.create_subject(db, usuario_id, payload, commit=commit)
+            logging.info(f"execute_actions: Materia '{m.materia_nombre}' creada con ID {m.materia_id}")
+            return _created_result(a, m, created_materias, snapshot), None
+
+        if a.kind == "update_materia":
+            # Hacer copia de args para no modificar el original
+            args_copy = a.args.copy()
+            mid = args_copy.pop("materia_id")
+            logging.info(f"execute_actions: Actualizando materia {mid} con args: {args_copy}")
+            payload = schemas.MateriaUpdate(**args_copy)
+            m = subject_service.update_subject(db, usuario_id, mid, payload, commit=commit)
+            snapshot.add_materia(m)
+            return {"kind": a.kind, "status": "success", "materia": _materia_to_dict(m)}, None
+
+        if a.kind == "delete_materia":
+            mid = a.args["materia_id"]
+            logging.info(f"execute_actions: Eliminando materia {mid}")
+            subject_service.delete_subject(db, usuario_id, mid, commit=commit)
+            snapshot.remove_materia(mid)
+            return {"kind": a.kind, "status": "success", "deleted": {"materia_id": mid}}, None
+
+        if a.kind == "create_evento":
+            logging.info(f"execute_actions: Creando evento con args: {a.args}")
+            payload = schemas.EventoCreate(**a.args)
+            e = event_service.create_event(db, usuario_id, payload, commit=commit)
+            return _created_result(a, e, created_materias, snapshot), None
+
+        if a.kind == "update_evento":
+            # Hacer copia de args para no modificar el original
+            args_copy = a.args.copy()
+            evid = args_copy.pop("evento_id")
+            logging.info(f"execute_actions: Actualizando evento {evid} con args: {args_copy}")
+            payload = schemas.EventoUpdate(**args_copy)
+            e = event_service.update_event(db, usuario_id, evid, payload, commit=commit)
+            snapshot.add_evento(e)
+            return {"kind": a.kind, "status": "success", "evento": _evento_to_dict(e)}, None
+
+        if a.kind == "delete_evento":
+            evid = a.args["evento_id"]
+            logging.info(f"execute_actions: Eliminando evento {evid}")
+            event_service.delete_event(db, usuario_id, evid, commit=commit)
+            snapshot.remove_evento(evid)
+            return {"kind": a.kind, "status": "success", "deleted": {"evento_id": evid}}, None
+
+        if a.kind == "delete_eventos_materia":
+            mid = int(a.args.get("materia_id"))
+            logging.info(f"execute_actions: Eliminando todos los eventos de la materia {mid}")
+            deleted_count = event_service.delete_events_by_materia(db, usuario_id, mid, commit=commit)
+            snapshot.remove_eventos_de_materia(mid)
+            logging.info(f"execute_actions: Eliminados {deleted_count} eventos de la materia {mid}")
+            return {"kind": a.kind, "status": "success", "deleted_count": deleted_count}, None
+
+        logging.warning(f"execute_actions: Tipo de acción desconocido: {a.kind}")
+        return {
+            "kind": a.kind, 
+            "status": "error", 
+            "error": "Tipo de acción desconocido",
+            "description": a.description
+        }, f"Acción {i+1}: tipo desconocido '{a.kind}'"
+
+    except Exception as e:
+        # Continuamos con las siguientes acciones
+        return _error_result(i, a, e)
+
+
+def _execute_in_savepoint(
+    db: Session,
+    usuario_id: int,
+    i: int,
+    a: PlannedAction,
+    created_materias: Dict[str, int],
+    snapshot: UserCatalogSnapshot,
+) -> tuple[Dict[str, Any], Optional[str]]:
+    """Ejecuta una acción dentro de un SAVEPOINT: si falla, solo se deshace esa acción."""
+    sp = db.begin_nested()
+    result, error = _execute_single(db, usuario_id, i, a, created_materias, snapshot, commit=False)
+    if result.get("status") == "error":
+        sp.rollback()
+    else:
+        sp.commit()
+    return result, error
+
+
+def _bulk_insert(db: Session, objs: List[Any]) -> bool:
+    """
+    Inserta todos los objetos en un único flush dentro de un SAVEPOINT.
+    SQLAlchemy agrupa los INSERT en una sentencia multi-fila con RETURNING
+    (ids y server defaults). Retorna False si el lote falló y fue deshecho.
+    """
+    if not objs:
+        return True
+    sp = db.begin_nested()
+    try:
+        db.add_all(objs)
+        db.flush()
+        sp.commit()
+        return True
+    except Exception as e:
+        sp.rollback()
+        logging.warning(f"execute_actions: Falló el insert en bloque ({len(objs)} filas), reintentando una por una: {str(e)}")
+        return False
+
+
+# Acciones que se insertan en bloque cuando aparecen contiguas en el plan
+_BULK_KINDS = ("create_materia", "create_evento")
+
+
+def _is_bulk_candidate(a: PlannedAction) -> bool:
+    return a.kind in _BULK_KINDS and getattr(a, 'allow', True)
+
+
+def _execute_create_run(
+    db: Session,
+    usuario_id: int,
+    start: int,
+    run: List[PlannedAction],
+    created_materias: Dict[str, int],
+    snapshot: UserCatalogSnapshot,
+) -> List[tuple[Dict[str, Any], Optional[str]]]:
+    """
+    Inserta en bloque un tramo contiguo de creates del mismo tipo. La validación y
+    normalización son las de los servicios (build_subjects / build_events), igual
+    que create_subject / create_event. Si el INSERT falla, se reintenta de a una.
+    """
+    kind = run[0].kind
+    outcomes: Dict[int, tuple[Dict[str, Any], Optional[str]]] = {}
+    payloads: List[tuple[int, PlannedAction, Any]] = []
+    for i, a in enumerate(run, start):
+        try:
+            if kind == "create_evento":
+                a.args = _resolve_materia_dependencies(a.args, created_materias, snapshot)
+                payloads.append((i, a, schemas.EventoCreate(**a.args)))
+            else:
+                payloads.append((i, a, schemas.MateriaCreate(**a.args)))
+        except Exception as e:
+            outcomes[i] = _error_result(i, a, e)
+
+    build = subject_service.build_subjects if kind == "create_materia" else event_service.build_events
+    batch: List[tuple[int, PlannedAction, Any]] = []
+    for (i, a, _), obj in zip(payloads, build(db, usuario_id, [p for _, _, p in payloads])):
+        if isinstance(obj, Exception):
+            outcomes[i] = _error_result(i, a, obj)
+        else:
+            batch.append((i, a, obj))
+
+    if _bulk_insert(db, [obj for _, _, obj in batch]):
+        for i, a, obj in batch:
+            outcomes[i] = (_created_result(a, obj, created_materias, snapshot), None)
+    else:
+        for i, a, _ in batch:
+            outcomes[i] = _execute_in_savepoint(db, usuario_id, i, a, created_materias, snapshot)
+    logging.info(f"execute_actions: {len(batch)} acciones {kind} insertadas en bloque")
+    return [outcomes[i] for i in range(start, start + len(run))]
+
+
+def _execute_batched(
+    db: Session,
+    usuario_id: int,
+    ordered_actions: List[PlannedAction],
+    created_materias: Dict[str, int],
+    snapshot: UserCatalogSnapshot,
+) -> List[tuple[Dict[str, Any], Optional[str]]]:
+    """
+    Ejecuta el plan en una sola transacción y en su orden: cada tramo contiguo de
+    create_materia o create_evento va en bloque (un INSERT ... RETURNING); el resto
+    de las acciones, cada una en su propio SAVEPOINT. Así cada acción sigue
+    pudiendo fallar por separado. Un único commit al final.
+    """
+    outcomes: List[tuple[Dict[str, Any], Optional[str]]] = []
+    i = 0
+    while i < len(ordered_actions):
+        a = ordered_actions[i]
+        if not _is_bulk_candidate(a):
+            outcomes.append(_execute_in_savepoint(db, usuario_id, i, a, created_materias, snapshot))
+            i += 1
+            continue
+        j = i + 1
+        while j < len(ordered_actions) and ordered_actions[j].kind == a.kind and _is_bulk_candidate(ordered_actions[j]):
+            j += 1
+        outcomes.extend(_execute_create_run(db, usuario_id, i, ordered_actions[i:j], created_materias, snapshot))
+        i = j
+
+    try:
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return outcomes
 
 
 def execute_actions(
     db: Session,
     usuario_id: int,
     actions: List[PlannedAction],
+    snapshot: Optional[UserCatalogSnapshot] = None,
+    *,
+    batched: bool = True,
 ) -> List[Dict[str, Any]]:
     """
     Ejecuta las acciones usando los servicios de dominio.
@@ -578,10 +1033,13 @@ def execute_actions(
     NUEVA FUNCIONALIDAD: 
     - Procesa acciones de manera independiente, continuando aunque algunas fallen
     - Resuelve dependencias automáticamente (crear materia antes que eventos de esa materia)
+    - Resuelve referencias contra el snapshot del plan (o carga uno si no se pasa)
+    - batched=True: todo el plan en una transacción (savepoint por acción, inserts
+      en bloque, un solo commit). batched=False: un commit por acción.
     """
     logging.info(f"execute_actions: Ejecutando {len(actions)} acciones para usuario {usuario_id}")
-    results: List[Dict[str, Any]] = []
-    execution_errors: List[str] = []
+    if snapshot is None:
+        snapshot = UserCatalogSnapshot.load(db, usuario_id)
 
     # Separar acciones por tipo y ordenar por dependencias
     ordered_actions = _order_actions_by_dependencies(actions)
@@ -590,151 +1048,16 @@ def execute_actions(
     # Mapear nombres de materias a IDs creados durante la ejecución
     created_materias: Dict[str, int] = {}
 
-    for i, a in enumerate(ordered_actions):
-        try:
-            logging.info(f"execute_actions: Procesando acción {i+1}/{len(ordered_actions)}: {a.kind}")
-            
-            # Verificar que la acción esté permitida
-            if not getattr(a, 'allow', True):
-                logging.warning(f"execute_actions: Acción {a.kind} no permitida, saltando")
-                error_msg = f"Acción {i+1} ({a.kind}): no permitida - {getattr(a, 'conflict', 'sin razón específica')}"
-                execution_errors.append(error_msg)
-                results.append({
-                    "kind": a.kind, 
-                    "status": "skipped", 
-                    "reason": getattr(a, 'conflict', 'no permitida'),
-                    "description": a.description
-                })
-                continue
-
-            # Resolver dependencias dinámicamente para eventos
-            if a.kind in ("create_evento", "update_evento", "delete_evento"):
-                a.args = _resolve_materia_dependencies(a.args, created_materias, db, usuario_id)
-
-            # Ejecutar según el tipo de acción
-            if a.kind == "create_materia":
-                logging.info(f"execute_actions: Creando materia con args: {a.args}")
-                payload = schemas.MateriaCreate(**a.args)
-                m = subject_service.create_subject(db, usuario_id, payload)
-                
-                # Registrar la materia creada para futuras referencias
-                materia_nombre = m.materia_nombre
-                created_materias[materia_nombre] = m.materia_id
-                logging.info(f"execute_actions: Materia '{materia_nombre}' creada con ID {m.materia_id}")
-                
-                # Convertir el objeto ORM a diccionario serializable
-                materia_dict = {
-                    "materia_id": m.materia_id,
-                    "materia_nombre": m.materia_nombre,
-                    "materia_descripcion": m.materia_descripcion,
-                    "materia_usuario_id": m.materia_usuario_id,
-                    "materia_created_at": m.materia_created_at.isoformat() if m.materia_created_at else None
-                }
-                results.append({"kind": a.kind, "status": "success", "materia": materia_dict})
-                logging.info(f"execute_actions: Materia creada exitosamente: {materia_dict}")
-
-            elif a.kind == "update_materia":
-                # Hacer copia de args para no modificar el original
-                args_copy = a.args.copy()
-                mid = args_copy.pop("materia_id")
-                logging.info(f"execute_actions: Actualizando materia {mid} con args: {args_copy}")
-                payload = schemas.MateriaUpdate(**args_copy)
-                m = subject_service.update_subject(db, usuario_id, mid, payload)
-                # Convertir el objeto ORM a diccionario serializable
-                materia_dict = {
-                    "materia_id": m.materia_id,
-                    "materia_nombre": m.materia_nombre,
-                    "materia_descripcion": m.materia_descripcion,
-                    "materia_usuario_id": m.materia_usuario_id,
-                    "materia_created_at": m.materia_created_at.isoformat() if m.materia_created_at else None
-                }
-                results.append({"kind": a.kind, "status": "success", "materia": materia_dict})
-                logging.info(f"execute_actions: Materia actualizada exitosamente: {materia_dict}")
-
-            elif a.kind == "delete_materia":
-                mid = a.args["materia_id"]
-                logging.info(f"execute_actions: Eliminando materia {mid}")
-                subject_service.delete_subject(db, usuario_id, mid)
-                results.append({"kind": a.kind, "status": "success", "deleted": {"materia_id": mid}})
-                logging.info(f"execute_actions: Materia {mid} eliminada exitosamente")
-
-            elif a.kind == "create_evento":
-                logging.info(f"execute_actions: Creando evento con args: {a.args}")
-                payload = schemas.EventoCreate(**a.args)
-                e = event_service.create_event(db, usuario_id, payload)
-                # Convertir el objeto ORM a diccionario serializable
-                evento_dict = {
-                    "evento_id": e.evento_id,
-                    "evento_nombre": e.evento_nombre,
-                    "evento_descripcion": e.evento_descripcion,
-                    "evento_fecha": e.evento_fecha.isoformat() if e.evento_fecha else None,
-                    "evento_estado": e.evento_estado,
-                    "evento_materia_id": e.evento_materia_id,
-                    "evento_created_at": e.evento_created_at.isoformat() if e.evento_created_at else None
-                }
-                results.append({"kind": a.kind, "status": "success", "evento": evento_dict})
-                logging.info(f"execute_actions: Evento creado exitosamente: {evento_dict}")
-
-            elif a.kind == "update_evento":
-                # Hacer copia de args para no modificar el original
-                args_copy = a.args.copy()
-                evid = args_copy.pop("evento_id")
-                logging.info(f"execute_actions: Actualizando evento {evid} con args: {args_copy}")
-                payload = schemas.EventoUpdate(**args_copy)
-                e = event_service.update_event(db, usuario_id, evid, payload)
-                # Convertir el objeto ORM a diccionario serializable
-                evento_dict = {
-                    "evento_id": e.evento_id,
-                    "evento_nombre": e.evento_nombre,
-                    "evento_descripcion": e.evento_descripcion,
-                    "evento_fecha": e.evento_fecha.isoformat() if e.evento_fecha else None,
-                    "evento_estado": e.evento_estado,
-                    "evento_materia_id": e.evento_materia_id,
-                    "evento_created_at": e.evento_created_at.isoformat() if e.evento_created_at else None
-                }
-                results.append({"kind": a.kind, "status": "success", "evento": evento_dict})
-                logging.info(f"execute_actions: Evento actualizado exitosamente: {evento_dict}")
-
-            elif a.kind == "delete_evento":
-                evid = a.args["evento_id"]
-                logging.info(f"execute_actions: Eliminando evento {evid}")
-                event_service.delete_event(db, usuario_id, evid)
-                results.append({"kind": a.kind, "status": "success", "deleted": {"evento_id": evid}})
-                logging.info(f"execute_actions: Evento {evid} eliminado exitosamente")
-                
-            elif a.kind == "delete_eventos_materia":
-                mid = a.args.get("materia_id")
-                logging.info(f"execute_actions: Eliminando todos los eventos de la materia {mid}")
-                try:
-                    deleted_count = event_service.delete_events_by_materia(db, usuario_id, int(mid))
-                    results.append({"kind": a.kind, "status": "success", "deleted_count": deleted_count})
-                    logging.info(f"execute_actions: Eliminados {deleted_count} eventos de la materia {mid}")
-                except Exception as e:
-                    logging.error(f"execute_actions: Error eliminando eventos de la materia {mid}: {str(e)}", exc_info=True)
-                    results.append({"kind": a.kind, "status": "error", "error": str(e), "description": a.description})
-                
-            else:
-                logging.warning(f"execute_actions: Tipo de acción desconocido: {a.kind}")
-                error_msg = f"Acción {i+1}: tipo desconocido '{a.kind}'"
-                execution_errors.append(error_msg)
-                results.append({
-                    "kind": a.kind, 
-                    "status": "error", 
-                    "error": "Tipo de acción desconocido",
-                    "description": a.description
-                })
-                
-        except Exception as e:
-            logging.error(f"execute_actions: Error ejecutando acción {a.kind}: {str(e)}", exc_info=True)
-            error_msg = f"Acción {i+1} ({a.kind}): {str(e)}"
-            execution_errors.append(error_msg)
-            results.append({
-                "kind": a.kind, 
-                "status": "error", 
-                "error": str(e),
-                "description": a.description
-            })
-            # Continuamos con las siguientes acciones
+    if batched:
+        outcomes = _execute_batched(db, usuario_id, ordered_actions, created_materias, snapshot)
+    else:
+        outcomes = [
+            _execute_single(db, usuario_id, i, a, created_materias, snapshot)
+            for i, a in enumerate(ordered_actions)
+        ]
+
+    results: List[Dict[str, Any]] = [r for r, _ in outcomes]
+    execution_errors: List[str] = [err for _, err in outcomes if err]
 
     successful_results = [r for r in results if r.get("status") == "success"]
     failed_results = [r for r in results if r.get("status") in ["error", "skipped"]]
@@ -757,6 +1080,34 @@ def execute_actions(
     return results
 
 
+def summarize_results(results: List[Dict[str, Any]]) -> str:
+    return "Acciones ejecutadas:\n" + "\n".join(f"- {r.get('kind')}" for r in results) if results else "Sin cambios."
+
+
+async def run_command_async(
+    db: Session,
+    usuario_id: int,
+    user_text: str,
+    llm,
+    *,
+    limiter: Optional[CapacityLimiter] = None,
+) -> Dict[str, Any]:
+    """
+    Planifica y ejecuta una orden en un solo paso (mode='execute' sin acciones previas).
+    El LLM va por la ruta async; la DB corre en hilos acotados por `limiter`.
+    """
+    plan = await plan_actions_async(db, usuario_id, user_text, llm, limiter=limiter)
+    allowed_actions = [a for a in plan.actions if getattr(a, 'allow', True)]
+    if not allowed_actions:
+        logging.warning(f"run_command_async: 0 de {len(plan.actions)} acciones permitidas")
+        return {"summary": "No hay acciones válidas para ejecutar", "results": []}
+
+    results = await to_thread.run_sync(
+        execute_actions, db, usuario_id, allowed_actions, plan.snapshot, limiter=limiter
+    )
+    return {"summary": summarize_results(results), "results": results}
+
+
 def _order_actions_by_dependencies(actions: List[PlannedAction]) -> List[PlannedAction]:
     """
     Ordena las acciones por dependencias para evitar errores de referencias.
@@ -777,8 +1128,7 @@ def _order_actions_by_dependencies(actions: List[PlannedAction]) -> List[Planned
 def _resolve_materia_dependencies(
     args: Dict[str, Any], 
     created_materias: Dict[str, int], 
-    db: Session, 
-    usuario_id: int
+    snapshot: UserCatalogSnapshot,
 ) -> Dict[str, Any]:
     """
     Resuelve referencias de materias usando IDs de materias recién creadas o existentes.
@@ -794,8 +1144,8 @@ def _resolve_materia_dependencies(
             args_copy["evento_materia_id"] = created_materias[materia_ref]
             logging.info(f"_resolve_materia_dependencies: Resolviendo materia_ref '{materia_ref}' con ID recién creado: {created_materias[materia_ref]}")
         else:
-            # Buscar en base de datos
-            materia = _get_materia_by_name(db, usuario_id, materia_ref)
+            # Buscar en el snapshot del catálogo
+            materia = snapshot.materia_by_name(materia_ref)
             if materia:
                 args_copy["evento_materia_id"] = materia.materia_id
                 logging.info(f"_resolve_materia_dependencies: Resolviendo materia_ref '{materia_ref}' con ID existente: {materia.materia_id}")
@@ -0,0 +1,60 @@
+# services/pagination.py
+from __future__ import annotations
+
+import base64
+import json
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Callable, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+# Header de respuesta con el cursor de la página siguiente; el body sigue siendo
+# la lista, así los clientes que usan skip/limit no cambian.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def set_next_cursor(response: Any, next_cursor: Optional[str]) -> None:
+    """Pone NEXT_CURSOR_HEADER en la respuesta (fastapi.Response) si hay página siguiente."""
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+
+class CursorInvalido(Exception):
+    """El cursor no se pudo decodificar (el router responde 400)."""
+
+
+@dataclass
+class Page(Generic[T]):
+    """Página keyset: items + cursor opaco para la siguiente (None si no hay más)."""
+    items: List[T] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(*values: Any) -> str:
+    """Serializa la clave de orden del último item (fechas en ISO) a base64url sin padding."""
+    raw = json.dumps([v.isoformat() if isinstance(v, date) else v for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, parsers: Sequence[Callable[[Any], Any]]) -> Tuple[Any, ...]:
+    """Inversa de encode_cursor; `parsers` convierte cada componente (p.ej. date.fromisoformat, int)."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError("cantidad de componentes")
+        return tuple(parse(v) for parse, v in zip(parsers, values))
+    except Exception as e:
+        raise CursorInvalido(str(e))
+
+
+def build_page(rows: Sequence[T], limit: int, key: Callable[[T], Tuple[Any, ...]]) -> Page[T]:
+    """
+    `rows` viene de una query con limit+1: si sobró una fila hay página siguiente
+    y el cursor apunta al último item devuelto.
+    """
+    items = list(rows[:limit])
+    next_cursor = encode_cursor(*key(items[-1])) if len(rows) > limit and items else None
+    return Page(items=items, next_cursor=next_cursor)
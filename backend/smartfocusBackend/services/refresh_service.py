@@ -0,0 +1,104 @@
+# services/refresh_service.py
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import secrets
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from .. import models
+
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+
+
+# Excepciones de dominio (el router las traduce a HTTP)
+class RefreshTokenInvalido(Exception):
+    """Token inexistente o vencido."""
+
+class RefreshTokenReutilizado(Exception):
+    """Se presentó un token ya rotado: se revocó toda la familia (posible robo)."""
+
+
+def _now_utc() -> datetime:
+    return datetime.now(tz=timezone.utc)
+
+
+def _hash(raw: str) -> str:
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def emitir(db: Session, usuario_id: int, familia: Optional[str] = None, *, commit: bool = True) -> str:
+    """Crea un refresh token (nueva familia si no se indica) y retorna el valor opaco."""
+    raw = secrets.token_urlsafe(32)
+    db.add(models.RefreshToken(
+        token_usuario_id=usuario_id,
+        token_hash=_hash(raw),
+        token_familia=familia or uuid.uuid4().hex,
+        token_expires_at=_now_utc() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    if commit:
+        db.commit()
+    else:
+        db.flush()
+    return raw
+
+
+def revocar_familia(db: Session, familia: str, *, commit: bool = True) -> int:
+    res = db.execute(
+        update(models.RefreshToken)
+        .where(models.RefreshToken.token_familia == familia, models.RefreshToken.token_revoked_at.is_(None))
+        .values(token_revoked_at=_now_utc())
+    )
+    if commit:
+        db.commit()
+    return int(res.rowcount or 0)
+
+
+def rotar(db: Session, raw: str) -> Tuple[int, str, str]:
+    """
+    Canjea un refresh token por uno nuevo de la misma familia.
+    Una sola lectura por índice (token_hash, con FOR UPDATE para serializar
+    canjes concurrentes) que también trae el nombre del usuario para el access token.
+    Retorna (usuario_id, usuario_nombre, nuevo_refresh).
+    """
+    stmt = (
+        select(models.RefreshToken, models.Usuario.usuario_nombre)
+        .join(models.Usuario, models.Usuario.usuario_id == models.RefreshToken.token_usuario_id)
+        .where(models.RefreshToken.token_hash == _hash(raw))
+        .with_for_update(of=models.RefreshToken)
+    )
+    row = db.execute(stmt).one_or_none()
+    if row is None:
+        raise RefreshTokenInvalido()
+    token, usuario_nombre = row
+
+    if token.token_revoked_at is not None:
+        revocadas = revocar_familia(db, token.token_familia)
+        logging.warning(
+            f"refresh_service: Reuso de refresh token (usuario {token.token_usuario_id}), "
+            f"familia revocada ({revocadas} activos)"
+        )
+        raise RefreshTokenReutilizado()
+
+    if token.token_expires_at <= _now_utc():
+        db.rollback()
+        raise RefreshTokenInvalido()
+
+    usuario_id = token.token_usuario_id  # antes del commit (expire_on_commit)
+    token.token_revoked_at = _now_utc()
+    nuevo = emitir(db, usuario_id, token.token_familia, commit=False)
+    db.commit()
+    return usuario_id, usuario_nombre, nuevo
+
+
+def purge_expired(db: Session) -> int:
+    """Borra los tokens vencidos (revocados o no). Retorna la cantidad borrada."""
+    res = db.execute(delete(models.RefreshToken).where(models.RefreshToken.token_expires_at <= _now_utc()))
+    db.commit()
+    return int(res.rowcount or 0)
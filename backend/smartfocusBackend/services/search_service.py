@@ -0,0 +1,211 @@
+# services/search_service.py
+from __future__ import annotations
+
+import logging
+import os
+from typing import List, Tuple
+
+from sqlalchemy import Boolean, Float, case, func, literal, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+from .. import models
+
+# "auto" (default): pg_trgm + unaccent si al arrancar se verifica que la migración
+# 0008 está aplicada (detect_backend_async, desde el lifespan); si no, LIKE.
+# "like": siempre LIKE/lower (SQLite local, o Postgres sin las extensiones).
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "auto").lower()
+
+# Backend activo. Arranca en "like": hasta que el probe confirme f_unaccent y
+# pg_trgm ningún statement las referencia.
+_backend = "like"
+
+# Falla si falta pg_trgm (similarity), unaccent o el wrapper f_unaccent de 0008
+_PROBE_STMT = select(func.similarity(func.f_unaccent(literal("a")), literal("a")))
+
+
+def backend() -> str:
+    return _backend
+
+
+def set_backend(trgm_disponible: bool) -> str:
+    """Fija el backend activo según SEARCH_BACKEND y lo que hay en la base. Retorna el elegido."""
+    global _backend
+    _backend = "trgm" if trgm_disponible and SEARCH_BACKEND != "like" else "like"
+    return _backend
+
+
+async def detect_backend_async(db: AsyncSession) -> str:
+    """Verifica una vez (al arrancar) si la base tiene pg_trgm + f_unaccent."""
+    if SEARCH_BACKEND == "like":
+        return set_backend(False)
+    try:
+        await db.execute(_PROBE_STMT)
+    except Exception as e:
+        await db.rollback()
+        logging.warning(f"search_service: pg_trgm/f_unaccent no disponibles (migración 0008), se usa LIKE: {str(e)}")
+        return set_backend(False)
+    return set_backend(True)
+
+
+def _escape_like(q: str) -> str:
+    return q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+# =========================
+# Construcciones SQL por dialecto
+# Los statement builders de event/subject_service las usan sin saber el dialecto.
+# Las variantes _Trgm* son clases aparte (no un if al compilar): así el cache de
+# statements compilados de SQLAlchemy nunca mezcla SQL de un backend con el otro.
+# =========================
+class _NameMatches(FunctionElement):
+    """`columna` contiene `q` (substring, sin mayúsculas/acentos si el dialecto lo permite)."""
+    type = Boolean()
+    name = "name_matches"
+    inherit_cache = True
+
+
+class _NameSimilarity(FunctionElement):
+    """Score 0..1 de parecido entre `columna` y `q` (para rankear)."""
+    type = Float()
+    name = "name_similarity"
+    inherit_cache = True
+
+
+class _NameFuzzyMatches(FunctionElement):
+    """Como _NameMatches, pero también acepta typos (pg_trgm `%`)."""
+    type = Boolean()
+    name = "name_fuzzy_matches"
+    inherit_cache = True
+
+
+class _TrgmMatches(_NameMatches):
+    inherit_cache = True
+
+
+class _TrgmSimilarity(_NameSimilarity):
+    inherit_cache = True
+
+
+class _TrgmFuzzyMatches(_NameFuzzyMatches):
+    inherit_cache = True
+
+
+def _args(element):
+    col, patron, q = element.clauses
+    return col, patron, q
+
+
+def _lower_like(col, patron):
+    return func.lower(col).like(func.lower(patron), escape="\\")
+
+
+# Se compilan expresiones (no strings crudos) para que el escape de '%' y el
+# paramstyle los resuelva el dialecto (psycopg2 usa %%, asyncpg $n).
+@compiles(_NameMatches)
+def _matches_default(element, compiler, **kw):
+    col, patron, _ = _args(element)
+    return compiler.process(_lower_like(col, patron), **kw)
+
+
+@compiles(_NameMatches, "postgresql")
+def _matches_pg(element, compiler, **kw):
+    col, patron, _ = _args(element)
+    return compiler.process(col.ilike(patron), **kw)
+
+
+@compiles(_TrgmMatches, "postgresql")
+def _matches_trgm(element, compiler, **kw):
+    col, patron, _ = _args(element)
+    # ILIKE sobre la expresión indexada: lo resuelve el GIN trigram
+    return compiler.process(func.f_unaccent(col).ilike(func.f_unaccent(patron)), **kw)
+
+
+@compiles(_NameFuzzyMatches)
+def _fuzzy_default(element, compiler, **kw):
+    return _matches_default(element, compiler, **kw)
+
+
+@compiles(_NameFuzzyMatches, "postgresql")
+def _fuzzy_pg(element, compiler, **kw):
+    return _matches_pg(element, compiler, **kw)
+
+
+@compiles(_TrgmFuzzyMatches, "postgresql")
+def _fuzzy_trgm(element, compiler, **kw):
+    col, patron, q = _args(element)
+    expr = or_(
+        func.f_unaccent(col).ilike(func.f_unaccent(patron)),
+        func.f_unaccent(col).op("%")(func.f_unaccent(q)),
+    )
+    return compiler.process(expr.self_group(), **kw)
+
+
+@compiles(_NameSimilarity)
+def _similarity_default(element, compiler, **kw):
+    # Sin trigramas: prefijo > substring > resto
+    col, patron, q = _args(element)
+    expr = case(
+        (func.lower(col).like(func.lower(q).concat("%")), 1.0),
+        (_lower_like(col, patron), 0.5),
+        else_=0.0,
+    )
+    return compiler.process(expr, **kw)
+
+
+@compiles(_TrgmSimilarity, "postgresql")
+def _similarity_trgm(element, compiler, **kw):
+    col, _, q = _args(element)
+    return compiler.process(func.similarity(func.f_unaccent(col), func.f_unaccent(q)), **kw)
+
+
+def _build(base, trgm, column, q: str):
+    cls = trgm if _backend == "trgm" else base
+    return cls(column, literal(f"%{_escape_like(q)}%"), literal(q))
+
+
+def name_matches(column, q: str):
+    """Predicado de búsqueda por substring; usar en vez de `column.ilike(f'%{q}%')`."""
+    return _build(_NameMatches, _TrgmMatches, column, q)
+
+
+def name_fuzzy_matches(column, q: str):
+    return _build(_NameFuzzyMatches, _TrgmFuzzyMatches, column, q)
+
+
+def name_similarity(column, q: str):
+    return _build(_NameSimilarity, _TrgmSimilarity, column, q)
+
+
+# =========================
+# Búsqueda rankeada (GET /api/v1/search)
+# =========================
+def _search_eventos_stmt(usuario_id: int, q: str, limit: int):
+    score = name_similarity(models.Evento.evento_nombre, q).label("score")
+    return (
+        select(models.Evento, score)
+        .where(models.Evento.evento_usuario_id == usuario_id)
+        .where(name_fuzzy_matches(models.Evento.evento_nombre, q))
+        .order_by(score.desc(), models.Evento.evento_id.asc())
+        .limit(limit)
+    )
+
+
+def _search_materias_stmt(usuario_id: int, q: str, limit: int):
+    score = name_similarity(models.Materia.materia_nombre, q).label("score")
+    return (
+        select(models.Materia, score)
+        .where(models.Materia.materia_usuario_id == usuario_id)
+        .where(name_fuzzy_matches(models.Materia.materia_nombre, q))
+        .order_by(score.desc(), models.Materia.materia_id.asc())
+        .limit(limit)
+    )
+
+
+async def search_async(
+    db: AsyncSession, usuario_id: int, q: str, limit: int = 20
+) -> Tuple[List[models.Materia], List[models.Evento]]:
+    materias = [row[0] for row in await db.execute(_search_materias_stmt(usuario_id, q, limit))]
+    eventos = [row[0] for row in await db.execute(_search_eventos_stmt(usuario_id, q, limit))]
+    return materias, eventos
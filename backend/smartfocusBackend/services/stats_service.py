@@ -0,0 +1,116 @@
+# services/stats_service.py
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models
+
+ESTADOS = ("pendiente", "aprobado", "desaprobado")
+
+# 1: los conteos por estado salen de materia_stats (O(materias)); 0: GROUP BY sobre evento
+STATS_SUMMARY_TABLE = os.getenv("STATS_SUMMARY_TABLE", "0").lower() in ("1", "true", "yes")
+
+
+@dataclass
+class DashboardStats:
+    """Lo que devuelve /api/v1/stats (el router lo mapea a schemas.StatsResponse)."""
+    global_: Dict[str, int] = field(default_factory=dict)
+    materias: List[Dict[str, Any]] = field(default_factory=list)
+    proximos: List[models.Evento] = field(default_factory=list)
+
+
+def _conteo(col, estado: str):
+    return func.coalesce(func.sum(case((col == estado, 1), else_=0)), 0)
+
+
+def _group_by_stmt(usuario_id: int, hoy: date):
+    """Un solo GROUP BY: materia LEFT JOIN evento, conteo por estado + pendientes vencidos."""
+    estado = models.Evento.evento_estado
+    vencidos = func.coalesce(func.sum(case(
+        (and_(estado == "pendiente", models.Evento.evento_fecha < hoy), 1), else_=0,
+    )), 0)
+    return (
+        select(
+            models.Materia.materia_id,
+            models.Materia.materia_nombre,
+            *(_conteo(estado, e).label(e) for e in ESTADOS),
+            vencidos.label("vencidos_pendientes"),
+        )
+        .outerjoin(models.Evento, models.Evento.evento_materia_id == models.Materia.materia_id)
+        .where(models.Materia.materia_usuario_id == usuario_id)
+        .group_by(models.Materia.materia_id, models.Materia.materia_nombre)
+        .order_by(models.Materia.materia_nombre.asc(), models.Materia.materia_id.asc())
+    )
+
+
+def _summary_stmt(usuario_id: int):
+    s = models.MateriaStats
+    return (
+        select(
+            models.Materia.materia_id,
+            models.Materia.materia_nombre,
+            func.coalesce(s.stats_pendiente, 0).label("pendiente"),
+            func.coalesce(s.stats_aprobado, 0).label("aprobado"),
+            func.coalesce(s.stats_desaprobado, 0).label("desaprobado"),
+        )
+        .outerjoin(s, s.stats_materia_id == models.Materia.materia_id)
+        .where(models.Materia.materia_usuario_id == usuario_id)
+        .order_by(models.Materia.materia_nombre.asc(), models.Materia.materia_id.asc())
+    )
+
+
+def _vencidos_stmt(usuario_id: int, hoy: date):
+    # Depende de "hoy", no se puede mantener incrementalmente: range scan sobre (usuario, fecha)
+    return (
+        select(models.Evento.evento_materia_id, func.count().label("n"))
+        .where(
+            models.Evento.evento_usuario_id == usuario_id,
+            models.Evento.evento_fecha < hoy,
+            models.Evento.evento_estado == "pendiente",
+        )
+        .group_by(models.Evento.evento_materia_id)
+    )
+
+
+def _proximos_stmt(usuario_id: int, hoy: date, limit: int):
+    return (
+        select(models.Evento)
+        .where(
+            models.Evento.evento_usuario_id == usuario_id,
+            models.Evento.evento_fecha >= hoy,
+            models.Evento.evento_estado == "pendiente",
+        )
+        .order_by(models.Evento.evento_fecha.asc(), models.Evento.evento_id.asc())
+        .limit(limit)
+    )
+
+
+def _build(rows, vencidos: Optional[Dict[int, int]], proximos: List[models.Evento]) -> DashboardStats:
+    out = DashboardStats(global_={e: 0 for e in (*ESTADOS, "total", "vencidos_pendientes")}, proximos=proximos)
+    for r in rows:
+        m = dict(r._mapping)
+        if vencidos is not None:
+            m["vencidos_pendientes"] = vencidos.get(m["materia_id"], 0)
+        m["total"] = sum(m[e] for e in ESTADOS)
+        for k in (*ESTADOS, "total", "vencidos_pendientes"):
+            out.global_[k] += m[k]
+        out.materias.append(m)
+    return out
+
+
+async def get_stats_async(
+    db: AsyncSession, usuario_id: int, *, proximos: int = 5, hoy: Optional[date] = None
+) -> DashboardStats:
+    hoy = hoy or date.today()
+    if STATS_SUMMARY_TABLE:
+        rows = (await db.execute(_summary_stmt(usuario_id))).all()
+        vencidos = {mid: n for mid, n in (await db.execute(_vencidos_stmt(usuario_id, hoy))).all()}
+    else:
+        rows, vencidos = (await db.execute(_group_by_stmt(usuario_id, hoy))).all(), None
+    return _build(rows, vencidos, (await db.execute(_proximos_stmt(usuario_id, hoy, proximos))).scalars().all())
@@ -1,11 +1,15 @@
 # services/subject_service.py
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import List, Optional, Tuple, Union
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import select, tuple_
 
 from .. import models, schemas
+from ._db import _persist
+from .pagination import CursorInvalido, Page, build_page, decode_cursor  # CursorInvalido: lo mapea el router
+from .search_service import name_matches
 
 # Excepciones de dominio (el router las traduce a HTTP)
 class MateriaNoEncontrada(Exception): ...
@@ -22,53 +26,90 @@ def _get_materia_autorizada(db: Session, materia_id: int, usuario_id: int) -> mo
     return materia
 
 
-def create_subject(db: Session, usuario_id: int, payload: schemas.MateriaCreate) -> models.Materia:
+def create_subject(db: Session, usuario_id: int, payload: schemas.MateriaCreate, *, commit: bool = True) -> models.Materia:
     # Forzamos que la materia quede asignada al usuario autenticado (ignora lo que venga del cliente)
     nombre = payload.materia_nombre.strip()
 
     # (Opcional) evitar duplicados por nombre para ese usuario
-    dup_stmt = select(models.Materia).where(
-        models.Materia.materia_usuario_id == usuario_id,
-        models.Materia.materia_nombre == nombre,
-    )
-    if db.execute(dup_stmt).scalar_one_or_none():
+    if db.execute(_dup_stmt(usuario_id, nombre)).scalar_one_or_none():
         raise MateriaDuplicada()
 
-    materia = models.Materia(
+    materia = _build_materia(usuario_id, nombre, payload)
+    db.add(materia)
+    _persist(db, materia, commit=commit)
+    return materia
+
+
+def _build_materia(usuario_id: int, nombre: str, payload: schemas.MateriaCreate) -> models.Materia:
+    return models.Materia(
         materia_usuario_id=usuario_id,
         materia_nombre=nombre,
         materia_descripcion=payload.materia_descripcion,
     )
-    db.add(materia)
-    db.commit()
-    db.refresh(materia)
-    return materia
 
 
-def list_subjects(
-    db: Session,
-    usuario_id: int,
-    q: Optional[str] = None,
-    skip: int = 0,
-    limit: int = 50,
-) -> List[models.Materia]:
-    stmt = select(models.Materia).where(models.Materia.materia_usuario_id == usuario_id)
-    if q:
-        # Búsqueda simple por nombre (case-insensitive si el collation/DB lo permite;
-        # en Postgres usar ilike; si usás MySQL y querés insensible, depende del collation)
-        try:
-            # Postgres: ILIKE
-            stmt = stmt.where(models.Materia.materia_nombre.ilike(f"%{q}%"))
-        except AttributeError:
-            # Fallback (dialect sin ilike): igualamos a like
-            stmt = stmt.where(models.Materia.materia_nombre.like(f"%{q}%"))
+def build_subjects(
+    db: Session, usuario_id: int, payloads: List[schemas.MateriaCreate]
+) -> List[Union[models.Materia, Exception]]:
+    """
+    Variante en lote de create_subject para inserts en bloque (executor NL): mismas
+    reglas (nombre normalizado, sin duplicados, tampoco dentro del lote) con una
+    sola query de duplicados. No inserta nada: por cada payload devuelve la materia
+    armada o la excepción de dominio que habría lanzado create_subject.
+    """
+    nombres = [p.materia_nombre.strip() for p in payloads]
+    existentes = set(db.execute(_dup_names_stmt(usuario_id, nombres)).scalars().all()) if nombres else set()
+    out: List[Union[models.Materia, Exception]] = []
+    for nombre, payload in zip(nombres, payloads):
+        if nombre in existentes:
+            out.append(MateriaDuplicada())
+            continue
+        existentes.add(nombre)
+        out.append(_build_materia(usuario_id, nombre, payload))
+    return out
+
+
+# Keyset: orden total (materia_nombre, materia_id); el id desempata nombres iguales
+_Cursor = Tuple[str, int]
+
+
+def _materia_key(materia: models.Materia) -> _Cursor:
+    return materia.materia_nombre, materia.materia_id
+
+
+def _decode(cursor: Optional[str]) -> Optional[_Cursor]:
+    return decode_cursor(cursor, (str, int)) if cursor else None
+
+
+def _dup_names_stmt(usuario_id: int, nombres: List[str]):
+    return select(models.Materia.materia_nombre).where(
+        models.Materia.materia_usuario_id == usuario_id,
+        models.Materia.materia_nombre.in_(nombres),
+    )
 
-    stmt = stmt.order_by(models.Materia.materia_nombre.asc()).offset(skip).limit(limit)
-    return db.execute(stmt).scalars().all()
 
+def _dup_stmt(usuario_id: int, nombre: str, exclude_id: Optional[int] = None):
+    stmt = select(models.Materia).where(
+        models.Materia.materia_usuario_id == usuario_id,
+        models.Materia.materia_nombre == nombre,
+    )
+    if exclude_id is not None:
+        stmt = stmt.where(models.Materia.materia_id != exclude_id)
+    return stmt
 
-def get_subject(db: Session, usuario_id: int, materia_id: int) -> models.Materia:
-    return _get_materia_autorizada(db, materia_id, usuario_id)
+
+def _list_subjects_stmt(usuario_id: int, q: Optional[str], skip: int, limit: int, after: Optional[_Cursor] = None):
+    """Pide limit+1 filas para saber si hay página siguiente."""
+    stmt = select(models.Materia).where(models.Materia.materia_usuario_id == usuario_id)
+    if q:
+        # Substring sin mayúsculas ni acentos; en Postgres usa el GIN trigram (ver search_service)
+        stmt = stmt.where(name_matches(models.Materia.materia_nombre, q))
+
+    if after is not None:
+        stmt = stmt.where(tuple_(models.Materia.materia_nombre, models.Materia.materia_id) > tuple_(*after))
+    else:
+        stmt = stmt.offset(skip)
+    return stmt.order_by(models.Materia.materia_nombre.asc(), models.Materia.materia_id.asc()).limit(limit + 1)
 
 
 def update_subject(
@@ -76,6 +117,8 @@ def update_subject(
     usuario_id: int,
     materia_id: int,
     payload: schemas.MateriaUpdate,
+    *,
+    commit: bool = True,
 ) -> models.Materia:
     materia = _get_materia_autorizada(db, materia_id, usuario_id)
 
@@ -84,12 +127,7 @@ def update_subject(
         nuevo_nombre = data["materia_nombre"].strip()
 
         # (Opcional) evitar duplicados al renombrar
-        dup_stmt = select(models.Materia).where(
-            models.Materia.materia_usuario_id == usuario_id,
-            models.Materia.materia_nombre == nuevo_nombre,
-            models.Materia.materia_id != materia_id,
-        )
-        if db.execute(dup_stmt).scalar_one_or_none():
+        if db.execute(_dup_stmt(usuario_id, nuevo_nombre, exclude_id=materia_id)).scalar_one_or_none():
             raise MateriaDuplicada()
 
         materia.materia_nombre = nuevo_nombre
@@ -98,12 +136,42 @@ def update_subject(
         materia.materia_descripcion = data["materia_descripcion"]
 
     db.add(materia)
-    db.commit()
-    db.refresh(materia)
+    _persist(db, materia, commit=commit)
     return materia
 
 
-def delete_subject(db: Session, usuario_id: int, materia_id: int) -> None:
+def delete_subject(db: Session, usuario_id: int, materia_id: int, *, commit: bool = True) -> None:
     materia = _get_materia_autorizada(db, materia_id, usuario_id)
     db.delete(materia)
-    db.commit()
+    _persist(db, commit=commit)
+
+
+# =========================
+# Versiones async (AsyncSession / asyncpg)
+# Misma semántica y excepciones que las sync; las queries se comparten.
+# =========================
+async def _get_materia_autorizada_async(db: AsyncSession, materia_id: int, usuario_id: int) -> models.Materia:
+    materia = await db.get(models.Materia, materia_id)
+    if not materia:
+        raise MateriaNoEncontrada()
+    if materia.materia_usuario_id != usuario_id:
+        raise AccesoNoAutorizado()
+    return materia
+
+
+async def list_subjects_async(
+    db: AsyncSession,
+    usuario_id: int,
+    q: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+) -> Page[models.Materia]:
+    rows = (await db.execute(_list_subjects_stmt(usuario_id, q, skip, limit, _decode(cursor)))).scalars().all()
+    return build_page(rows, limit, _materia_key)
+
+
+async def get_subject_async(db: AsyncSession, usuario_id: int, materia_id: int) -> models.Materia:
+    return await _get_materia_autorizada_async(db, materia_id, usuario_id)
+
+
@@ -0,0 +1,187 @@
+# services/sync_service.py
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .. import models
+from .pagination import CursorInvalido, decode_cursor, encode_cursor
+
+# Cambios máximos por fuente (materias, eventos, borrados) en una respuesta
+SYNC_PAGE_LIMIT = int(os.getenv("SYNC_PAGE_LIMIT", "500"))
+# Antigüedad máxima de los tombstones; un cursor más viejo no puede ver todos los borrados
+SYNC_TOMBSTONE_TTL_DAYS = int(os.getenv("SYNC_TOMBSTONE_TTL_DAYS", "30"))
+
+
+# Excepciones de dominio (el router las traduce a HTTP)
+class CursorExpirado(Exception):
+    """El cursor es anterior a la retención de tombstones: hay que resincronizar completo."""
+
+
+@dataclass
+class SyncDelta:
+    """
+    Cambios en materias/eventos del usuario desde el cursor. `has_more`: quedan
+    cambios ya disponibles, volver a llamar enseguida con `next_cursor`.
+    """
+    materias: List[models.Materia] = field(default_factory=list)
+    eventos: List[models.Evento] = field(default_factory=list)
+    materias_eliminadas: List[int] = field(default_factory=list)
+    eventos_eliminados: List[int] = field(default_factory=list)
+    next_cursor: str = ""
+    has_more: bool = False
+
+
+def _now_utc() -> datetime:
+    return datetime.now(tz=timezone.utc)
+
+
+# =========================
+# Cursor: posición (txid, id) por fuente + cuándo se emitió
+# =========================
+@dataclass(frozen=True)
+class _Posicion:
+    """
+    Todo lo anterior ya se entregó: filas con (txid, id) > (desde, after[fuente])
+    y txid < watermark. after = 0 es "desde el comienzo de ese txid" (los ids son > 0).
+    Llevar un id por fuente permite partir una misma transacción en varias páginas.
+    """
+    desde: int
+    after: Tuple[int, int, int]  # materias, eventos, tombstones
+
+
+def _decode(cursor: Optional[str]) -> Optional[_Posicion]:
+    if not cursor:
+        return None
+    desde, m_after, e_after, t_after, emitido = decode_cursor(cursor, (int, int, int, int, datetime.fromisoformat))
+    if min(desde, m_after, e_after, t_after) < 0 or emitido.tzinfo is None:
+        raise CursorInvalido("cursor mal formado")
+    if emitido < _now_utc() - timedelta(days=SYNC_TOMBSTONE_TTL_DAYS):
+        raise CursorExpirado()
+    return _Posicion(desde, (m_after, e_after, t_after))
+
+
+def _encode(pos: _Posicion) -> str:
+    return encode_cursor(pos.desde, *pos.after, _now_utc())
+
+
+# =========================
+# Statement builders
+# =========================
+# Todas las transacciones con txid < xmin del snapshot ya terminaron: la ventana
+# [desde, watermark) está cerrada y ninguna fila nueva puede caer dentro.
+_WATERMARK_STMT = select(func.txid_snapshot_xmin(func.txid_current_snapshot()))
+
+
+def _ventana(stmt, owner, txid, pk, usuario_id: int, desde: int, after: int, hasta: int, limit: int):
+    # (usuario, txid, id) -> range scan sobre el índice de sync de cada tabla
+    return (
+        stmt.where(owner == usuario_id, tuple_(txid, pk) > tuple_(desde, after), txid < hasta)
+        .order_by(txid.asc(), pk.asc())
+        .limit(limit + 1)
+    )
+
+
+def _materias_stmt(usuario_id: int, desde: int, after: int, hasta: int, limit: int):
+    m = models.Materia
+    return _ventana(select(m), m.materia_usuario_id, m.materia_sync_txid, m.materia_id,
+                    usuario_id, desde, after, hasta, limit)
+
+
+def _eventos_stmt(usuario_id: int, desde: int, after: int, hasta: int, limit: int):
+    e = models.Evento
+    return _ventana(select(e), e.evento_usuario_id, e.evento_sync_txid, e.evento_id,
+                    usuario_id, desde, after, hasta, limit)
+
+
+def _tombstones_stmt(usuario_id: int, desde: int, after: int, hasta: int, limit: int):
+    t = models.SyncTombstone
+    return _ventana(select(t), t.tombstone_usuario_id, t.tombstone_sync_txid, t.tombstone_id,
+                    usuario_id, desde, after, hasta, limit)
+
+
+# (builder, clave (txid, id) de una fila); el orden es el de _Posicion.after
+_FUENTES: Tuple[Tuple[Callable[..., Any], Callable[[Any], Tuple[int, int]]], ...] = (
+    (_materias_stmt, lambda m: (m.materia_sync_txid, m.materia_id)),
+    (_eventos_stmt, lambda e: (e.evento_sync_txid, e.evento_id)),
+    (_tombstones_stmt, lambda t: (t.tombstone_sync_txid, t.tombstone_id)),
+)
+
+
+def _paginar(
+    rows_por_fuente: List[list], pos: _Posicion, hasta: int, limit: int
+) -> Tuple[List[list], _Posicion, bool]:
+    """
+    Si alguna fuente trajo más de `limit` filas, corta todas en el mismo txid
+    (el menor txid de la fila sobrante) para que el cursor quede consistente:
+    cada fuente entrega todo lo anterior al corte y, dentro del txid del corte,
+    hasta su propio último id. Así ninguna respuesta supera `limit` por fuente,
+    aunque una sola transacción tenga más cambios que eso.
+    """
+    sobrantes = [key(rows[limit])[0] for (_, key), rows in zip(_FUENTES, rows_por_fuente) if len(rows) > limit]
+    if not sobrantes:
+        return rows_por_fuente, _Posicion(hasta, (0, 0, 0)), False
+
+    corte = min(sobrantes)
+    recortadas, after = [], []
+    for (_, key), rows, previo in zip(_FUENTES, rows_por_fuente, pos.after):
+        kept = [r for r in rows[:limit] if key(r)[0] <= corte]
+        en_corte = [key(r)[1] for r in kept if key(r)[0] == corte]
+        recortadas.append(kept)
+        if en_corte:
+            after.append(en_corte[-1])
+        else:
+            # Nada nuevo en el txid del corte: si es el mismo del cursor, lo ya entregado sigue valiendo
+            after.append(previo if corte == pos.desde else 0)
+    return recortadas, _Posicion(corte, tuple(after)), True
+
+
+def _delta(rows_por_fuente: List[list], pos: _Posicion, has_more: bool) -> SyncDelta:
+    materias, eventos, tombstones = rows_por_fuente
+    return SyncDelta(
+        materias=materias,
+        eventos=eventos,
+        materias_eliminadas=[t.tombstone_entidad_id for t in tombstones if t.tombstone_tabla == "materia"],
+        eventos_eliminados=[t.tombstone_entidad_id for t in tombstones if t.tombstone_tabla == "evento"],
+        next_cursor=_encode(pos),
+        has_more=has_more,
+    )
+
+
+# =========================
+# API
+# =========================
+async def sync_async(
+    db: AsyncSession, usuario_id: int, cursor: Optional[str] = None, limit: int = SYNC_PAGE_LIMIT
+) -> SyncDelta:
+    """
+    Sin cursor: snapshot completo (paginado con has_more). Con cursor: solo lo
+    que cambió desde entonces; el costo depende de la cantidad de cambios.
+    """
+    pos = _decode(cursor)
+    completa = pos is None
+    pos = pos or _Posicion(0, (0, 0, 0))
+    hasta = int((await db.execute(_WATERMARK_STMT)).scalar_one())
+
+    rows: List[list] = []
+    for (build, _), after in zip(_FUENTES, pos.after):
+        if completa and build is _tombstones_stmt:
+            # Sync completa: el cliente no tiene nada que borrar
+            rows.append([])
+            continue
+        rows.append(list((await db.execute(build(usuario_id, pos.desde, after, hasta, limit))).scalars().all()))
+    return _delta(*_paginar(rows, pos, hasta, limit))
+
+
+def purge_tombstones(db: Session) -> int:
+    """Borra tombstones más viejos que SYNC_TOMBSTONE_TTL_DAYS. Retorna la cantidad borrada."""
+    limite = _now_utc() - timedelta(days=SYNC_TOMBSTONE_TTL_DAYS)
+    res = db.execute(delete(models.SyncTombstone).where(models.SyncTombstone.tombstone_deleted_at < limite))
+    db.commit()
+    return int(res.rowcount or 0)
@@ -5,7 +5,8 @@ from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from .. import models, schemas
-from ..utils import hash_clave
+from ..auth_cache import user_cache
+from ..password_pool import password_pool
 
 
 class UsuarioDuplicado(Exception):
@@ -30,7 +31,7 @@ def register_user(db: Session, payload: schemas.UsuarioCreate) -> schemas.Usuari
     user = models.Usuario(
         usuario_nombre=nombre_norm,
         usuario_email=email_norm,               
-        usuario_password=hash_clave(payload.password),
+        usuario_password=password_pool.hash(payload.password),
         usuario_daltonismo=payload.usuario_daltonismo,
     )
     db.add(user)
@@ -85,6 +86,7 @@ def update_user_profile(db: Session, usuario_id: int, payload: schemas.UsuarioPr
         db.add(user)
         db.commit()
         db.refresh(user)
+        user_cache.invalidate(usuario_id)
     
     return schemas.UsuarioResponse(
         usuario_id=user.usuario_id,
@@ -93,4 +95,5 @@ def update_user_profile(db: Session, usuario_id: int, payload: schemas.UsuarioPr
         usuario_daltonismo=user.usuario_daltonismo,
         usuario_created_at=user.usuario_created_at,
     )
-    
\ No newline at end of file
+
+
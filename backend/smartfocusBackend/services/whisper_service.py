@@ -1,47 +1,92 @@
+import io
 import os
 from typing import Any, Dict, Optional
 
 import httpx
+from anyio import CapacityLimiter
 from fastapi import HTTPException, UploadFile
+from sqlalchemy.orm import Session
 from starlette.status import HTTP_400_BAD_REQUEST
 
 from ..integrations.whisper_client import WhisperClient
+from ..integrations.gemini_client import gemini_pool
+from . import nl_service
 
 MAX_AUDIO_MB = 3  # límite para chat
+CHUNK_SIZE = 64 * 1024
+
+# Hilos máximos que el pipeline de voz puede ocupar a la vez (trabajo de DB).
+# Separado del threadpool por defecto para que la carga de voz no deje sin hilos a los CRUD.
+WHISPER_MAX_THREADS = int(os.getenv("WHISPER_MAX_THREADS", "8"))
+_limiter: Optional[CapacityLimiter] = None
+
+
+def _pipeline_limiter() -> CapacityLimiter:
+    # Se crea perezosamente: CapacityLimiter necesita el event loop en algunas versiones de anyio
+    global _limiter
+    if _limiter is None:
+        _limiter = CapacityLimiter(WHISPER_MAX_THREADS)
+    return _limiter
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=HTTP_400_BAD_REQUEST,
+        detail=f"El archivo supera el máximo permitido de {MAX_AUDIO_MB} MB"
+    )
+
+
+async def _read_limited(file: UploadFile, max_bytes: int) -> io.BytesIO:
+    """
+    Copia el upload a un único BytesIO leyendo de a CHUNK_SIZE y aborta en
+    cuanto se pasa de max_bytes (no hace falta leer el archivo entero para rechazarlo).
+    """
+    size = getattr(file, "size", None)
+    if size is not None and size > max_bytes:
+        raise _too_large()
+
+    buf = io.BytesIO()
+    total = 0
+    while True:
+        chunk = await file.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        total += len(chunk)
+        if total > max_bytes:
+            raise _too_large()
+        buf.write(chunk)
+    buf.seek(0)
+    return buf
 
 
 async def process_audio_with_nl(
     *,
     file: UploadFile,
     language: Optional[str] = "es",
-    user_token: str,  # JWT token para autenticación con NL endpoint
+    usuario_id: int,  # principal ya autenticado por el router
+    db: Session,      # sesión del request (la misma que usó get_current_user)
 ) -> Dict[str, Any]:
     """
     Flujo completo:
     1. Valida archivo
     2. Transcribe con WhisperClient
-    3. Consume ENDPOINT de v1_nl.py vía HTTP
+    3. Planifica y ejecuta la orden con nl_service (LLM async, DB en hilos acotados)
     4. Devuelve resultado combinado
     """
     # Validar content-type
     content_type = file.content_type or "application/octet-stream"
 
-    # Validar tamaño
-    content_bytes = await file.read()
-    size_mb = len(content_bytes) / (1024 * 1024)
-    
-    if size_mb > MAX_AUDIO_MB:
-        raise HTTPException(
-            status_code=HTTP_400_BAD_REQUEST,
-            detail=f"El archivo supera el máximo permitido de {MAX_AUDIO_MB} MB"
-        )
-    
-    # Resetear el archivo para WhisperClient
-    file.file.seek(0)
+    # Leer por chunks cortando apenas se supera el máximo (un solo buffer en memoria)
+    audio = await _read_limited(file, MAX_AUDIO_MB * 1024 * 1024)
     
     # 1. TRANSCRIBIR AUDIO
     client = WhisperClient()
-    transcribed_text = await client.transcribe(file=file, language=language)
+    transcribed_text = await client.transcribe(
+        audio,
+        filename=file.filename,
+        content_type=content_type,
+        language=language,
+    )
     
     if not transcribed_text:
         raise HTTPException(
@@ -49,42 +94,11 @@ async def process_audio_with_nl(
             detail="No se pudo transcribir texto del audio proporcionado"
         )
     
-    # 2. LLAMAR DIRECTAMENTE A NL (como lo haría el frontend, pero interno)
-    from ..routers.v1_nl import nl_command, NLCommandRequest, get_llm_client
-    from .. import auth, database
-    from fastapi import Depends
-    from sqlalchemy.orm import Session
-    import contextlib
-
-    # Obtener usuario usando la función centralizada de autenticación
-    db = next(database.get_db())
-    try:
-        # Simular el objeto de credenciales esperado por get_current_user
-        class DummyCreds:
-            def __init__(self, token):
-                self.scheme = "bearer"
-                self.credentials = token
-
-        usuario = auth.get_current_user(
-            creds=DummyCreds(user_token),
-            db=db
-        )
-    except Exception as e:
-        raise HTTPException(status_code=401, detail=f"Token inválido: {str(e)}")
-
-    # Instanciar el cliente LLM
-    llm = get_llm_client()
-
-    # Construir el payload como lo haría el frontend
-    payload = NLCommandRequest(text=transcribed_text, mode="execute")
-
-    # Llamar a la función nl_command directamente
+    # 2. EJECUTAR NL: lo bloqueante (DB) va a hilos acotados; el LLM por la ruta async
     try:
-        result = nl_command(
-            payload=payload,
-            db=db,
-            usuario=usuario,
-            llm=llm
+        llm = gemini_pool.get()
+        result = await nl_service.run_command_async(
+            db, usuario_id, transcribed_text, llm, limiter=_pipeline_limiter()
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error ejecutando NL: {str(e)}")
@@ -1,13 +1,37 @@
 # utils.py
 from __future__ import annotations
+import os
+import time
+from typing import Optional, Tuple
+
 from passlib.context import CryptContext
 
-# El primer esquema de la lista es el que se usa para NUEVOS hashes.
-# Mantenemos bcrypt_sha256 solo para VERIFICAR hashes antiguos (si existieran).
-_pwd = CryptContext(
-    schemes=["pbkdf2_sha256", "bcrypt_sha256"],
-    deprecated="auto",  # marca como deprecados los que no sean el primero
-)
+# Perfiles de costo de pbkdf2_sha256 (rounds). PASSWORD_PBKDF2_ROUNDS pisa el perfil;
+# el número concreto para cada host sale de `python -m benchmarks.password_calibrate`.
+PBKDF2_PROFILES = {
+    "low": 10_000,
+    "default": 29_000,   # default de passlib 1.7.4
+    "high": 100_000,
+}
+PASSWORD_HASH_PROFILE = os.getenv("PASSWORD_HASH_PROFILE", "default")
+PBKDF2_ROUNDS = int(os.getenv("PASSWORD_PBKDF2_ROUNDS") or PBKDF2_PROFILES.get(PASSWORD_HASH_PROFILE, PBKDF2_PROFILES["default"]))
+
+
+def _build_context(rounds: int) -> CryptContext:
+    # El primer esquema de la lista es el que se usa para NUEVOS hashes.
+    # Mantenemos bcrypt_sha256 solo para VERIFICAR hashes antiguos (si existieran).
+    # min/max_rounds = rounds: needs_update marca todo pbkdf2 con otro costo que el de la política.
+    return CryptContext(
+        schemes=["pbkdf2_sha256", "bcrypt_sha256"],
+        deprecated="auto",  # marca como deprecados los que no sean el primero
+        pbkdf2_sha256__default_rounds=rounds,
+        pbkdf2_sha256__min_rounds=rounds,
+        pbkdf2_sha256__max_rounds=rounds,
+    )
+
+
+_pwd = _build_context(PBKDF2_ROUNDS)
+
 
 def hash_clave(plain_password: str) -> str:
     """
@@ -29,3 +53,38 @@ def verificar_clave(plain_password: str, stored_hash: str) -> bool:
         return _pwd.verify(plain_password, stored_hash)
     except Exception:
         return False
+
+def verificar_y_actualizar(plain_password: str, stored_hash: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifica y, si el hash quedó fuera de la política actual (esquema deprecado o
+    menos rounds), retorna también el hash nuevo para persistir. (ok, nuevo_hash|None)
+    """
+    if not stored_hash or not isinstance(plain_password, str) or not plain_password:
+        return False, None
+    try:
+        return _pwd.verify_and_update(plain_password, stored_hash)
+    except Exception:
+        return False, None
+
+def calibrar_rounds(target_ms: float, *, muestras: int = 5, rounds_inicial: int = 10_000) -> Tuple[int, float]:
+    """
+    Busca los rounds de pbkdf2_sha256 con los que un verify tarda ~target_ms en este CPU.
+    Retorna (rounds, ms_medidos) de la última medición: el costo es lineal en rounds,
+    así que se escala y se re-mide (a lo sumo 4 veces).
+    """
+    rounds = rounds_inicial
+    medido = 0.0
+    for intento in range(4):
+        ctx = _build_context(rounds)
+        h = ctx.hash("calibracion")
+        tiempos = []
+        for _ in range(muestras):
+            t0 = time.perf_counter()
+            ctx.verify("calibracion", h)
+            tiempos.append((time.perf_counter() - t0) * 1000)
+        medido = sorted(tiempos)[len(tiempos) // 2]  # mediana
+        # En el último intento no se re-escala: los rounds tienen que ser los medidos
+        if abs(medido - target_ms) / target_ms < 0.05 or intento == 3:
+            break
+        rounds = max(1_000, int(rounds * target_ms / medido))
+    return rounds, medido
@@ -0,0 +1,17 @@
+# tests/conftest.py
+# Los módulos leen la configuración al importarse (database.py arma las URLs,
+# auth.py exige JWT_*). Los engines de SQLAlchemy no se conectan hasta el primer
+# uso, así que con valores de prueba alcanza para importar y testear lo que no toca la DB.
+import os
+
+for _k, _v in {
+    "DB_USER": "test",
+    "DB_PASS": "test",
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "DB_NAME": "test",
+    "JWT_SECRET_KEY": "test-secret",
+    "JWT_ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+}.items():
+    os.environ.setdefault(_k, _v)
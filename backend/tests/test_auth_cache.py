@@ -0,0 +1,104 @@
+# tests/test_auth_cache.py
+from types import SimpleNamespace
+
+import pytest
+
+from smartfocusBackend import auth_cache
+from smartfocusBackend.auth_cache import DecodedTokenCache, UserPrincipalCache, UsuarioPrincipal
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    t = [1_000_000.0]
+    monkeypatch.setattr(auth_cache.time, "time", lambda: t[0])
+    return t
+
+
+def test_hit_devuelve_copia(reloj):
+    cache = DecodedTokenCache()
+    cache.set("tok", {"sub": "1", "exp": reloj[0] + 60})
+    claims = cache.get("tok")
+    assert claims == {"sub": "1", "exp": reloj[0] + 60}
+    claims["sub"] = "2"
+    assert cache.get("tok")["sub"] == "1"
+    assert cache.stats()["hits"] == 2
+
+
+def test_token_vencido_no_se_sirve(reloj):
+    cache = DecodedTokenCache()
+    cache.set("tok", {"sub": "1", "exp": reloj[0] + 60})
+    reloj[0] += 60  # exp == ahora: vencido
+    assert cache.get("tok") is None
+    stats = cache.stats()
+    assert stats["expirations"] == 1
+    assert stats["size"] == 0
+
+
+def test_sin_exp_no_se_cachea(reloj):
+    cache = DecodedTokenCache()
+    cache.set("tok", {"sub": "1"})
+    cache.set("tok2", {"sub": "1", "exp": "mañana"})
+    assert cache.get("tok") is None
+    assert cache.get("tok2") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_lru_desaloja_el_menos_usado(reloj):
+    cache = DecodedTokenCache(max_entries=2)
+    exp = reloj[0] + 60
+    cache.set("a", {"exp": exp})
+    cache.set("b", {"exp": exp})
+    cache.get("a")
+    cache.set("c", {"exp": exp})
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+class _Sesion:
+    """Doble de la Session del request: devuelve la versión compartida que se le indique."""
+
+    def __init__(self, version):
+        self.version = version
+        self.queries = 0
+        self.rollbacks = 0
+
+    def execute(self, stmt):
+        self.queries += 1
+        if isinstance(self.version, Exception):
+            raise self.version
+        return SimpleNamespace(scalar_one_or_none=lambda: self.version)
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def _principal(usuario_id):
+    return UsuarioPrincipal(usuario_id, "Ana", "ana@example.com", None, None)
+
+
+def test_version_compartida_usa_la_sesion_del_request_y_vacia_al_cambiar(monkeypatch):
+    t = [100.0]
+    monkeypatch.setattr(auth_cache.time, "monotonic", lambda: t[0])
+    cache = UserPrincipalCache(sync_seconds=5, shared=True)
+    db = _Sesion(1)
+
+    assert cache.get(1, db) is None
+    cache.set(_principal(1))
+    assert cache.get(1, db) is not None
+    assert db.queries == 1  # dentro de sync_seconds no se vuelve a consultar
+
+    t[0] += 5
+    db.version = 2  # otro worker invalidó
+    assert cache.get(1, db) is None
+    assert db.queries == 2
+    assert cache.stats()["flushes"] == 1
+
+
+def test_error_leyendo_version_hace_rollback_y_conserva_el_cache(monkeypatch):
+    monkeypatch.setattr(auth_cache.time, "monotonic", lambda: 100.0)
+    cache = UserPrincipalCache(sync_seconds=5, shared=True)
+    cache.set(_principal(1))
+    db = _Sesion(RuntimeError("sin tabla"))
+    assert cache.get(1, db) is not None
+    assert db.rollbacks == 1
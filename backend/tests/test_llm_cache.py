@@ -0,0 +1,27 @@
+# tests/test_llm_cache.py
+from datetime import date
+
+from smartfocusBackend.integrations.llm_cache import make_key, normalize_text
+
+HOY = date(2025, 10, 15)
+
+
+def test_normalize_text():
+    assert normalize_text("Agregar  Exámen") == "agregar examen"
+    assert normalize_text("  CREAR\tmateria\nFÍSICA ") == "crear materia fisica"
+    assert normalize_text("Straße") == "strasse"
+    assert normalize_text(None) == ""
+
+
+def test_make_key_ignora_diferencias_de_forma():
+    a = make_key("Agregar  Exámen", locale="es-AR", today=HOY, catalog_version="v1")
+    b = make_key("agregar examen", locale="es-AR", today=HOY, catalog_version="v1")
+    assert a == b
+    assert len(a) == 64
+
+
+def test_make_key_depende_de_locale_fecha_y_catalogo():
+    base = make_key("borrar parcial", locale="es-AR", today=HOY, catalog_version="v1")
+    assert base != make_key("borrar parcial", locale="es-ES", today=HOY, catalog_version="v1")
+    assert base != make_key("borrar parcial", locale="es-AR", today=date(2025, 10, 16), catalog_version="v1")
+    assert base != make_key("borrar parcial", locale="es-AR", today=HOY, catalog_version="v2")
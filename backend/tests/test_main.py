@@ -0,0 +1,11 @@
+# tests/test_main.py
+from fastapi.testclient import TestClient
+
+from smartfocusBackend.main import app
+from smartfocusBackend.services.pagination import NEXT_CURSOR_HEADER
+
+
+def test_cors_expone_el_header_del_cursor():
+    # Sin `with`: no corre el lifespan (pools, Gemini, mantenimiento)
+    r = TestClient(app).get("/openapi.json", headers={"Origin": "https://app.example.com"})
+    assert NEXT_CURSOR_HEADER.lower() in r.headers["access-control-expose-headers"].lower()
@@ -0,0 +1,107 @@
+# tests/test_nl_rules.py
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from smartfocusBackend.services import nl_rules
+from smartfocusBackend.services.nl_service import UserCatalogSnapshot
+
+# Miércoles
+HOY = date(2025, 10, 15)
+
+
+@pytest.mark.parametrize(
+    "expr, esperado",
+    [
+        ("hoy", date(2025, 10, 15)),
+        ("manana", date(2025, 10, 16)),
+        ("pasado  manana", date(2025, 10, 17)),
+        ("la semana que viene", date(2025, 10, 22)),
+        ("viernes", date(2025, 10, 17)),
+        ("el proximo lunes", date(2025, 10, 20)),
+        ("miercoles", date(2025, 10, 22)),  # mismo día de la semana: la próxima, no hoy
+        ("2025-12-01", date(2025, 12, 1)),
+        ("20/11", date(2025, 11, 20)),
+        ("3/2", date(2026, 2, 3)),  # ya pasó este año
+        ("3/2/26", date(2026, 2, 3)),
+        ("5 de noviembre", date(2025, 11, 5)),
+        ("5 de marzo de 2027", date(2027, 3, 5)),
+        ("dentro de tres dias", date(2025, 10, 18)),
+        ("2 semanas", date(2025, 10, 29)),
+    ],
+)
+def test_parse_fecha(expr, esperado):
+    assert nl_rules.parse_fecha(expr, HOY) == esperado
+
+
+@pytest.mark.parametrize("expr", ["31/02/2026", "2025-13-01", "30 de febrero de 2026", "muchos dias", "algun dia"])
+def test_parse_fecha_invalida(expr):
+    assert nl_rules.parse_fecha(expr, HOY) is None
+
+
+@pytest.fixture
+def snapshot():
+    snap = UserCatalogSnapshot(usuario_id=1)
+    snap.add_materia(SimpleNamespace(materia_id=10, materia_nombre="Física"))
+    snap.add_materia(SimpleNamespace(materia_id=11, materia_nombre="Análisis de Datos"))
+    snap.add_evento(SimpleNamespace(evento_id=100, evento_materia_id=10, evento_nombre="Parcial", evento_fecha=HOY))
+    snap.add_evento(SimpleNamespace(evento_id=101, evento_materia_id=11, evento_nombre="TP 1", evento_fecha=HOY))
+    snap.add_evento(SimpleNamespace(evento_id=102, evento_materia_id=11, evento_nombre="TP 2", evento_fecha=HOY))
+    return snap
+
+
+def test_parse_create_materia(snapshot):
+    r = nl_rules.parse("Crear materia Química Orgánica.", snapshot, HOY)
+    assert r.rule == "create_materia"
+    assert r.confidence >= nl_rules.FAST_PATH_MIN_CONFIDENCE
+    assert r.tool_calls == [{"name": "create_materia", "args": {"materia_nombre": "Química Orgánica"}}]
+
+
+def test_parse_create_evento_resuelve_materia_y_fecha(snapshot):
+    r = nl_rules.parse("agendá un parcial de fisica para el viernes", snapshot, HOY)
+    assert r.confidence == 1.0
+    assert r.tool_calls == [{
+        "name": "create_evento",
+        "args": {
+            "materia_ref": "Física",
+            "evento_nombre": "Parcial",
+            "evento_fecha": "2025-10-17",
+            "evento_estado": "pendiente",
+        },
+    }]
+
+
+def test_parse_create_evento_materia_inexistente_baja_confianza(snapshot):
+    r = nl_rules.parse("crear parcial de historia para mañana", snapshot, HOY)
+    assert r.tool_calls == []
+    assert r.confidence < nl_rules.FAST_PATH_MIN_CONFIDENCE
+
+
+def test_parse_delete_materia(snapshot):
+    r = nl_rules.parse("borrar la materia analisis de datos", snapshot, HOY)
+    assert r.tool_calls == [{"name": "delete_materia", "args": {"materia_ref": "Análisis de Datos"}}]
+
+
+def test_parse_mover_evento_usa_id_del_match(snapshot):
+    r = nl_rules.parse("mover el parcial de física al 20/11", snapshot, HOY)
+    assert r.rule == "update_evento_fecha"
+    assert r.confidence == 1.0
+    args = r.tool_calls[0]["args"]
+    assert (args["evento_id"], args["evento_fecha"]) == (100, "2025-11-20")
+
+
+def test_parse_evento_ambiguo_baja_confianza(snapshot):
+    r = nl_rules.parse("marcar el TP de Análisis de Datos como aprobado", snapshot, HOY)
+    assert r.rule == "update_evento_estado"
+    assert r.confidence < nl_rules.FAST_PATH_MIN_CONFIDENCE
+    assert "evento_id" not in r.tool_calls[0]["args"]
+
+
+def test_parse_varias_ordenes_va_al_llm(snapshot):
+    assert nl_rules.parse("crear materia Química y borrar la materia Física", snapshot, HOY) is None
+
+
+def test_parse_sin_regla(snapshot):
+    assert nl_rules.parse("qué tengo esta semana?", snapshot, HOY) is None
+    assert nl_rules.parse("   ", snapshot, HOY) is None
@@ -0,0 +1,44 @@
+# tests/test_pagination.py
+from datetime import date
+
+import pytest
+
+from smartfocusBackend.services.pagination import CursorInvalido, build_page, decode_cursor, encode_cursor
+
+
+def test_cursor_roundtrip():
+    cursor = encode_cursor(date(2025, 10, 15), 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor, (date.fromisoformat, int)) == (date(2025, 10, 15), 42)
+
+
+def test_cursor_roundtrip_texto_unicode():
+    cursor = encode_cursor("Física", 7)
+    assert decode_cursor(cursor, (str, int)) == ("Física", 7)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "%%%",                                    # no es base64
+        encode_cursor(1),                         # menos componentes
+        encode_cursor("2025-10-15", 1, 2),        # más componentes
+        encode_cursor("no-es-fecha", 1),          # el parser falla
+        "eyJhIjoxfQ",                             # JSON válido pero no es lista
+    ],
+)
+def test_decode_cursor_invalido(cursor):
+    with pytest.raises(CursorInvalido):
+        decode_cursor(cursor, (date.fromisoformat, int))
+
+
+def test_build_page_con_pagina_siguiente():
+    page = build_page([1, 2, 3], 2, lambda x: (x,))
+    assert page.items == [1, 2]
+    assert decode_cursor(page.next_cursor, (int,)) == (2,)
+
+
+def test_build_page_ultima_pagina():
+    page = build_page([1, 2], 2, lambda x: (x,))
+    assert page.items == [1, 2]
+    assert page.next_cursor is None
@@ -0,0 +1,94 @@
+# tests/test_rate_limit.py
+import pytest
+
+from smartfocusBackend import rate_limit
+from smartfocusBackend.rate_limit import Limite, LoginRateLimiter, MemoryBackend, RateLimitExcedido
+
+
+class Reloj:
+    def __init__(self, t: float = 1000.0):
+        self.t = t
+
+    def __call__(self) -> float:
+        return self.t
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    r = Reloj()
+    monkeypatch.setattr(rate_limit.time, "monotonic", r)
+    return r
+
+
+def test_gcra_permite_la_rafaga_y_despues_rechaza(reloj):
+    backend, limite = MemoryBackend(), Limite(por_minuto=6, rafaga=3)  # un intento cada 10 s
+    assert [backend.consume("k", limite)[0] for _ in range(3)] == [True, True, True]
+    ok, retry_after = backend.consume("k", limite)
+    assert ok is False
+    assert retry_after == pytest.approx(10.0)
+
+
+def test_gcra_recupera_a_la_tasa_sostenida(reloj):
+    backend, limite = MemoryBackend(), Limite(por_minuto=6, rafaga=3)
+    for _ in range(3):
+        backend.consume("k", limite)
+    reloj.t += 9.9
+    assert backend.consume("k", limite)[0] is False
+    reloj.t += 0.1
+    assert backend.consume("k", limite) == (True, 0.0)
+    assert backend.consume("k", limite)[0] is False
+
+
+def test_gcra_rechazo_no_consume(reloj):
+    backend, limite = MemoryBackend(), Limite(por_minuto=6, rafaga=1)
+    backend.consume("k", limite)
+    for _ in range(5):
+        assert backend.consume("k", limite)[0] is False
+    reloj.t += 10
+    assert backend.consume("k", limite)[0] is True
+
+
+def test_gcra_claves_independientes_y_poda(reloj):
+    backend, limite = MemoryBackend(max_keys=2), Limite(por_minuto=60, rafaga=1)
+    assert backend.consume("a", limite)[0] is True
+    assert backend.consume("b", limite)[0] is True
+    assert backend.consume("a", limite)[0] is False
+    reloj.t += 5  # "a" y "b" ya vencieron
+    backend.consume("c", limite)
+    assert set(backend._tat) == {"c"}
+
+
+def test_login_rate_limiter_por_email(reloj):
+    limiter = LoginRateLimiter(
+        MemoryBackend(), por_ip=Limite(por_minuto=60, rafaga=100), por_email=Limite(por_minuto=1, rafaga=2)
+    )
+    limiter.check("10.0.0.1", "Ana@Example.com")
+    limiter.check("10.0.0.2", "ana@example.com ")
+    with pytest.raises(RateLimitExcedido) as exc:
+        limiter.check("10.0.0.3", "ANA@example.com")
+    assert exc.value.dimension == "email"
+    assert exc.value.retry_after > 0
+
+
+PROXIES = rate_limit._redes("10.0.0.0/8, 192.168.1.5")
+
+
+@pytest.mark.parametrize(
+    "peer, xff, esperada",
+    [
+        ("203.0.113.9", None, "203.0.113.9"),                          # sin proxy
+        ("203.0.113.9", "1.2.3.4", "203.0.113.9"),                     # XFF de un peer no confiable: se ignora
+        ("10.0.0.2", "198.51.100.7", "198.51.100.7"),                  # un proxy
+        ("10.0.0.2", "6.6.6.6, 198.51.100.7, 192.168.1.5", "198.51.100.7"),  # el cliente inventó el primer salto
+        ("10.0.0.2", "10.1.1.1, 10.2.2.2", "10.1.1.1"),                # todo interno: el más lejano
+        ("10.0.0.2", "basura", "basura"),
+        ("10.0.0.2", "", "10.0.0.2"),
+        (None, "1.2.3.4", None),
+    ],
+)
+def test_client_ip(peer, xff, esperada):
+    assert rate_limit.client_ip(peer, xff, PROXIES) == esperada
+
+
+def test_client_ip_sin_proxies_configurados():
+    assert rate_limit.client_ip("10.0.0.2", "198.51.100.7", ()) == "10.0.0.2"
@@ -0,0 +1,74 @@
+# tests/test_search_service.py
+import asyncio
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from smartfocusBackend import models
+from smartfocusBackend.services import search_service
+
+
+@pytest.fixture(autouse=True)
+def _restaurar_backend():
+    yield
+    search_service.set_backend(False)
+
+
+def _sql(dialect, q="fís"):
+    stmt = select(models.Evento.evento_id).where(search_service.name_fuzzy_matches(models.Evento.evento_nombre, q))
+    return str(stmt.compile(dialect=dialect))
+
+
+def test_por_defecto_no_usa_extensiones():
+    assert search_service.backend() == "like"
+    assert "f_unaccent" not in _sql(postgresql.dialect())
+    assert "ILIKE" in _sql(postgresql.dialect()).upper()
+
+
+def test_trgm_tras_el_probe():
+    search_service.set_backend(True)
+    sql = _sql(postgresql.dialect())
+    assert "f_unaccent" in sql
+    assert "%" in sql
+
+
+def test_sqlite_siempre_like():
+    search_service.set_backend(True)
+    assert "lower(" in _sql(sqlite.dialect())
+
+
+def test_cache_key_distingue_backend():
+    # El cache de SQL compilado de SQLAlchemy no debe servir el SQL de un backend al otro
+    like = search_service.name_matches(models.Evento.evento_nombre, "x")
+    search_service.set_backend(True)
+    trgm = search_service.name_matches(models.Evento.evento_nombre, "x")
+    assert like._generate_cache_key().key != trgm._generate_cache_key().key
+
+
+class _Sesion:
+    def __init__(self, error=None):
+        self.error = error
+        self.rollbacks = 0
+
+    async def execute(self, stmt):
+        if self.error:
+            raise self.error
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+def test_probe_sin_migracion_cae_a_like():
+    db = _Sesion(RuntimeError("function f_unaccent(unknown) does not exist"))
+    assert asyncio.run(search_service.detect_backend_async(db)) == "like"
+    assert db.rollbacks == 1
+
+
+def test_probe_ok_activa_trgm():
+    assert asyncio.run(search_service.detect_backend_async(_Sesion())) == "trgm"
+
+
+def test_search_backend_like_no_prueba(monkeypatch):
+    monkeypatch.setattr(search_service, "SEARCH_BACKEND", "like")
+    assert asyncio.run(search_service.detect_backend_async(_Sesion())) == "like"
@@ -0,0 +1,113 @@
+# tests/test_sync_service.py
+import random
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from smartfocusBackend.services import sync_service
+from smartfocusBackend.services.pagination import CursorInvalido, encode_cursor
+from smartfocusBackend.services.sync_service import _Posicion, _paginar
+
+
+def _m(txid, id_):
+    return SimpleNamespace(materia_sync_txid=txid, materia_id=id_)
+
+
+def _e(txid, id_):
+    return SimpleNamespace(evento_sync_txid=txid, evento_id=id_)
+
+
+def _t(txid, id_):
+    return SimpleNamespace(tombstone_sync_txid=txid, tombstone_id=id_)
+
+
+_FILAS = (_m, _e, _t)
+
+
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+def test_watermark_es_xmin_del_snapshot():
+    assert "txid_snapshot_xmin(txid_current_snapshot())" in _sql(sync_service._WATERMARK_STMT)
+
+
+def test_ventana_corta_en_el_watermark():
+    sql = _sql(sync_service._eventos_stmt(1, 10, 5, 20, 100))
+    assert "evento_sync_txid < " in sql
+    assert "(evento.evento_sync_txid, evento.evento_id) > (" in sql
+
+
+def test_paginar_sin_sobrantes_avanza_hasta_el_watermark():
+    rows = [[_m(5, 1)], [_e(6, 2)], []]
+    out, pos, has_more = _paginar(rows, _Posicion(0, (0, 0, 0)), hasta=50, limit=10)
+    assert out == rows
+    assert pos == _Posicion(50, (0, 0, 0))
+    assert has_more is False
+
+
+def test_paginar_corta_todas_las_fuentes_en_el_mismo_txid():
+    materias = [_m(1, 1), _m(2, 2), _m(3, 3)]           # limit=2 -> sobra la de txid 3
+    eventos = [_e(2, 10), _e(3, 11), _e(4, 12)]         # sobra; pero hay que cortar en 3
+    out, pos, has_more = _paginar([materias, eventos, []], _Posicion(0, (0, 0, 0)), hasta=99, limit=2)
+    assert has_more is True
+    assert pos.desde == 3
+    assert [r.materia_id for r in out[0]] == [1, 2]
+    assert [r.evento_id for r in out[1]] == [10, 11]
+    # Dentro del txid 3 los eventos ya entregaron hasta el id 11; materias nada
+    assert pos.after == (0, 11, 0)
+
+
+def test_paginar_mismo_txid_que_el_cursor_conserva_after():
+    # Una transacción grande (txid 7) partida en páginas: las fuentes sin filas
+    # nuevas en el corte mantienen lo ya entregado
+    pos = _Posicion(7, (0, 20, 4))
+    eventos = [_e(7, 21), _e(7, 22), _e(7, 23)]
+    out, nuevo, has_more = _paginar([[], eventos, []], pos, hasta=99, limit=2)
+    assert has_more is True
+    assert nuevo == _Posicion(7, (0, 22, 4))
+    assert [r.evento_id for r in out[1]] == [21, 22]
+
+
+def _simular(cambios, limit):
+    """Consume todas las páginas como lo haría el cliente; retorna lo entregado por fuente."""
+    hasta = max((txid for fuente in cambios for txid, _ in fuente), default=0) + 1
+    pos, entregado = _Posicion(0, (0, 0, 0)), [[], [], []]
+    for _ in range(10_000):
+        rows = [
+            [fila(txid, id_) for txid, id_ in sorted(fuente) if (txid, id_) > (pos.desde, after) and txid < hasta][: limit + 1]
+            for fila, fuente, after in zip(_FILAS, cambios, pos.after)
+        ]
+        out, pos, has_more = _paginar(rows, pos, hasta, limit)
+        assert all(len(r) <= limit for r in out)
+        for dest, (_, key), filas in zip(entregado, sync_service._FUENTES, out):
+            dest.extend(key(r) for r in filas)
+        if not has_more:
+            return entregado
+    pytest.fail("la paginación no terminó")
+
+
+def test_paginar_entrega_todo_una_sola_vez():
+    rnd = random.Random(1234)
+    for _ in range(300):
+        cambios = [
+            {(rnd.randint(1, 6), id_) for id_ in rnd.sample(range(1, 60), rnd.randint(0, 25))}
+            for _ in range(3)
+        ]
+        entregado = _simular(cambios, limit=rnd.randint(1, 5))
+        assert [sorted(e) for e in entregado] == [sorted(c) for c in cambios]
+        assert all(len(e) == len(set(e)) for e in entregado)
+
+
+def test_cursor_roundtrip_y_expiracion(monkeypatch):
+    pos = _Posicion(12, (1, 2, 3))
+    assert sync_service._decode(sync_service._encode(pos)) == pos
+
+    viejo = sync_service._now_utc() - timedelta(days=sync_service.SYNC_TOMBSTONE_TTL_DAYS + 1)
+    with pytest.raises(sync_service.CursorExpirado):
+        sync_service._decode(encode_cursor(12, 1, 2, 3, viejo))
+
+    with pytest.raises(CursorInvalido):
+        sync_service._decode(encode_cursor(-1, 0, 0, 0, sync_service._now_utc()))
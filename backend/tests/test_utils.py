@@ -0,0 +1,55 @@
+# tests/test_utils.py
+import pytest
+
+from smartfocusBackend import utils
+
+
+class _Reloj:
+    def __init__(self):
+        self.ms = 0.0
+
+    def perf_counter(self) -> float:
+        return self.ms / 1000
+
+
+def _ctx_lineal(reloj: _Reloj, ms_por_round: float):
+    """Contexto cuyo verify 'tarda' rounds * ms_por_round en el reloj falso."""
+    class _Ctx:
+        def __init__(self, rounds: int):
+            self.rounds = rounds
+
+        def hash(self, _):
+            return "h"
+
+        def verify(self, *_):
+            reloj.ms += self.rounds * ms_por_round
+            return True
+
+    return _Ctx
+
+
+def test_calibrar_rounds_converge(monkeypatch):
+    reloj = _Reloj()
+    monkeypatch.setattr(utils.time, "perf_counter", reloj.perf_counter)
+    monkeypatch.setattr(utils, "_build_context", _ctx_lineal(reloj, 0.01))
+    rounds, medido = utils.calibrar_rounds(250, rounds_inicial=10_000)
+    assert rounds == 25_000
+    assert medido == pytest.approx(250)
+
+
+def test_calibrar_rounds_sin_converger_devuelve_el_par_medido(monkeypatch):
+    # El costo por round cambia en cada medición: nunca converge
+    reloj = _Reloj()
+    monkeypatch.setattr(utils.time, "perf_counter", reloj.perf_counter)
+    medidos = []
+
+    def build(rounds):
+        ms_por_round = 0.01 * (len(medidos) + 1)
+        medidos.append(rounds)
+        return _ctx_lineal(reloj, ms_por_round)(rounds)
+
+    monkeypatch.setattr(utils, "_build_context", build)
+    rounds, medido = utils.calibrar_rounds(250, muestras=1, rounds_inicial=10_000)
+    assert len(medidos) == 4
+    assert rounds == medidos[-1]
+    assert medido == pytest.approx(rounds * 0.04)